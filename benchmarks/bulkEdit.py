@@ -0,0 +1,80 @@
+'''
+Benchmark of the bulk edit functions of DBmanager (delete, change amount, change type)
+against the old way of running one statement and one commit per selected transaction.
+The database is a temporary one filled with generated transactions, opened through ConnectionManager
+so it uses the same PRAGMAs as the program.
+
+Usage (from the project folder):
+    python -m benchmarks.bulkEdit
+'''
+# Importing modules
+import tempfile
+import time
+from pathlib import Path
+
+# Importing from other files
+from benchmarks.queryPlans import createDatabase
+from data.connection import ConnectionManager
+from data.database import DBmanager
+from data.migrations import migrate
+from data.money import Money
+
+SIZES = [1, 1_000, 100_000]
+
+def oldDeleteSelected(conn, selectedIDs):
+    for i in selectedIDs:
+        conn.execute(f'DELETE FROM TRANSACTIONS WHERE ID = {int(i)};')
+        conn.commit()
+
+def oldChangeAmount(conn, selectedIDs, newAmount):
+    for i in selectedIDs:
+        conn.execute(f'UPDATE TRANSACTIONS SET AMOUNT = {newAmount.cents} WHERE ID = {int(i)};')
+        conn.commit()
+
+def oldChangeType(conn, selectedIDs):
+    for i in selectedIDs:
+        oldType = conn.execute(f'SELECT TYPE FROM TRANSACTIONS WHERE ID = {int(i)};').fetchone()[0]
+        newType = 'expense' if oldType == 'income' else 'income'
+        conn.execute(f'UPDATE TRANSACTIONS SET TYPE = "{newType}" WHERE ID = {int(i)};')
+        conn.commit()
+
+def timed(function, *args):
+    '''
+    Function that runs the given function once and returns the time it took in ms.
+    '''
+    start = time.perf_counter()
+    function(*args)
+    return (time.perf_counter() - start) * 1000
+
+def main():
+    rows = 2 * sum(SIZES) + 10_000  # Old and new deletes use different ids
+    with tempfile.TemporaryDirectory() as folder:
+        path = Path(folder) / 'benchmark.db'
+        createDatabase(path, rows).close()
+        migrate('1.0', lambda version: None, path)  # Schema of the program: cents, fingerprints, rollup and search triggers
+
+        manager = ConnectionManager()
+        manager.path = path
+        db = DBmanager()
+        ids = [row['id'] for row in db.conn.execute('SELECT id FROM transactions ORDER BY id;')]
+        print(f'{rows:,} transactions\n')
+        print(f'{"selected":>10} {"operation":<14} {"per row":>12} {"batched":>12}')
+
+        offset = 0
+        for size in SIZES:
+            selected = ids[-size:]  # The deletes below start from the other end
+            results = [
+                ('changeAmount', timed(oldChangeAmount, db.conn, selected, Money.of('10.50')), timed(db.changeAmount, selected, Money.of('10.50'))),
+                ('changeType', timed(oldChangeType, db.conn, selected), timed(db.changeType, selected)),
+            ]
+            oldSelected = ids[offset:offset + size]
+            newSelected = ids[offset + size:offset + 2 * size]
+            offset += 2 * size
+            results.append(('deleteSelected', timed(oldDeleteSelected, db.conn, oldSelected), timed(db.deleteSelected, newSelected)))
+
+            for name, old, new in results:
+                print(f'{size:>10,} {name:<14} {old:>9.1f} ms {new:>9.1f} ms')
+        manager.closeAll()
+
+if __name__ == '__main__':
+    main()
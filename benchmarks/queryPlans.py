@@ -0,0 +1,173 @@
+'''
+Benchmark of the queries of DBmanager before and after the migrations.
+A database with the schema of the first version is filled with generated transactions, every query is timed and its
+query plan printed, then every migration is applied and the same is done with the queries DBmanager runs now.
+
+Usage (from the project folder):
+    python -m benchmarks.queryPlans [number of rows]
+'''
+# Importing modules
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+# Importing from other files
+from data.database import DB_PATH
+from data.migrations import MIGRATIONS, applyMigration
+
+YEAR, MONTH = 2025, 11
+# The month as "date >= start AND date < end", so the index on the date column can be used
+MONTH_START, MONTH_END = f'{YEAR:04d}-{MONTH:02d}-01', f'{YEAR:04d}-{MONTH + 1:02d}-01'
+
+'''
+(name, query before the migrations, query after the migrations, parameters after the migrations)
+The "before" queries are the ones DBmanager used to run, with strftime() on every row, on the schema of the first version.
+The "after" queries are the ones it runs now: the totals from the monthly rollup (migration 1.4), the categories as ids
+(migration 1.8) and the lists one keyset page at a time, ordered by the sorted column and the id.
+'''
+QUERIES = [
+    ('Expense',
+     f"SELECT SUM(amount) FROM transactions WHERE type = 'expense' AND strftime('%Y', date) = '{YEAR}' AND strftime('%m', date) = '{MONTH:02d}';",
+     "SELECT SUM(total) FROM monthly_totals WHERE year = ? AND month = ? AND type = 'expense';",
+     (YEAR, MONTH)),
+    ('history (top 5)',
+     'SELECT category, amount, date, type FROM transactions ORDER BY date DESC LIMIT 5;',
+     'SELECT category_id, amount, date, type FROM transactions ORDER BY date DESC LIMIT 5;',
+     ()),
+    ('yearlyIncomeExpense',
+     f"SELECT strftime('%m', date) AS month, type, SUM(amount) FROM transactions WHERE strftime('%Y', date) = '{YEAR}' GROUP BY month, type;",
+     'SELECT month, type, SUM(total) FROM monthly_totals WHERE year = ? GROUP BY month, type;',
+     (YEAR,)),
+    ('transactionHistory Date DESC (first page)',
+     'SELECT * FROM transactions ORDER BY date DESC LIMIT 50;',
+     'SELECT * FROM transactions ORDER BY date DESC, id DESC LIMIT ?;',
+     (50,)),
+    ('transactionHistory Date DESC (next page)',
+     'SELECT * FROM transactions ORDER BY date DESC LIMIT 50 OFFSET 5000;',
+     'SELECT * FROM transactions WHERE (date, id) < (?, ?) ORDER BY date DESC, id DESC LIMIT ?;',
+     (f'{YEAR - 1}-06-15', 10**9, 50)),
+    ('transactionHistory Created ASC (first page)',
+     'SELECT * FROM transactions ORDER BY created_at ASC LIMIT 50;',
+     'SELECT * FROM transactions ORDER BY created_at ASC, id ASC LIMIT ?;',
+     (50,)),
+    ('transactionHistory Amount H->L (first page)',
+     'SELECT * FROM transactions ORDER BY amount DESC LIMIT 50;',
+     'SELECT * FROM transactions ORDER BY amount DESC, id DESC LIMIT ?;',
+     (50,)),
+    ('editingTransactionHistory Date DESC (first page)',
+     "SELECT * FROM transactions WHERE type = 'expense' ORDER BY date DESC LIMIT 50;",
+     'SELECT * FROM transactions WHERE type = ? ORDER BY date DESC, id DESC LIMIT ?;',
+     ('expense', 50)),
+    ('editingTransactionHistory Amount H->L (first page)',
+     "SELECT * FROM transactions WHERE type = 'expense' ORDER BY amount DESC LIMIT 50;",
+     'SELECT * FROM transactions WHERE type = ? ORDER BY amount DESC, id DESC LIMIT ?;',
+     ('expense', 50)),
+    ('editingTransactionHistory Amount H->L (next page)',
+     "SELECT * FROM transactions WHERE type = 'expense' ORDER BY amount DESC LIMIT 50 OFFSET 5000;",
+     'SELECT * FROM transactions WHERE type = ? AND (amount, id) < (?, ?) ORDER BY amount DESC, id DESC LIMIT ?;',
+     ('expense', 100000, 10**9, 50)),
+    ('ReportData income',
+     f"SELECT SUM(amount) FROM transactions WHERE type = 'income' AND strftime('%Y-%m', date) = '{YEAR}-{MONTH:02d}';",
+     "SELECT SUM(total) FROM monthly_totals WHERE year = ? AND month = ? AND type = 'income';",
+     (YEAR, MONTH)),
+    ('ReportData categories',
+     f"SELECT category, SUM(amount) FROM transactions WHERE type = 'expense' AND strftime('%Y-%m', date) = '{YEAR}-{MONTH:02d}' GROUP BY category;",
+     "SELECT category_id, SUM(total) FROM monthly_totals WHERE year = ? AND month = ? AND type = 'expense' GROUP BY category_id;",
+     (YEAR, MONTH)),
+    ('filterOptions categories',
+     "SELECT DISTINCT category FROM transactions WHERE type = 'expense';",
+     'SELECT DISTINCT category_id FROM monthly_totals WHERE type = ?;',
+     ('expense',)),
+]
+
+# Tables of the first version of the program, the schema every migration starts from
+BASE_SCHEMA = [
+    '''CREATE TABLE transactions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        amount REAL NOT NULL,
+        type TEXT CHECK(type IN ('income', 'expense')),
+        category TEXT,
+        date TEXT NOT NULL,
+        description TEXT,
+        account TEXT,
+        created_at TEXT NOT NULL DEFAULT (datetime('now')),
+        update_at TEXT
+    );''',
+    '''CREATE TABLE categories (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        type TEXT NOT NULL CHECK (type IN ('income', 'expense'))
+    );''',
+]
+
+def createDatabase(path, rows):
+    '''
+    Function to create a database with the schema of the first version and fill it with generated transactions,
+    with the categories of the real database. The migrations then bring it to the current schema.
+    The schema is not copied from the real database, which may already be migrated.
+    '''
+    source = sqlite3.connect(DB_PATH)
+    categories = source.execute('SELECT name, type FROM categories ORDER BY id;').fetchall()
+    source.close()
+
+    conn = sqlite3.connect(path)
+    for sql in BASE_SCHEMA:
+        conn.execute(sql)
+    conn.executemany('INSERT INTO categories (name, type) VALUES (?, ?);', categories)
+
+    random.seed(1)
+    firstDay = date(YEAR - 2, 1, 1)
+    def generate():
+        for _ in range(rows):
+            tType = 'income' if random.random() < 0.3 else 'expense'
+            day = firstDay + timedelta(days=random.randrange(365 * 3))
+            yield (round(random.uniform(1, 2000), 2), tType,
+                   random.choice([c[0] for c in categories if c[1] == tType]),
+                   day.isoformat(), 'Benchmark data', random.choice(['Cash', 'Bank', 'Credit Card']),
+                   f'{day.isoformat()} {random.randrange(24):02d}:{random.randrange(60):02d}:00')
+    conn.executemany('INSERT INTO transactions (amount, type, category, date, description, account, created_at) VALUES (?,?,?,?,?,?,?);', generate())
+    conn.commit()
+    return conn
+
+def run(conn, sql, params):
+    '''
+    Function that returns the query plan and the best time (in ms) of 3 runs of a query.
+    '''
+    plan = [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params)]
+    best = None
+    for _ in range(3):
+        start = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return plan, best
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    with tempfile.TemporaryDirectory() as folder:
+        conn = createDatabase(Path(folder) / 'benchmark.db', rows)
+        print(f'{rows:,} transactions\n')
+
+        before = {name: run(conn, sql, ()) for name, sql, _, _ in QUERIES}
+
+        conn.isolation_level = None
+        for migration in MIGRATIONS:
+            applyMigration(conn, migration)
+
+        after = {name: run(conn, sql, params) for name, _, sql, params in QUERIES}
+        conn.close()
+
+    for name, *_ in QUERIES:
+        planBefore, timeBefore = before[name]
+        planAfter, timeAfter = after[name]
+        print(f'{name}')
+        print(f'  before: {timeBefore:9.2f} ms  {" | ".join(planBefore)}')
+        print(f'  after:  {timeAfter:9.2f} ms  {" | ".join(planAfter)}')
+        print()
+
+if __name__ == '__main__':
+    main()
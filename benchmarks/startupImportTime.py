@@ -0,0 +1,75 @@
+'''
+Benchmark of the imports done when the program starts, using the "-X importtime" option of Python.
+Imports main.py in a new interpreter (which imports everything the homepage needs, without opening a window),
+prints the modules that took the longest and fails if the startup imports go over the budget
+or if a module that should only be imported later (matplotlib, the subwindows) is imported at startup.
+
+Usage (from the project folder):
+    python -m benchmarks.startupImportTime            (budget of BUDGET_MS)
+    python -m benchmarks.startupImportTime 250        (budget of 250 ms)
+The exit code is 1 when the budget is exceeded, so it can be run as a regression check.
+'''
+# Importing modules
+import subprocess
+import sys
+
+BUDGET_MS = 400  # Cumulative import time of main.py
+RUNS = 5  # The best run is kept, the first ones also pay for the disk cache
+SHOWN = 15  # Number of slowest modules printed
+
+# Modules imported after the homepage is shown, importing them at startup is a regression
+DEFERRED_MODULES = [
+    'matplotlib',
+    'windows.addTransaction',
+    'windows.editExpense',
+    'windows.editIncome',
+    'windows.history',
+    'windows.user',
+    'windows.settings',
+]
+
+def importTimes():
+    '''
+    Function that imports main.py with "-X importtime" in a new interpreter.
+    Returns {module: (self time in ms, cumulative time in ms, nesting level)}.
+    '''
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import main'],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f'Importing main.py failed:\n{result.stderr[-2000:]}')
+
+    times = {}
+    for line in result.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package", nested modules are indented by 2 spaces
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        selfTime, cumulative, name = line[len('import time:'):].split('|')
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        times[name.strip()] = (int(selfTime) / 1000, int(cumulative) / 1000, level)
+    return times
+
+def main():
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else BUDGET_MS
+    runs = [importTimes() for _ in range(RUNS)]
+    times = min(runs, key=lambda run: run['main'][1])
+    total = times['main'][1]
+
+    print(f'{"cumulative":>12} {"self":>10}  module')
+    slowest = sorted(times.items(), key=lambda item: item[1][1], reverse=True)[:SHOWN]
+    for name, (selfTime, cumulative, level) in slowest:
+        print(f'{cumulative:>10.1f}ms {selfTime:>8.1f}ms  {"  " * level}{name}')
+
+    failed = False
+    imported = [name for name in DEFERRED_MODULES if name in times]
+    if imported:
+        print(f'\nImported at startup but should be deferred: {", ".join(imported)}')
+        failed = True
+
+    print(f'\nStartup imports: {total:.1f}ms (budget {budget:.0f}ms, best of {RUNS})')
+    if total > budget:
+        print('Over budget')
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+'''
+This file contains the budgets of the expense categories (the "budgets" table) and the variance engine,
+which tells for every category how much of its budget was spent in a month.
+A budget is set for a category from a month on, and stays until a later month sets another one (an amount of 0 ends it).
+With rollover, what is left of the budget at the end of a month (or what was overspent) carries to the next month.
+The spent amounts are never summed from the transactions: they are read from the monthly rollup (data/rollup.py),
+which the triggers keep up to date as every transaction is written, so the variance costs a few rows per month.
+'''
+# Importing the amounts from another file
+from data.money import Money
+
+CREATE_TABLE = '''
+    CREATE TABLE IF NOT EXISTS budgets (
+        category_id INTEGER NOT NULL REFERENCES categories (id),
+        year INTEGER NOT NULL,
+        month INTEGER NOT NULL,
+        amount INTEGER NOT NULL CHECK(amount >= 0),
+        rollover INTEGER NOT NULL DEFAULT 0 CHECK(rollover IN (0, 1)),
+        PRIMARY KEY (category_id, year, month)
+    );'''
+
+def monthNumber(year, month):
+    '''
+    Function that returns a month as a number of months, so that the months can be counted through the years.
+    '''
+    return int(year) * 12 + int(month) - 1
+
+class BudgetStatus:
+    '''
+    Budget of a category in a month.
+    Includes:
+    - category: name of the category
+    - budget: budget set for the month, as Money
+    - available: budget plus what the months before left with rollover, as Money
+    - spent: expenses of the category in the month, as Money
+    - remaining: what is left to spend, negative if the budget is overspent
+    - rollover: True if what is left carries to the next month
+    '''
+    def __init__(self, category, budget, available, spent, rollover):
+        self.category = category
+        self.budget = budget
+        self.available = available
+        self.spent = spent
+        self.remaining = available - spent
+        self.rollover = rollover
+
+    def progress(self):
+        '''
+        Function that returns the part of the available budget spent, in percent (above 100 when overspent).
+        '''
+        if self.available.cents <= 0:
+            return 100 if self.spent else 0
+        return round(self.spent.cents * 100 / self.available.cents)
+
+def variance(budgets, spent, year, month):
+    '''
+    Function that returns {category id: (budget, available, spent, rollover)} in cents for the given month.
+    'budgets' is {category id: [(month number, amount, rollover), ...]} in order of month, up to the given month,
+    'spent' is {(category id, month number): expenses} from the first month of the budgets to the given month.
+    The categories whose budget in that month is 0 (ended) are left out.
+    '''
+    target = monthNumber(year, month)
+    statuses = {}
+    for categoryID, rows in budgets.items():
+        carry = 0  # Left at the end of the month before, with rollover
+        index = 0
+        for number in range(rows[0][0], target + 1):
+            while index + 1 < len(rows) and rows[index + 1][0] <= number:
+                index += 1
+            _, amount, rollover = rows[index]
+            available = amount + carry
+            monthSpent = spent.get((categoryID, number), 0)
+            carry = available - monthSpent if rollover else 0
+        if amount:
+            statuses[categoryID] = (amount, available, monthSpent, bool(rollover))
+    return statuses
+
+def budgetStatuses(statuses, categoryName):
+    '''
+    Function that returns the BudgetStatus of each category of a variance, ordered by the name of the category.
+    'categoryName' gives the name of a category id.
+    '''
+    result = [BudgetStatus(categoryName(categoryID), Money(budget), Money(available), Money(monthSpent), rollover)
+              for categoryID, (budget, available, monthSpent, rollover) in statuses.items()]
+    return sorted(result, key=lambda status: status.category or '')
@@ -0,0 +1,95 @@
+'''
+This file contains the bus through which the database tells the rest of the program that the transactions changed.
+Every write of DBmanager publishes a DataChange describing what it touched, and anything that shows or caches
+data from the database subscribes to it, so it can tell if it has to fetch its data again.
+'''
+
+class DataChange:
+    '''
+    Description of one write to the transactions.
+    Includes:
+    - operation: "insert", "update" or "delete"
+    - ids: ids of the transactions written
+    - dates: dates of the transactions, before and after the write ('yyyy-mm-dd')
+    - types: types of the transactions, before and after the write ("income", "expense")
+    - fields: columns changed by an update, None when the whole transaction was inserted or deleted
+    Setting a budget is published as an update of the "budget" field, dated the first day of its month.
+    '''
+    def __init__(self, operation, ids=(), dates=(), types=(), fields=None):
+        self.operation = operation
+        self.ids = set(ids)
+        self.dates = set(dates)
+        self.types = set(types)
+        self.fields = None if fields is None else set(fields)
+
+    def changes(self, *fields):
+        '''
+        Function that returns True if the write changed any of the given columns.
+        Inserts and deletes change every column.
+        '''
+        return self.fields is None or bool(self.fields.intersection(fields))
+
+    def years(self):
+        '''
+        Function that returns the years of the dates touched by the write.
+        '''
+        return {d[0:4] for d in self.dates}
+
+    def touchesMonth(self, year, month):
+        '''
+        Function that returns True if the write touched a transaction of the given month.
+        '''
+        prefix = f'{int(year):04d}-{int(month):02d}'
+        return any(d.startswith(prefix) for d in self.dates)
+
+    def touchesYear(self, year):
+        '''
+        Function that returns True if the write touched a transaction of the given year.
+        '''
+        return str(year) in self.years()
+
+class ChangeBus:
+    '''
+    Class that passes the changes of the database to the subscribed functions.
+    There is only one instance of it, shared by every DBmanager and every window.
+    The subscribed functions are called on the thread that made the write, so they should only take note of the change.
+    '''
+    _instance = None
+
+    def __new__(cls):
+        '''
+        Function to create the instance in the memory so that it can be used by every file.
+        '''
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        '''
+        Function checks if there is "_initialized" attribute inside the object.
+        Only configures the object the first time it is created.
+        '''
+        if not hasattr(self, "_initialized"):
+            self._initialized = True
+            self.subscribers = []
+
+    def subscribe(self, callback):
+        '''
+        Function to call 'callback' with the DataChange of every write from now on.
+        '''
+        if callback not in self.subscribers:
+            self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        '''
+        Function to stop calling 'callback'.
+        '''
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    def publish(self, change):
+        '''
+        Function to pass a DataChange to every subscribed function.
+        '''
+        for callback in list(self.subscribers):
+            callback(change)
@@ -0,0 +1,102 @@
+'''
+This file contains the class that manages the connections to the database.
+Every DBmanager asks this class for its connection instead of opening a new one,
+so the whole program shares one tuned connection per thread which is closed once when the program exits.
+'''
+# Importing modules
+import atexit
+import sqlite3
+import threading
+from pathlib import Path
+
+# Importing the fingerprint of the transactions from another file
+from data.fingerprint import registerFingerprint
+
+# Database path
+BASE_DIR = Path(__file__).resolve().parent
+DB_PATH = BASE_DIR / "transactions"
+
+'''
+PRAGMAs applied to every new connection.
+- WAL lets the windows read while a write is happening and makes commits cheaper.
+- synchronous=NORMAL is safe with WAL and avoids an fsync on every commit.
+- mmap_size and cache_size keep the hot pages of the database in memory.
+'''
+PRAGMAS = [
+    'PRAGMA journal_mode = WAL;',
+    'PRAGMA synchronous = NORMAL;',
+    'PRAGMA mmap_size = 268435456;',  # 256 MB
+    'PRAGMA cache_size = -32000;',  # 32 MB
+    'PRAGMA temp_store = MEMORY;',
+]
+
+STATEMENT_CACHE_SIZE = 256  # Prepared statements kept per connection by sqlite3
+
+class ConnectionManager:
+    '''
+    Class that hands out the shared database connections.
+    There is only one instance of it, and it keeps one connection per thread.
+    '''
+    _instance = None
+
+    def __new__(cls):
+        '''
+        Function to create the instance in the memory so that it can be used by every DBmanager.
+        '''
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        '''
+        Function checks if there is "_initialized" attribute inside the object.
+        Only configures the object the first time it is created.
+        '''
+        if not hasattr(self, "_initialized"):
+            self._initialized = True
+            self.path = DB_PATH
+            self._local = threading.local()
+            self._connections = []
+            self._lock = threading.Lock()
+            atexit.register(self.closeAll)
+
+    def connection(self):
+        '''
+        Function that returns the connection of the calling thread, opening it the first time.
+        '''
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _open(self):
+        '''
+        Function to open a new connection with the PRAGMAs applied and the fingerprint() SQL function registered.
+        check_same_thread is off only so that closeAll can close the connections of every thread at exit,
+        each connection is still used by a single thread.
+        '''
+        conn = sqlite3.connect(self.path, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE)
+        conn.row_factory = sqlite3.Row  # row_factory for better data handling
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        registerFingerprint(conn)
+        return conn
+
+    def closeAll(self):
+        '''
+        Function to close every connection that was opened.
+        Called when the application quits, and at interpreter exit in case the application did not quit normally.
+        '''
+        with self._lock:
+            connections = self._connections
+            self._connections = []
+        for conn in connections:
+            try:
+                conn.execute('PRAGMA optimize;')  # Updates the planner statistics that changed during the session
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
@@ -2,16 +2,101 @@
 This file contains all the functions that controls the database.
 These functions are imported and then called by other files when needed.
 '''
-# Importing modules
-import sqlite3
-from pathlib import Path
+# Importing the shared connections, the database path, the change bus, the monthly rollup and the search index from other files
+from data.connection import ConnectionManager, DB_PATH
+from data.changeBus import ChangeBus, DataChange
+from data.rollup import addToMonthlyTotals
+from data.search import addToSearchIndex, matchQuery
+from data.filters import TransactionFilter
+from data.fingerprint import fingerprint
+from data.money import Money
+from data.dimensions import NameCache
+from data.recurring import FREQUENCIES, nextDue, dueDates
+from data.budgets import monthNumber, variance, budgetStatuses
 
 # Importing date related function from another file
 from helper.dateAndTime import tdy
 
-# Database path
-BASE_DIR = Path(__file__).resolve().parent
-DB_PATH = BASE_DIR / "transactions"
+# Cache of the yearly income/expense buckets used by the barchart, keyed by year.
+# Shared by every DBmanager instance and cleared per year when a write touches that year.
+_yearlyCache = {}
+
+# SQLite limits the number of "?" in one statement (999 before version 3.32), so lists of ids are sent in chunks below it
+MAX_PARAMETERS = 900
+
+# Number of matches above which a search lists the newest matches first instead of ranking them (see DBmanager.search)
+RANKED_SEARCH_LIMIT = 20_000
+
+# Number of transactions from which a bulk insert drops the indexes of the table and builds them again at the end
+BULK_LOAD_MIN_ROWS = 10_000
+# Index kept during a bulk insert, since the duplicate check of every inserted transaction uses it
+BULK_LOAD_KEPT = ['idx_transactions_fingerprint']
+
+# Number of months, the current one included, whose transactions rank the categories offered by the autocomplete
+CATEGORY_USAGE_MONTHS = 6
+
+'''
+Column and direction of each sorting option of the history and edit windows.
+The id is added after the column so that every transaction has a unique position, which the pages are fetched from.
+'''
+SORT_OPTIONS = {
+    'Date ASC': ('date', 'ASC'),
+    'Date DESC': ('date', 'DESC'),
+    'Created ASC': ('created_at', 'ASC'),
+    'Created DESC': ('created_at', 'DESC'),
+    'Amount H->L': ('amount', 'DESC'),
+    'Amount L->H': ('amount', 'ASC'),
+    'Income -> Expense': ('type', 'DESC'),
+    'Expense -> Income': ('type', 'ASC'),
+}
+
+def pageCursor(sortedTo, row):
+    '''
+    Function that returns the position of a transaction in the given sorting option, (sort value, id).
+    The position of the last transaction of a page is used to fetch the page after it.
+    '''
+    column = SORT_OPTIONS[sortedTo][0]
+    return row[column], row['id']
+
+def searchCursor(row):
+    '''
+    Function that returns the position of a transaction in the results of a search, (rank, id).
+    '''
+    return row['rank'], row['id']
+
+def chunked(ids, size=MAX_PARAMETERS):
+    '''
+    Function that splits a list of ids into lists of at most 'size' ids.
+    '''
+    for i in range(0, len(ids), size):
+        yield ids[i:i + size]
+
+def invalidateYears(years):
+    '''
+    Function to drop the cached yearly buckets of the given years after a write touched them.
+    '''
+    for year in years:
+        _yearlyCache.pop(str(year), None)
+
+def yearlyCacheListener(change):
+    '''
+    Function subscribed to the change bus, to drop the cached years whose totals the write changed.
+    '''
+    if change.changes('amount', 'type', 'date'):
+        invalidateYears(change.years())
+
+ChangeBus().subscribe(yearlyCacheListener)
+
+# Names of the categories and accounts by id and ids by name, shared by every DBmanager (see data/dimensions.py)
+_categories = NameCache('categories', ('name', 'type'))
+_accounts = NameCache('accounts')
+
+def forgetNames():
+    '''
+    Function to empty the caches of names after a rollback, which may have undone categories or accounts they had added.
+    '''
+    _categories.forget()
+    _accounts.forget()
 
 class DBmanager:
     '''
@@ -20,30 +105,56 @@ class DBmanager:
     def __init__(self):
         '''
         Initialization function.
+        The connection is the shared one of the current thread, so creating a DBmanager does not open a new connection.
         '''
-        self.conn = sqlite3.connect(DB_PATH)
-        self.conn.row_factory = sqlite3.Row # row_factory for better data handling
+        self.conn = ConnectionManager().connection()
 
     def Expense(self):
         '''
-        Function that returns the total expense of the current month.
+        Function that returns the total expense of the current month, as Money.
+        Read from the monthly rollup (monthly_totals), so it costs the same no matter how many transactions there are.
         '''
         today = tdy()
-        month = today.strftime('%m')
-        year = today.strftime('%Y')
 
-        cursor = self.conn.execute(f'''
-            SELECT SUM(amount) AS total_expense
-            FROM transactions
-            WHERE type = 'expense'
-            AND strftime('%Y', date) = '{year}'
-            AND strftime('%m', date) = '{month}';''')
-        rows = cursor.fetchall()
-        if dict(rows[0])['total_expense'] == None:
-            totalExpense = 0.00
-        else:
-            totalExpense = float(f"{dict(rows[0])['total_expense']:.2f}")
-        return totalExpense
+        cursor = self.conn.execute('''
+            SELECT SUM(total) AS total_expense
+            FROM monthly_totals
+            WHERE year = ? AND month = ? AND type = 'expense';''', (today.year, today.month))
+        return Money.fromCents(cursor.fetchone()['total_expense'])
+
+    def setCategoryBudget(self, category, year, month, amount, rollover=False):
+        '''
+        Function to set the budget of an expense category from a month on, until a later month sets another one.
+        'amount' is a Money, 0 to end the budget. With 'rollover' what is left at the end of a month carries to the next.
+        '''
+        with self.conn:
+            self.conn.execute('''INSERT INTO BUDGETS (category_id, year, month, amount, rollover) VALUES (?,?,?,?,?)
+                ON CONFLICT (category_id, year, month) DO UPDATE SET amount = excluded.amount, rollover = excluded.rollover;''',
+                (self.categoryID(category, 'expense'), year, month, amount, int(rollover)))
+        ChangeBus().publish(DataChange('update', (), [f'{int(year):04d}-{int(month):02d}-01'], ['expense'], ['budget']))
+
+    def budgetVariance(self, year=None, month=None):
+        '''
+        Function that returns the BudgetStatus (data/budgets.py) of every category with a budget in a month
+        (the current month by default), ordered by category.
+        The expenses are read from the monthly rollup, whose primary key starts with (year, month),
+        so only the rows of the months from the first budget on are read, never the transactions.
+        '''
+        if year is None:
+            today = tdy()
+            year, month = today.year, today.month
+        budgets = {}
+        for row in self.conn.execute('''SELECT category_id, year, month, amount, rollover FROM BUDGETS
+                WHERE (year, month) <= (?, ?) ORDER BY category_id, year, month;''', (year, month)):
+            budgets.setdefault(row['category_id'], []).append((monthNumber(row['year'], row['month']), row['amount'], row['rollover']))
+        if not budgets:
+            return []
+        first = min(rows[0][0] for rows in budgets.values())
+        cursor = self.conn.execute('''SELECT category_id, year, month, SUM(total) AS spent FROM monthly_totals
+            WHERE (year, month) >= (?, ?) AND (year, month) <= (?, ?) AND type = 'expense'
+            GROUP BY category_id, year, month;''', (first // 12, first % 12 + 1, year, month))
+        spent = {(row['category_id'], monthNumber(row['year'], row['month'])): row['spent'] for row in cursor}
+        return budgetStatuses(variance(budgets, spent, year, month), lambda categoryID: _categories.name(self.conn, categoryID))
 
     # Function for fetching transaction history
     def history(self):
@@ -51,232 +162,675 @@ class DBmanager:
         Function that return the recent 5 transactions in the database.
         '''
         cursor = self.conn.execute('''
-            SELECT category, amount, date, type
+            SELECT category_id, amount, date, type
             FROM transactions
             ORDER BY date DESC
             LIMIT 5;''')
-        rawRows = cursor.fetchall()
+        rawRows = self.withNames(cursor.fetchall())
         rows = []
         data = []
         for i in rawRows:
-            rows.append([dict(i)['category'],f"{dict(i)['amount']:.2f}",dict(i)['date'],dict(i)['type']])
+            rows.append([i['category'],f"{Money.fromCents(i['amount']):.2f}",i['date'],i['type']])
 
         return rows
 
     def incomeExpense(self, month, tType):
         '''
-        Function that returns the total income and expense of each month of an year as per demand.
+        Function that returns the total income or expense of a month of the current year.
         The function will take in the variable which will let it know which month's transaction and what type ("Income", "Expense")
-        We will fetch the current year by using 'tdy' function and then extracting the year from it.
-        Then according to the 'tType', "Income" or "Expense" the data will be fetched from the database and returned.
+        The value is taken from 'yearlyIncomeExpense' so that asking for every month does not scan the table every time.
         '''
-        today = tdy()
-        year = int(today.strftime('%Y'))
-
+        income, expense = self.yearlyIncomeExpense()
         if tType == 'I':
-            cursor = self.conn.execute(f'''
-                        SELECT SUM(amount) AS total_income
-                        FROM transactions
-                        WHERE type = 'income'
-                        AND strftime('%Y', date) = '{year}'
-                        AND strftime('%m', date) = '{month}';''')
-            rows = cursor.fetchall()
-            if dict(rows[0])['total_income'] == None:
-                totalIncome = 0.00
-            else:
-                totalIncome = float(f"{dict(rows[0])['total_income']}")
-            return int(totalIncome)
-
+            return income[int(month) - 1]
         elif tType == 'E':
-            cursor = self.conn.execute(f'''
-                        SELECT SUM(amount) AS total_expense
-                        FROM transactions
-                        WHERE type = 'expense'
-                        AND strftime('%Y', date) = '{year}'
-                        AND strftime('%m', date) = '{month}';''')
-            rows = cursor.fetchall()
-            if dict(rows[0])['total_expense'] == None:
-                totalExpense = 0.00
-            else:
-                totalExpense = float(f"{dict(rows[0])['total_expense']}")
-            return int(totalExpense)
+            return expense[int(month) - 1]
+
+    def yearlyIncomeExpense(self, year=None):
+        '''
+        Function that returns the total income and expense of each month of an year using a single query on the monthly rollup.
+        Returns two lists (income, expense) with 12 Money each, index 0 being January.
+        The result is cached per year and only fetched again after a write touches that year.
+        '''
+        if year is None:
+            year = tdy().strftime('%Y')
+        year = str(year)
+
+        if year in _yearlyCache:
+            return _yearlyCache[year]
+
+        cursor = self.conn.execute('''
+            SELECT month, type, SUM(total) AS total
+            FROM monthly_totals
+            WHERE year = ?
+            GROUP BY month, type;''', (int(year),))
+
+        income = [Money()] * 12
+        expense = [Money()] * 12
+        for row in cursor.fetchall():
+            if row['type'] == 'income':
+                income[int(row['month']) - 1] = Money.fromCents(row['total'])
+            elif row['type'] == 'expense':
+                expense[int(row['month']) - 1] = Money.fromCents(row['total'])
+
+        _yearlyCache[year] = (income, expense)
+        return income, expense
+
+    def changeScope(self, selectedIDs):
+        '''
+        Function that returns the dates and types of the given transactions, as two sets.
+        Read before a write, so the change that is published also covers the values the transactions had.
+        '''
+        ids = [int(i) for i in selectedIDs]
+        dates = set()
+        types = set()
+        for chunk in chunked(ids):
+            placeholders = ','.join('?' * len(chunk))
+            cursor = self.conn.execute(f'SELECT DISTINCT date, type FROM TRANSACTIONS WHERE ID IN ({placeholders});', chunk)
+            for row in cursor.fetchall():
+                dates.add(row['date'])
+                types.add(row['type'])
+        return dates, types
+
+    def executeForIDs(self, sql, selectedIDs, params=(), refreshFingerprints=False):
+        '''
+        Function to run a statement ending with "WHERE ID IN ({})" on all the given transactions.
+        The ids are sent in chunks below SQLite's parameter limit and all the chunks are run in one transaction,
+        so editing thousands of transactions costs a single commit.
+        'refreshFingerprints' computes the fingerprints of the transactions again, for edits of the columns they are made of.
+        '''
+        ids = [int(i) for i in selectedIDs]
+        with self.conn:  # Commits once at the end, or rolls back everything if a chunk fails
+            for chunk in chunked(ids):
+                placeholders = ','.join('?' * len(chunk))
+                self.conn.execute(sql.format(placeholders), (*params, *chunk))
+                if refreshFingerprints:
+                    self.conn.execute(f'''UPDATE TRANSACTIONS
+                        SET FINGERPRINT = fingerprint(amount, type, date, description, account_id)
+                        WHERE ID IN ({placeholders});''', chunk)
 
     def categories(self, type):
         '''
         Function to fetch the categories according to transaction type.
+        Read from the cache of names, the table is only read the first time.
+        '''
+        return _categories.names(self.conn, type)
+
+    def categoriesByUse(self, type, months=CATEGORY_USAGE_MONTHS):
+        '''
+        Function to fetch the categories of a type, the ones with the most transactions in the last 'months' months first.
+        The counts are read from the monthly rollup, whose primary key starts with (year, month),
+        so only the rows of those months are read. The categories not used in them follow in the order they were added.
+        '''
+        today = tdy()
+        first = today.year * 12 + today.month - 1 - (months - 1)  # First month counted, as a number of months
+        cursor = self.conn.execute('''SELECT category_id, SUM(count) AS uses FROM monthly_totals
+            WHERE (year, month) >= (?, ?) AND type = ? AND category_id != 0
+            GROUP BY category_id;''', (first // 12, first % 12 + 1, type))
+        uses = {_categories.name(self.conn, row['category_id']): row['uses'] for row in cursor.fetchall()}
+        names = self.categories(type)
+        return sorted(names, key=lambda name: -uses.get(name, 0))  # sorted() keeps the order of the ties
+
+    def accounts(self):
+        '''
+        Function to fetch the names of the accounts, in the order they were added.
+        '''
+        return _accounts.names(self.conn)
+
+    def categoryID(self, name, type):
+        '''
+        Function that returns the id of a category of a type, adding the category if it does not exist yet.
+        '''
+        return _categories.id(self.conn, name, type)
+
+    def accountID(self, name):
+        '''
+        Function that returns the id of an account, adding the account if it does not exist yet.
+        '''
+        return _accounts.id(self.conn, name)
+
+    def withNames(self, rows):
+        '''
+        Function that returns the rows as dicts with the names of their category and account added
+        ("category" and "account"), looked up in the caches of names instead of joined in the query.
+        '''
+        named = []
+        for row in rows:
+            row = dict(row)
+            if 'category_id' in row:
+                row['category'] = _categories.name(self.conn, row['category_id'])
+            if 'account_id' in row:
+                row['account'] = _accounts.name(self.conn, row['account_id'])
+            named.append(row)
+        return named
+
+    def renameCategory(self, name, type, newName):
+        '''
+        Function to rename a category of a type. Only the row of the category is changed, the transactions keep its id
+        (the search index is updated by a trigger). Raises ValueError if the type already has a category with that name.
+        '''
+        try:
+            with self.conn:
+                categoryID = _categories.rename(self.conn, newName, name, type)
+        except Exception:
+            forgetNames()
+            raise
+        ChangeBus().publish(DataChange('update', (), self.lastDates('category_id', categoryID), [type], ['category']))
+
+    def renameAccount(self, name, newName):
         '''
-        cursor = self.conn.execute(f'SELECT * FROM CATEGORIES WHERE type = ?;', (type,))
-        categoriesFetched = cursor.fetchall()
-        categoryList = []
-        for row in categoriesFetched:
-            categoryList.append(row['name'])
-        return categoryList
+        Function to rename an account. Only the row of the account is changed, the transactions keep its id.
+        The fingerprints of its transactions do not change, since they are made of the id of the account.
+        Raises ValueError if there is already an account with that name.
+        '''
+        try:
+            with self.conn:
+                accountID = _accounts.rename(self.conn, newName, name)
+        except Exception:
+            forgetNames()
+            raise
+        ChangeBus().publish(DataChange('update', (), self.lastDates('account_id', accountID), ['income', 'expense'], ['account']))
+
+    def lastDates(self, column, rowID):
+        '''
+        Function that returns the end of the last month that has transactions of a category or an account ('yyyy-mm-31'),
+        read from the monthly rollup, as the dates of the change published when it is renamed.
+        '''
+        cursor = self.conn.execute(f'''SELECT printf('%04d-%02d-31', year, month) FROM monthly_totals
+            WHERE {column} = ? ORDER BY year DESC, month DESC LIMIT 1;''', (rowID,))
+        return [row[0] for row in cursor.fetchall()]
 
     def getType(self, selectedIDs):
         '''
-        Function to fetch all the available types from the database.
+        Function to fetch the type of the first of the selected transactions.
         '''
-        for i in selectedIDs:
-            cursor = self.conn.execute(f'SELECT TYPE FROM TRANSACTIONS WHERE ID = {int(i)};')
-            data = cursor.fetchall()
-            for i in data:
-                type = i['type']
-                return type
+        if not selectedIDs:
+            return None
+        cursor = self.conn.execute('SELECT TYPE FROM TRANSACTIONS WHERE ID = ?;', (int(selectedIDs[0]),))
+        row = cursor.fetchone()
+        if row is not None:
+            return row['type']
 
     def addTransactionToDB(self, amount, IorE, category, date, description, account):
         '''
-        Function to add a transaction into the database.
+        Function to add a transaction into the database. 'amount' is a Money.
+        The category and the account are given by name, and added to their tables if they are new.
         '''
         self.cursor = self.conn.cursor()
-        self.cursor.execute('INSERT INTO TRANSACTIONS (amount, type, category, date, description, account) VALUES (?,?,?,?,?,?)', (amount, IorE, category, date, description, account))
-        self.conn.commit()
+        try:
+            accountID = self.accountID(account)
+            self.cursor.execute('INSERT INTO TRANSACTIONS (amount, type, category_id, date, description, account_id, fingerprint) VALUES (?,?,?,?,?,?,?)',
+                                (amount, IorE, self.categoryID(category, IorE), date, description, accountID,
+                                 fingerprint(amount, IorE, date, description, accountID)))
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            forgetNames()
+            raise
+        ChangeBus().publish(DataChange('insert', [self.cursor.lastrowid], [date], [IorE]))
         print('DONE')
 
-    def transactionHistory(self, sortedTo):
+    def addRecurringRule(self, amount, IorE, category, startDate, description, account, frequency, interval=1, endDate=None):
         '''
-        Function to fetch all the transaction history according to sorting option selected or my deafult most recent.
-        This function is used only by the history window.
+        Function to add a recurring transaction, repeated every 'interval' days, weeks or months ('frequency' is "daily",
+        "weekly" or "monthly") from 'startDate' until 'endDate' (None for no end). 'amount' is a Money.
+        Only the rule is added, its transactions are added by materializeRecurring. Returns the id of the rule.
+        Raises ValueError if the frequency is unknown or the end date is before the start date.
         '''
+        if frequency not in FREQUENCIES:
+            raise ValueError(f'"{frequency}" is not a frequency')
+        if endDate is not None and endDate < startDate:
+            raise ValueError('The end date is before the start date')
         self.cursor = self.conn.cursor()
-        if sortedTo == 'Date ASC':
-            code = self.cursor.execute('SELECT * FROM TRANSACTIONS ORDER BY DATE ASC;')
+        try:
+            self.cursor.execute('''INSERT INTO RECURRING_RULES
+                (amount, type, category_id, description, account_id, frequency, interval, start_date, end_date, next_due)
+                VALUES (?,?,?,?,?,?,?,?,?,?)''',
+                (amount, IorE, self.categoryID(category, IorE), description, self.accountID(account), frequency, interval,
+                 startDate, endDate, nextDue(frequency, interval, startDate, endDate, 0)))
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            forgetNames()
+            raise
+        return self.cursor.lastrowid
 
-        elif sortedTo == 'Date DESC':
-            code = self.cursor.execute('SELECT * FROM TRANSACTIONS ORDER BY DATE DESC;')
+    def materializeRecurring(self, today=None):
+        '''
+        Function to add the transactions of the recurring rules that are due on or before 'today' ('yyyy-mm-dd', today by default),
+        every one missed since the program last ran, in a single transaction. Returns the number of transactions added.
+        The rules are read through the index on next_due, so only the due rules are read.
+        The transactions and the new next_due of their rules are committed together, and the write lock is taken
+        before the rules are read, so running it again (or twice at once) never adds a transaction twice.
+        '''
+        today = today or tdy().strftime('%Y-%m-%d')
+        added = []  # (rule id, date)
+        advanced = []  # (occurrences, next_due, rule id)
+        types = set()
+        try:
+            self.conn.execute('BEGIN IMMEDIATE;')
+            rules = self.conn.execute('SELECT * FROM RECURRING_RULES WHERE NEXT_DUE <= ? ORDER BY NEXT_DUE;', (today,)).fetchall()
+            for rule in rules:
+                dates, (occurrences, due) = dueDates(rule, today)
+                added.extend((rule['id'], d) for d in dates)
+                advanced.append((occurrences, due, rule['id']))
+                types.add(rule['type'])
+            self.conn.executemany('''INSERT INTO TRANSACTIONS (amount, type, category_id, date, description, account_id, fingerprint)
+                SELECT amount, type, category_id, ?2, description, account_id,
+                       fingerprint(amount, type, ?2, description, account_id)
+                FROM RECURRING_RULES WHERE ID = ?1;''', added)
+            self.conn.executemany('UPDATE RECURRING_RULES SET OCCURRENCES = ?, NEXT_DUE = ? WHERE ID = ?;', advanced)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        if added:
+            ChangeBus().publish(DataChange('insert', (), {d for _, d in added}, types))
+        return len(added)
+
+    def findDuplicates(self, amount, IorE, date, description, account):
+        '''
+        Function that returns the transactions that have the same fingerprint as the given one
+        (same date, amount, type, account and description ignoring case, spaces and punctuation).
+        '''
+        accountID = _accounts.find(self.conn, account)
+        if account and accountID is None:
+            return []  # An account that does not exist yet has no transactions
+        cursor = self.conn.execute('SELECT * FROM TRANSACTIONS WHERE FINGERPRINT = ?;', (fingerprint(amount, IorE, date, description, accountID),))
+        return self.withNames(cursor.fetchall())
 
-        elif sortedTo == 'Created ASC':
-            code = self.cursor.execute('SELECT * FROM TRANSACTIONS ORDER BY CREATED_AT ASC;')
+    def possibleDuplicates(self, limit=100):
+        '''
+        Function that returns pairs of transactions that could be the same one, from the possible_duplicates view:
+        same type, amount and account with dates at most 3 days apart. "exact" is 1 when the fingerprints are equal.
+        '''
+        cursor = self.conn.execute('SELECT * FROM possible_duplicates ORDER BY exact DESC, date DESC LIMIT ?;', (limit,))
+        return self.withNames(cursor.fetchall())
 
-        elif sortedTo == 'Created DESC':
-            code = self.cursor.execute('SELECT * FROM TRANSACTIONS ORDER BY CREATED_AT DESC;')
+    def beginBulkInsert(self, expectedRows=0):
+        '''
+        Function to start inserting many transactions with 'bulkInsert', all of them in a single transaction of the database.
+        Nothing is visible to the rest of the program until 'endBulkInsert', and 'cancelBulkInsert' undoes everything.
+        If the transactions expected are many compared to the ones already in the table, the indexes and the triggers
+        of the table are dropped and created again at the end, since building an index once is much faster than
+        updating it for every inserted transaction.
+        '''
+        self.conn.execute('BEGIN IMMEDIATE;')
+        self.bulkFirstID = self.conn.execute('SELECT IFNULL(MAX(ID), 0) FROM TRANSACTIONS;').fetchone()[0]
+        self.bulkDates = set()
+        self.bulkTypes = set()
+        self.bulkDropped = []
+        self.bulkExisting = {}  # Number of transactions of each fingerprint that were in the table before the insert
+        self.bulkSeen = {}  # Number of transactions of each fingerprint given to bulkInsert
+
+        existingRows = self.conn.execute('SELECT COUNT(*) FROM TRANSACTIONS;').fetchone()[0]
+        # The indexes are dropped when the first transaction is actually inserted, an import of duplicates changes nothing
+        self.bulkDropPending = expectedRows >= BULK_LOAD_MIN_ROWS and expectedRows * 3 >= existingRows
+
+    def dropForBulkInsert(self):
+        '''
+        Function to drop the indexes (except BULK_LOAD_KEPT) and the triggers of the transactions table for a bulk insert.
+        What is dropped is kept in 'bulkDropped' so that 'endBulkInsert' creates it again.
+        '''
+        self.bulkDropPending = False
+        self.bulkDropped = self.conn.execute('''
+            SELECT type, name, sql FROM sqlite_master
+            WHERE tbl_name = 'transactions' AND type IN ('index', 'trigger') AND sql IS NOT NULL;''').fetchall()
+        self.bulkDropped = [row for row in self.bulkDropped if row[1] not in BULK_LOAD_KEPT]
+        for objectType, name, sql in self.bulkDropped:
+            self.conn.execute(f'DROP {objectType.upper()} {name};')
+
+    def bulkInsert(self, transactions, skipDuplicates=True):
+        '''
+        Function to add many transactions into the database with one statement, between 'beginBulkInsert' and 'endBulkInsert'.
+        'transactions' is a list of (amount, type, category, date, description, account), the amount being a Money.
+        With 'skipDuplicates', a transaction is not inserted if the table already had one with the same fingerprint.
+        The same fingerprint several times is inserted as many times as it is given beyond the ones already in the table,
+        so two identical purchases on the same statement are both kept, and importing that statement again adds nothing.
+        Returns the number of transactions skipped as duplicates.
+        '''
+        # The names of the categories and accounts replaced by their ids, the fingerprint is made of the id of the account
+        rows = [(t[0], t[1], self.categoryID(t[2], t[1]), t[3], t[4], accountID, fingerprint(t[0], t[1], t[3], t[4], accountID))
+                for t, accountID in ((t, self.accountID(t[5])) for t in transactions)]
+
+        if skipDuplicates:
+            unknown = list({row[6] for row in rows if row[6] not in self.bulkExisting})
+            for chunk in chunked(unknown):
+                placeholders = ','.join('?' * len(chunk))
+                cursor = self.conn.execute(f'''SELECT FINGERPRINT, COUNT(*) FROM TRANSACTIONS
+                    WHERE FINGERPRINT IN ({placeholders}) AND ID <= ? GROUP BY FINGERPRINT;''', (*chunk, self.bulkFirstID))
+                self.bulkExisting.update(cursor.fetchall())
+            kept = []
+            for row in rows:
+                seen = self.bulkSeen.get(row[6], 0) + 1
+                self.bulkSeen[row[6]] = seen
+                if seen > self.bulkExisting.get(row[6], 0):
+                    kept.append(row)
+            skipped = len(rows) - len(kept)
+            rows = kept
+        else:
+            skipped = 0
 
-        elif sortedTo == 'Amount H->L':
-            code = self.cursor.execute('SELECT * FROM TRANSACTIONS ORDER BY AMOUNT DESC;')
+        if rows and self.bulkDropPending:
+            self.dropForBulkInsert()
+        self.conn.executemany('INSERT INTO TRANSACTIONS (amount, type, category_id, date, description, account_id, fingerprint) VALUES (?,?,?,?,?,?,?)', rows)
+        self.bulkDates.update(row[3] for row in rows)
+        self.bulkTypes.update(row[1] for row in rows)
+        return skipped
 
-        elif sortedTo == 'Amount L->H':
-            code = self.cursor.execute('SELECT * FROM TRANSACTIONS ORDER BY AMOUNT ASC;')
+    def endBulkInsert(self):
+        '''
+        Function to finish the inserts started with 'beginBulkInsert'.
+        Creates again what was dropped (with the statistics of the indexes), adds the new transactions to the monthly
+        rollup and to the search index if their triggers were dropped, then commits and publishes the change.
+        '''
+        try:
+            for objectType, name, sql in self.bulkDropped:
+                self.conn.execute(sql)
+            if any(name == 'monthly_totals_insert' for objectType, name, sql in self.bulkDropped):
+                addToMonthlyTotals(self.conn, self.bulkFirstID)
+            if any(name == 'transactions_fts_insert' for objectType, name, sql in self.bulkDropped):
+                addToSearchIndex(self.conn, self.bulkFirstID)
+            if self.bulkDropped:
+                self.conn.execute('ANALYZE transactions;')  # Dropping the indexes dropped their statistics for the query planner
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            forgetNames()
+            raise
+        ChangeBus().publish(DataChange('insert', (), self.bulkDates, self.bulkTypes))
 
-        elif sortedTo == 'Income -> Expense':
-            code = self.cursor.execute('SELECT * FROM TRANSACTIONS ORDER BY TYPE DESC;')
+    def cancelBulkInsert(self):
+        '''
+        Function to undo everything inserted since 'beginBulkInsert'.
+        '''
+        self.conn.rollback()
+        forgetNames()
 
-        elif sortedTo == 'Expense -> Income':
-            code = self.cursor.execute('SELECT * FROM TRANSACTIONS ORDER BY TYPE ASC;')
+    def transactionHistory(self, sortedTo):
+        '''
+        Function to fetch all the transaction history according to sorting option selected or my deafult most recent.
+        Fetches everything at once, the windows use 'transactionHistoryPage' or 'iterTransactionHistory' instead.
+        '''
+        return list(self.iterTransactionHistory(sortedTo))
 
-        self.data = code.fetchall()
-        return self.data
+    def transactionHistoryPage(self, sortedTo, pageSize, after=None, transactionType=None, filters=None):
+        '''
+        Function to fetch one page of the transaction history according to the sorting option selected.
+        'after' is the position (from pageCursor) of the last transaction of the previous page, or None for the first page.
+        'transactionType' limits the page to "income" or "expense" transactions, None for both.
+        'filters' is a TransactionFilter (data/filters.py) whose conditions are added to the query, or None.
+        The rows are dicts with the names of their category and account (see withNames),
+        their amounts are in cents, Money.fromCents turns them into Money.
+        The page starts right after that position using the index of the sorted column (keyset pagination),
+        so every page costs the same no matter how far the user has scrolled.
+        '''
+        column, direction = SORT_OPTIONS[sortedTo]
+        conditions = []
+        params = []
+        if transactionType is not None:
+            conditions.append('TYPE = ?')
+            params.append(transactionType)
+        if filters is not None:
+            filterConditions, filterParams = filters.conditions('')
+            conditions.extend(filterConditions)
+            params.extend(filterParams)
+        if after is not None:
+            comparison = '<' if direction == 'DESC' else '>'
+            conditions.append(f'({column}, ID) {comparison} (?, ?)')
+            params.extend(after)
+        params.append(pageSize)
+
+        where = f'WHERE {" AND ".join(conditions)}' if conditions else ''
+        cursor = self.conn.execute(f'SELECT * FROM TRANSACTIONS {where} ORDER BY {column} {direction}, ID {direction} LIMIT ?;', params)
+        return self.withNames(cursor.fetchall())
+
+    def search(self, text, pageSize, after=None, transactionType=None, filters=None):
+        '''
+        Function to fetch one page of the transactions whose description, category or account match the text typed.
+        Every word must match, the last one as a prefix (see data/search.matchQuery).
+        'after' is the position (from searchCursor) of the last transaction of the previous page, or None for the first page.
+        'transactionType' limits the page to "income" or "expense" transactions, None for both.
+        'filters' is a TransactionFilter (data/filters.py) whose conditions are added to the query, or None.
+        The best matches come first (the "rank" column of the rows, lower is better). Ranking has to score every match,
+        so a search matching more than RANKED_SEARCH_LIMIT transactions (a word or two letters found almost everywhere)
+        lists the newest matches first instead, which the index gives without scoring, and "rank" is None.
+        '''
+        query = matchQuery(text)
+        if query is None:
+            return []
+        if after is None:
+            cursor = self.conn.execute('SELECT COUNT(*) FROM transactions_fts WHERE transactions_fts MATCH ?;', (query,))
+            ranked = cursor.fetchone()[0] <= RANKED_SEARCH_LIMIT
+        else:
+            ranked = after[0] is not None  # Same order as the first page
+
+        conditions = []
+        params = [query]
+        if transactionType is not None:
+            conditions.append('t.TYPE = ?')
+            params.append(transactionType)
+        if filters is not None:
+            filterConditions, filterParams = filters.conditions('t.')
+            conditions.extend(filterConditions)
+            params.extend(filterParams)
+        if ranked:
+            if after is not None:
+                conditions.append('(f.rank, t.ID) > (?, ?)')
+                params.extend(after)
+            params.append(pageSize)
+            where = f'WHERE {" AND ".join(conditions)}' if conditions else ''
+            cursor = self.conn.execute(f'''
+                SELECT t.*, f.rank AS rank
+                FROM (SELECT rowid, rank FROM transactions_fts WHERE transactions_fts MATCH ?) AS f
+                JOIN TRANSACTIONS AS t ON t.ID = f.rowid
+                {where}
+                ORDER BY f.rank, t.ID
+                LIMIT ?;''', params)
+        else:
+            if after is not None:
+                conditions.append('f.rowid < ?')
+                params.append(after[1])
+            params.append(pageSize)
+            cursor = self.conn.execute(f'''
+                SELECT t.*, NULL AS rank
+                FROM transactions_fts AS f
+                JOIN TRANSACTIONS AS t ON t.ID = f.rowid
+                WHERE transactions_fts MATCH ? {"".join(" AND " + c for c in conditions)}
+                ORDER BY f.rowid DESC
+                LIMIT ?;''', params)
+        return self.withNames(cursor.fetchall())
+
+    def searchIDs(self, text, transactionType=None, filters=None):
+        '''
+        Function that returns the ids of all the transactions matching the text typed, of a type or of both if None.
+        Used to select every result of a search without fetching them.
+        '''
+        if matchQuery(text) is None:
+            return []
+        filters = filters if filters is not None else TransactionFilter()
+        return self.transactionIDs(transactionType, filters.withText(text))
+
+    def iterTransactionHistory(self, sortedTo, transactionType=None, pageSize=500, filters=None):
+        '''
+        Generator that yields the transactions one by one in the order of the sorting option selected.
+        The transactions are read page by page, so only one page is in memory at a time
+        and no read stays open on the database between two pages.
+        '''
+        after = None
+        while True:
+            page = self.transactionHistoryPage(sortedTo, pageSize, after, transactionType, filters)
+            yield from page
+            if len(page) < pageSize:
+                return
+            after = pageCursor(sortedTo, page[-1])
 
     def editingTransactionHistory(self, sortedTo, transactionType):
         ''''
         Function that fetches all the transactions according to the window that is calling ("Edit Incomes Window", "Edit Expenses Window") and sort option selected.
         Default one being most recent.
+        Fetches everything at once, the windows use 'editingTransactionHistoryPage' instead.
         '''
-        self.cursor = self.conn.cursor()
-        if sortedTo == 'Date ASC':
-            code = self.cursor.execute(f'SELECT * FROM TRANSACTIONS WHERE TYPE = "{transactionType}" ORDER BY DATE ASC;')
-
-        elif sortedTo == 'Date DESC':
-            code = self.cursor.execute(f'SELECT * FROM TRANSACTIONS WHERE TYPE = "{transactionType}" ORDER BY DATE DESC;')
+        return list(self.iterTransactionHistory(sortedTo, transactionType))
 
-        elif sortedTo == 'Created ASC':
-            code = self.cursor.execute(f'SELECT * FROM TRANSACTIONS WHERE TYPE = "{transactionType}" ORDER BY CREATED_AT ASC;')
-
-        elif sortedTo == 'Created DESC':
-            code = self.cursor.execute(f'SELECT * FROM TRANSACTIONS WHERE TYPE = "{transactionType}" ORDER BY CREATED_AT DESC;')
-
-        elif sortedTo == 'Amount H->L':
-            code = self.cursor.execute(f'SELECT * FROM TRANSACTIONS WHERE TYPE = "{transactionType}" ORDER BY AMOUNT DESC;')
+    def editingTransactionHistoryPage(self, sortedTo, transactionType, pageSize, after=None):
+        '''
+        Function to fetch one page of the transactions of one type ("income", "expense") according to the sort option selected.
+        Works the same way as 'transactionHistoryPage'.
+        '''
+        return self.transactionHistoryPage(sortedTo, pageSize, after, transactionType)
 
-        elif sortedTo == 'Amount L->H':
-            code = self.cursor.execute(f'SELECT * FROM TRANSACTIONS WHERE TYPE = "{transactionType}" ORDER BY AMOUNT ASC;')
+    def transactionsByIDs(self, selectedIDs):
+        '''
+        Function to fetch the given transactions, used to refresh only the rows that were edited.
+        '''
+        ids = [int(i) for i in selectedIDs]
+        rows = []
+        for chunk in chunked(ids):
+            placeholders = ','.join('?' * len(chunk))
+            cursor = self.conn.execute(f'SELECT * FROM TRANSACTIONS WHERE ID IN ({placeholders});', chunk)
+            rows.extend(cursor.fetchall())
+        return self.withNames(rows)
 
-        self.data = code.fetchall()
-        return self.data
+    def transactionIDs(self, transactionType=None, filters=None):
+        '''
+        Function that returns the ids of all the transactions of a type ("income", "expense"), or of all of them if None.
+        'filters' is a TransactionFilter (data/filters.py) the transactions must match, or None.
+        Used to select every transaction without fetching them.
+        '''
+        conditions = []
+        params = []
+        if transactionType is not None:
+            conditions.append('TYPE = ?')
+            params.append(transactionType)
+        if filters is not None:
+            filterConditions, filterParams = filters.conditions('')
+            conditions.extend(filterConditions)
+            params.extend(filterParams)
+        where = f'WHERE {" AND ".join(conditions)}' if conditions else ''
+        cursor = self.conn.execute(f'SELECT ID FROM TRANSACTIONS {where};', params)
+        return [row[0] for row in cursor.fetchall()]
+
+    def filterOptions(self, transactionType=None):
+        '''
+        Function that returns the categories and the accounts the transactions have, as two sorted lists,
+        for the filters of the history and edit windows. Read from the monthly rollup, so no transaction is scanned.
+        '''
+        where = 'WHERE type = ?' if transactionType is not None else ''
+        params = (transactionType,) if transactionType is not None else ()
+        categories = {_categories.name(self.conn, row[0]) for row in self.conn.execute(
+            f"SELECT DISTINCT category_id FROM monthly_totals {where};", params)}
+        accounts = {_accounts.name(self.conn, row[0]) for row in self.conn.execute(
+            f"SELECT DISTINCT account_id FROM monthly_totals {where};", params)}
+        return sorted(categories - {None}), sorted(accounts - {None})
 
     def deleteSelected(self, selectedIDs):
         '''
         Function to delete the selected transaction(s) selected in the edit incomes or edit expenses windows.
         '''
-        self.cursor = self.conn.cursor()
-        for i in selectedIDs:
-            code = self.cursor.execute(f'DELETE FROM TRANSACTIONS WHERE ID = {int(i)};')
-            self.conn.commit()
+        dates, types = self.changeScope(selectedIDs)
+        self.executeForIDs('DELETE FROM TRANSACTIONS WHERE ID IN ({});', selectedIDs)
+        ChangeBus().publish(DataChange('delete', selectedIDs, dates, types))
 
     def changeAmount(self,selectedIDs, newAmount):
         '''
         Function to change the amount of the transaction(s) selected in the edit incomes or edit expenses windows.
+        'newAmount' is a Money.
         '''
-        self.cursor = self.conn.cursor()
-        for i in selectedIDs:
-            code = self.cursor.execute(f'UPDATE TRANSACTIONS SET AMOUNT = {newAmount} WHERE ID = {int(i)};')
-            self.conn.commit()
+        dates, types = self.changeScope(selectedIDs)
+        self.executeForIDs('UPDATE TRANSACTIONS SET AMOUNT = ? WHERE ID IN ({});', selectedIDs, (newAmount,), refreshFingerprints=True)
+        ChangeBus().publish(DataChange('update', selectedIDs, dates, types, ['amount']))
 
     def changeType(self, selectedIDs):
         '''
         Function to change the type of the transaction(s) selected in the edit incomes or edit expenses windows.
+        Every selected transaction is flipped to the opposite type with a single UPDATE.
         '''
-        self.cursor = self.conn.cursor()
-        for i in selectedIDs:
-            code = self.cursor.execute(f'SELECT TYPE FROM TRANSACTIONS WHERE ID = {int(i)};')
-            data = code.fetchall()
-            for j in data:
-                oldType = j['type']
-
-            if oldType == 'income':
-                newType = 'expense'
-            else:
-                newType = 'income'
-            code = self.cursor.execute(f'UPDATE TRANSACTIONS SET TYPE = "{newType}" WHERE ID = {int(i)};')
-            self.conn.commit()
+        dates, types = self.changeScope(selectedIDs)
+        self.executeForIDs('''UPDATE TRANSACTIONS
+            SET TYPE = CASE TYPE WHEN 'income' THEN 'expense' ELSE 'income' END
+            WHERE ID IN ({});''', selectedIDs, refreshFingerprints=True)
+        ChangeBus().publish(DataChange('update', selectedIDs, dates, ['income', 'expense'], ['type']))
 
     def changeCategory(self, selectedIDs, newCategory):
         '''
         Function to change the category of the transaction(s) selected in the edit incomes or edit expenses windows.
+        Each transaction gets the category of that name of its own type, added if the type does not have it yet.
         '''
-        self.cursor = self.conn.cursor()
-        for i in selectedIDs:
-            code = self.cursor.execute(f'UPDATE TRANSACTIONS SET CATEGORY = "{newCategory}" WHERE ID = {int(i)};')
-            self.conn.commit()
+        dates, types = self.changeScope(selectedIDs)
+        categoryIDs = {type: self.categoryID(newCategory, type) for type in types}
+        try:
+            self.executeForIDs('''UPDATE TRANSACTIONS
+                SET CATEGORY_ID = CASE TYPE WHEN 'income' THEN ? ELSE ? END
+                WHERE ID IN ({});''', selectedIDs, (categoryIDs.get('income'), categoryIDs.get('expense')))
+        except Exception:
+            forgetNames()
+            raise
+        ChangeBus().publish(DataChange('update', selectedIDs, dates, types, ['category']))
 
     def changeDate(self, selectedIDs, newDate):
         '''
         Function to change the date of the transaction(s) selected in the edit incomes or edit expenses windows.
         '''
-        self.cursor = self.conn.cursor()
-        for i in selectedIDs:
-            code = self.cursor.execute(f'UPDATE TRANSACTIONS SET DATE = "{newDate}" WHERE ID = {int(i)};')
-            self.conn.commit()
+        dates, types = self.changeScope(selectedIDs)
+        self.executeForIDs('UPDATE TRANSACTIONS SET DATE = ? WHERE ID IN ({});', selectedIDs, (newDate,), refreshFingerprints=True)
+        ChangeBus().publish(DataChange('update', selectedIDs, dates | {newDate}, types, ['date']))
 
     def changeDecription(self, selectedIDs, newDecription):
-        self.cursor = self.conn.cursor()
-        for i in selectedIDs:
-            code = self.cursor.execute(f'UPDATE TRANSACTIONS SET DESCRIPTION = "{newDecription}" WHERE ID = {int(i)};')
-            self.conn.commit()
+        '''
+        Function to change the description of the transaction(s) selected in the edit incomes or edit expenses windows.
+        '''
+        dates, types = self.changeScope(selectedIDs)
+        self.executeForIDs('UPDATE TRANSACTIONS SET DESCRIPTION = ? WHERE ID IN ({});', selectedIDs, (newDecription,), refreshFingerprints=True)
+        ChangeBus().publish(DataChange('update', selectedIDs, dates, types, ['description']))
 
     def ReportData(self, year, month):
         '''
         Function that fetches the data from the database for the creation of the report
+        Returns the expenses by category and the total income of the month.
         '''
-        self.cursor = self.conn.cursor()
-        code = self.cursor.execute(f'''SELECT SUM(amount) AS total_income FROM transactions
-        WHERE type = 'income'
-        AND strftime('%Y-%m', date) = '{year}-{month}';''')
-        data = code.fetchall()
-        for i in data:
-            total_income = i['total_income']
-
-        code = self.cursor.execute('''SELECT category, SUM(amount) AS total_of_category FROM transactions
-        WHERE type = 'expense'
-        AND strftime('%Y-%m', date) = '2025-12'
-        GROUP BY category;''')
-
-        data = code.fetchall()
-        categories = []
-        for i in data:
-            categories.append([i["category"], i['total_of_category']])
-        return categories, total_income
+        report = self.monthlyReportData([(year, month)]).get((int(year), int(month)), {})
+        return report.get('categories', []), report.get('income')
+
+    def monthlyReportData(self, months):
+        '''
+        Function that fetches the data of the reports of several months with a single grouped query on the monthly rollup.
+        'months' is a list of (year, month).
+        Returns {(year, month): {'income': total, 'expense': total, 'categories': [[category, total of its expenses]]}}
+        for the months that have transactions, every total being Money.
+        '''
+        months = [(int(year), int(month)) for year, month in months]
+        if not months:
+            return {}
+        wanted = set(months)
+        first = min(months)
+        last = max(months)
+        cursor = self.conn.execute('''
+            SELECT year, month, type, category_id, SUM(total) AS total
+            FROM monthly_totals
+            WHERE year * 100 + month BETWEEN ? AND ?
+            GROUP BY year, month, type, category_id;''', (first[0] * 100 + first[1], last[0] * 100 + last[1]))
+
+        reports = {}
+        expenses = {}  # (year, month): {category name: total}, a name can have an id of each type
+        for row in cursor.fetchall():
+            key = (row['year'], row['month'])
+            if key not in wanted:
+                continue
+            report = reports.setdefault(key, {'income': Money(), 'expense': Money(), 'categories': []})
+            total = Money.fromCents(row['total'])
+            report[row['type']] += total
+            if row['type'] == 'expense':
+                category = _categories.name(self.conn, row['category_id']) or ''
+                monthExpenses = expenses.setdefault(key, {})
+                monthExpenses[category] = monthExpenses.get(category, Money()) + total
+        for key, monthExpenses in expenses.items():
+            reports[key]['categories'] = [[category, total] for category, total in sorted(monthExpenses.items())]
+        return reports
     # Function to close SQLite
     def close(self):
         '''
-        Function to close the connection to the database.
+        Function kept for the callers that close their DBmanager.
+        The connection is shared, so it is not closed here but by ConnectionManager.closeAll when the program exits.
         '''
-        self.conn.close()
\ No newline at end of file
+        pass
\ No newline at end of file
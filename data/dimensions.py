@@ -0,0 +1,123 @@
+'''
+This file contains the categories and the accounts of the transactions (the "categories" and "accounts" tables).
+Since migration 1.8 a transaction stores the ids of its category and account instead of their names,
+so renaming one is a single row of its table. The names are read once into a NameCache and looked up in memory
+when the transactions are shown, instead of being joined in every query.
+'''
+# Importing modules
+import threading
+
+CREATE_ACCOUNTS = '''
+    CREATE TABLE IF NOT EXISTS accounts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL UNIQUE
+    );'''
+
+# Accounts the add transaction window offered before they had a table
+DEFAULT_ACCOUNTS = ['Cash', 'Bank', 'Credit Card']
+
+class NameCache:
+    '''
+    Lookup between the ids and the names of the rows of a table, kept in memory.
+    Include:
+    - name: the name of an id
+    - id: the id of a key, the row being added to the table if it does not exist yet
+    - find: the id of a key, None if the row does not exist
+    - names: the names of the rows, in the order they were added
+    'keyColumns' are the columns that identify a row, ('name', 'type') for the categories since the same name can be
+    a category of both types. The cache is shared by every thread, it is filled from the table the first time it is used
+    and again when an id is not in it (a row added by another connection).
+    '''
+    def __init__(self, table, keyColumns=('name',)):
+        self.table = table
+        self.keyColumns = keyColumns
+        self._names = {}  # id: name
+        self._ids = {}  # key: id
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def load(self, conn):
+        rows = conn.execute(f'SELECT id, {", ".join(self.keyColumns)} FROM {self.table} ORDER BY id;').fetchall()
+        with self._lock:
+            self._names = {row[0]: row[1] for row in rows}
+            self._ids = {tuple(row[1:]): row[0] for row in rows}
+            self._loaded = True
+
+    def forget(self):
+        '''
+        Function to empty the cache, after a rollback undid rows it had added.
+        '''
+        with self._lock:
+            self._names = {}
+            self._ids = {}
+            self._loaded = False
+
+    def name(self, conn, rowID):
+        '''
+        Function that returns the name of an id, or None for no id (None, or 0 in the monthly rollup).
+        '''
+        if not rowID:
+            return None
+        if rowID not in self._names:
+            self.load(conn)
+        return self._names.get(rowID)
+
+    def id(self, conn, *key):
+        '''
+        Function that returns the id of the row with the given key, adding the row if there is none.
+        The row is added in the current transaction of the connection and committed with it.
+        Returns None if the name is empty.
+        '''
+        if not key[0]:
+            return None
+        if not self._loaded:
+            self.load(conn)
+        rowID = self._ids.get(key)
+        if rowID is None:
+            columns = ', '.join(self.keyColumns)
+            conn.execute(f'INSERT OR IGNORE INTO {self.table} ({columns}) VALUES ({", ".join("?" * len(key))});', key)
+            condition = ' AND '.join(f'{column} = ?' for column in self.keyColumns)
+            rowID = conn.execute(f'SELECT id FROM {self.table} WHERE {condition};', key).fetchone()[0]
+            with self._lock:
+                self._names[rowID] = key[0]
+                self._ids[key] = rowID
+        return rowID
+
+    def find(self, conn, *key):
+        '''
+        Function that returns the id of the row with the given key, or None if there is none (nothing is added).
+        '''
+        if not key[0]:
+            return None
+        if key not in self._ids:
+            self.load(conn)
+        return self._ids.get(key)
+
+    def names(self, conn, *rest):
+        '''
+        Function that returns the names of the rows in the order they were added,
+        only the ones whose other key columns are 'rest' if given (the type, for the categories).
+        '''
+        if not self._loaded:
+            self.load(conn)
+        rows = sorted(self._ids.items(), key=lambda item: item[1])
+        return [key[0] for key, rowID in rows if key[1:1 + len(rest)] == rest]
+
+    def rename(self, conn, newName, *key):
+        '''
+        Function to change the name of the row with the given key, in the current transaction of the connection.
+        Returns the id of the row. Raises ValueError if the row does not exist or another row already has that name.
+        '''
+        self.load(conn)
+        rowID = self._ids.get(key)
+        if rowID is None:
+            raise ValueError(f'"{key[0]}" does not exist')
+        newKey = (newName, *key[1:])
+        if newKey in self._ids:
+            raise ValueError(f'"{newName}" already exists')
+        conn.execute(f'UPDATE {self.table} SET name = ? WHERE id = ?;', (newName, rowID))
+        with self._lock:
+            del self._ids[key]
+            self._ids[newKey] = rowID
+            self._names[rowID] = newName
+        return rowID
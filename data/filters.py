@@ -0,0 +1,73 @@
+'''
+This file contains the filters of the history and edit windows.
+A TransactionFilter holds what the user chose (dates, types, categories, accounts, amounts, text) and turns it into
+the conditions of a WHERE clause with "?" parameters, so every filter is done by SQLite, with the indexes,
+and the values typed by the user are never put in the SQL itself.
+'''
+# Importing the search query from another file
+from data.search import matchQuery
+
+class TransactionFilter:
+    '''
+    Filter of the transactions. Every part left to None (or empty) does not filter anything.
+    Includes:
+    - dateFrom, dateTo: first and last dates kept ('yyyy-mm-dd'), both included
+    - types: set of types kept ("income", "expense")
+    - categories: set of the names of the categories kept
+    - accounts: set of the names of the accounts kept
+    - amountMin, amountMax: smallest and largest amounts kept as Money (data/money.py), both included
+    - text: words that must be in the description, category or account (see data/search.matchQuery)
+    '''
+    def __init__(self, dateFrom=None, dateTo=None, types=(), categories=(), accounts=(), amountMin=None, amountMax=None, text=''):
+        self.dateFrom = dateFrom
+        self.dateTo = dateTo
+        self.types = set(types)
+        self.categories = set(categories)
+        self.accounts = set(accounts)
+        self.amountMin = amountMin
+        self.amountMax = amountMax
+        self.text = text
+
+    def withText(self, text):
+        '''
+        Function that returns a copy of the filter searching the given text.
+        '''
+        return TransactionFilter(self.dateFrom, self.dateTo, self.types, self.categories, self.accounts,
+                                 self.amountMin, self.amountMax, text)
+
+    def isEmpty(self):
+        return not self.conditions('')[0]
+
+    def conditions(self, table='t.'):
+        '''
+        Function that returns the conditions of the filter as (list of SQL conditions, list of parameters).
+        'table' is put before the columns, for the queries that join the transactions with another table.
+        The conditions are joined with AND by the caller, after its own conditions.
+        '''
+        conditions = []
+        params = []
+        if self.dateFrom is not None:
+            conditions.append(f'{table}DATE >= ?')
+            params.append(self.dateFrom)
+        if self.dateTo is not None:
+            conditions.append(f'{table}DATE <= ?')
+            params.append(self.dateTo)
+        if self.types:
+            conditions.append(f'{table}TYPE IN ({",".join("?" * len(self.types))})')
+            params.extend(sorted(self.types))
+        # The categories and accounts are chosen by name, the ids of those names are looked up once by SQLite
+        for column, dimension, names in (('CATEGORY_ID', 'categories', self.categories), ('ACCOUNT_ID', 'accounts', self.accounts)):
+            if names:
+                conditions.append(f'{table}{column} IN (SELECT id FROM {dimension} WHERE name IN ({",".join("?" * len(names))}))')
+                params.extend(sorted(names))
+        if self.amountMin is not None:
+            conditions.append(f'{table}AMOUNT >= ?')
+            params.append(self.amountMin)
+        if self.amountMax is not None:
+            conditions.append(f'{table}AMOUNT <= ?')
+            params.append(self.amountMax)
+        query = matchQuery(self.text)
+        if query is not None:
+            conditions.append(f'{table}ID IN (SELECT rowid FROM transactions_fts WHERE transactions_fts MATCH ?)')
+            params.append(query)
+        return conditions, params
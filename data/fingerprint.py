@@ -0,0 +1,40 @@
+'''
+This file contains the fingerprint of a transaction, used to find duplicates.
+Two transactions with the same date, amount, type, account and description (ignoring case, spaces and punctuation)
+have the same fingerprint. The fingerprint is a 64 bit number stored in an indexed column of the transactions,
+so checking if a transaction already exists is a single index lookup no matter how many transactions there are.
+'''
+# Importing modules
+import hashlib
+import re
+
+# Importing the amounts from another file
+from data.money import Money
+
+# Everything that is not a letter or a digit, removed from the descriptions before comparing them
+NOT_ALPHANUMERIC = re.compile(r'[\W_]+')
+
+def normalizeDescription(description):
+    '''
+    Function that returns the description in the form used for the fingerprint, lowercase without spaces and punctuation.
+    '''
+    return NOT_ALPHANUMERIC.sub('', (description or '').lower())
+
+def fingerprint(amount, type, date, description, account):
+    '''
+    Function that returns the fingerprint of a transaction as a signed 64 bit number (the size of a SQLite integer).
+    'amount' is a Money, or the amount column when called from SQL: whole cents, or a REAL amount before migration 1.7.
+    'account' is the id of the account, or its name before migration 1.8, so renaming an account keeps the fingerprints.
+    '''
+    account = '' if account is None else str(account).strip().lower()
+    if not isinstance(amount, Money):
+        amount = Money(amount) if isinstance(amount, int) else Money.of(amount)
+    key = f'{date}|{amount}|{type}|{account}|{normalizeDescription(description)}'
+    digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+def registerFingerprint(conn):
+    '''
+    Function to make fingerprint() usable in the SQL run on the given connection.
+    '''
+    conn.create_function('fingerprint', 5, fingerprint, deterministic=True)
@@ -0,0 +1,87 @@
+'''
+This file contains the monthly rollup and the search index as they were before migration 1.8,
+when the transactions stored the names of their category and account instead of ids.
+Only the old migrations (1.4, 1.6 and 1.7) use them, so a database at an old version is brought up to date
+through the same steps it would have gone through at the time. Never change them, data/rollup.py and
+data/search.py hold the definitions the program uses.
+'''
+# Monthly rollup grouped by the names of the categories and accounts (migration 1.4, INTEGER total since 1.7)
+ROLLUP_TABLE = '''
+    CREATE TABLE IF NOT EXISTS monthly_totals (
+        year INTEGER NOT NULL,
+        month INTEGER NOT NULL,
+        type TEXT NOT NULL,
+        category TEXT NOT NULL,
+        account TEXT NOT NULL,
+        total INTEGER NOT NULL DEFAULT 0,
+        count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (year, month, type, category, account)
+    );'''
+
+_ROLLUP_ADD_NEW = '''
+        INSERT INTO monthly_totals (year, month, type, category, account, total, count)
+        VALUES (CAST(substr(NEW.date, 1, 4) AS INTEGER), CAST(substr(NEW.date, 6, 2) AS INTEGER),
+                NEW.type, IFNULL(NEW.category, ''), IFNULL(NEW.account, ''), NEW.amount, 1)
+        ON CONFLICT (year, month, type, category, account)
+        DO UPDATE SET total = total + excluded.total, count = count + 1;'''
+
+_ROLLUP_OLD_GROUP = '''year = CAST(substr(OLD.date, 1, 4) AS INTEGER) AND month = CAST(substr(OLD.date, 6, 2) AS INTEGER)
+        AND type = OLD.type AND category = IFNULL(OLD.category, '') AND account = IFNULL(OLD.account, '')'''
+_ROLLUP_REMOVE_OLD = f'''
+        UPDATE monthly_totals SET total = total - OLD.amount, count = count - 1
+        WHERE {_ROLLUP_OLD_GROUP};
+        DELETE FROM monthly_totals
+        WHERE {_ROLLUP_OLD_GROUP} AND count <= 0;'''
+
+ROLLUP_TRIGGERS = [
+    f'''CREATE TRIGGER IF NOT EXISTS monthly_totals_insert AFTER INSERT ON transactions
+    BEGIN{_ROLLUP_ADD_NEW}
+    END;''',
+    f'''CREATE TRIGGER IF NOT EXISTS monthly_totals_delete AFTER DELETE ON transactions
+    BEGIN{_ROLLUP_REMOVE_OLD}
+    END;''',
+    f'''CREATE TRIGGER IF NOT EXISTS monthly_totals_update AFTER UPDATE OF amount, type, category, date, account ON transactions
+    BEGIN{_ROLLUP_REMOVE_OLD}{_ROLLUP_ADD_NEW}
+    END;''',
+]
+
+def rebuildMonthlyTotals(conn):
+    '''
+    Function to fill the monthly_totals table grouped by names again from the transactions. Does not commit.
+    '''
+    conn.execute('DELETE FROM monthly_totals;')
+    conn.execute('''
+        INSERT INTO monthly_totals (year, month, type, category, account, total, count)
+        SELECT CAST(substr(date, 1, 4) AS INTEGER), CAST(substr(date, 6, 2) AS INTEGER),
+               type, IFNULL(category, ''), IFNULL(account, ''), SUM(amount), COUNT(*)
+        FROM transactions
+        GROUP BY 1, 2, 3, 4, 5;''')
+
+# Search index reading the names from the transactions table (migration 1.6)
+SEARCH_TABLE = '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+        description, category, account,
+        content = 'transactions', content_rowid = 'id',
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    );'''
+
+_SEARCH_ADD_NEW = '''
+        INSERT INTO transactions_fts (rowid, description, category, account)
+        VALUES (NEW.id, NEW.description, NEW.category, NEW.account);'''
+
+_SEARCH_REMOVE_OLD = '''
+        INSERT INTO transactions_fts (transactions_fts, rowid, description, category, account)
+        VALUES ('delete', OLD.id, OLD.description, OLD.category, OLD.account);'''
+
+SEARCH_TRIGGERS = [
+    f'''CREATE TRIGGER IF NOT EXISTS transactions_fts_insert AFTER INSERT ON transactions
+    BEGIN{_SEARCH_ADD_NEW}
+    END;''',
+    f'''CREATE TRIGGER IF NOT EXISTS transactions_fts_delete AFTER DELETE ON transactions
+    BEGIN{_SEARCH_REMOVE_OLD}
+    END;''',
+    f'''CREATE TRIGGER IF NOT EXISTS transactions_fts_update AFTER UPDATE OF description, category, account ON transactions
+    BEGIN{_SEARCH_REMOVE_OLD}{_SEARCH_ADD_NEW}
+    END;''',
+]
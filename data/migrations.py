@@ -0,0 +1,278 @@
+'''
+This file contains the schema migrations of the database.
+Every migration is tied to a version of the program. The "Version" field in config.json stores the version
+the database was last migrated to, and every migration newer than it is applied in order when the program starts.
+To change the schema, add a new entry at the end of MIGRATIONS with a higher version, never edit an old one.
+'''
+# Importing modules
+import logging
+import re
+import sqlite3
+
+# Importing the database path, the monthly rollup, the search index, the recurring rules, the budgets and the categories and accounts from other files
+from data.database import DB_PATH
+from data import rollup, search, legacySchema, recurring, budgets
+from data.dimensions import CREATE_ACCOUNTS, DEFAULT_ACCOUNTS
+from data.fingerprint import registerFingerprint
+
+log = logging.getLogger(__name__)
+
+'''
+Each migration is (version, description, steps).
+A step is either a SQL statement or a function that takes the connection, for changes that SQL alone can not do.
+'''
+MIGRATIONS = [
+    ('1.1', 'Indexes matching the queries of DBmanager', [
+        # Monthly expense total, report totals and category breakdown (type + date range), covering
+        'CREATE INDEX IF NOT EXISTS idx_transactions_type_date ON transactions (type, date, category, amount);',
+        # Yearly barchart buckets (date range only) and every "ORDER BY date", covering for the barchart
+        'CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions (date, type, amount);',
+        # Sorting by creation time, in the history window and in the edit windows
+        'CREATE INDEX IF NOT EXISTS idx_transactions_created_at ON transactions (created_at);',
+        'CREATE INDEX IF NOT EXISTS idx_transactions_type_created_at ON transactions (type, created_at);',
+        # Sorting by amount, in the history window and in the edit windows
+        'CREATE INDEX IF NOT EXISTS idx_transactions_amount ON transactions (amount);',
+        'CREATE INDEX IF NOT EXISTS idx_transactions_type_amount ON transactions (type, amount);',
+        # Category lists of the add transaction window
+        'CREATE INDEX IF NOT EXISTS idx_categories_type ON categories (type, name);',
+        # Statistics for the query planner so it picks the indexes above
+        'ANALYZE;',
+    ]),
+    ('1.2', 'Indexes for the keyset pagination of the history window', [
+        # "ORDER BY <column>, id" needs an index on the column alone (SQLite adds the id at the end of every index)
+        'CREATE INDEX IF NOT EXISTS idx_transactions_date_id ON transactions (date);',
+        'CREATE INDEX IF NOT EXISTS idx_transactions_type_id ON transactions (type);',
+        'ANALYZE;',
+    ]),
+    ('1.3', 'Index for the keyset pagination of the edit windows', [
+        # Pages of one type sorted by date, the other sorting options already have (type, created_at) and (type, amount)
+        'CREATE INDEX IF NOT EXISTS idx_transactions_type_date_id ON transactions (type, date);',
+        'ANALYZE;',
+    ]),
+    ('1.4', 'Monthly rollup of the transactions kept by triggers', [
+        legacySchema.ROLLUP_TABLE,
+        *legacySchema.ROLLUP_TRIGGERS,
+        legacySchema.rebuildMonthlyTotals,  # Filling the table with the transactions that already exist
+        'ANALYZE;',
+    ]),
+    ('1.5', 'Fingerprints of the transactions to find duplicates', [
+        lambda conn: addColumn(conn, 'transactions', 'fingerprint', 'INTEGER'),
+        registerFingerprint,
+        'UPDATE transactions SET fingerprint = fingerprint(amount, type, date, description, account);',
+        'CREATE INDEX IF NOT EXISTS idx_transactions_fingerprint ON transactions (fingerprint);',
+        # Pairs of transactions that could be the same one: same type, amount and account, dates at most 3 days apart
+        '''CREATE VIEW IF NOT EXISTS possible_duplicates AS
+            SELECT a.id AS id, b.id AS other_id,
+                   a.date AS date, b.date AS other_date,
+                   a.amount AS amount, a.type AS type, a.account AS account,
+                   a.description AS description, b.description AS other_description,
+                   a.fingerprint = b.fingerprint AS exact
+            FROM transactions AS a
+            JOIN transactions AS b
+              ON b.type = a.type AND b.amount = a.amount AND b.id > a.id
+             AND b.date BETWEEN date(a.date, '-3 days') AND date(a.date, '+3 days')
+             AND IFNULL(b.account, '') = IFNULL(a.account, '');''',
+        'ANALYZE;',
+    ]),
+    ('1.6', 'Full-text search of the descriptions, categories and accounts', [
+        legacySchema.SEARCH_TABLE,
+        *legacySchema.SEARCH_TRIGGERS,
+        search.rebuildSearchIndex,  # Indexing the transactions that already exist
+    ]),
+    ('1.7', 'Amounts stored as whole cents', [
+        lambda conn: amountsToCents(conn),
+        'DROP TABLE monthly_totals;',
+        legacySchema.ROLLUP_TABLE,  # With an INTEGER total
+        legacySchema.rebuildMonthlyTotals,
+        registerFingerprint,
+        # Same fingerprints for the amounts that had 2 decimals, computed again for the ones that were rounded
+        'UPDATE transactions SET fingerprint = fingerprint(amount, type, date, description, account);',
+        'ANALYZE;',
+    ]),
+    ('1.8', 'Categories and accounts stored as ids of their tables', [
+        lambda conn: namesToIDs(conn),
+        # Fingerprints made of the id of the account, so renaming an account does not change them
+        registerFingerprint,
+        'UPDATE transactions SET fingerprint = fingerprint(amount, type, date, description, account_id);',
+        # Monthly rollup grouped by the ids
+        'DROP TABLE monthly_totals;',
+        rollup.CREATE_TABLE,
+        *rollup.TRIGGERS,
+        rollup.rebuildMonthlyTotals,
+        # Search index reading the names from their tables
+        'DROP TABLE transactions_fts;',
+        search.CREATE_VIEW,
+        search.CREATE_TABLE,
+        *search.TRIGGERS,
+        search.rebuildSearchIndex,
+        '''CREATE VIEW IF NOT EXISTS possible_duplicates AS
+            SELECT a.id AS id, b.id AS other_id,
+                   a.date AS date, b.date AS other_date,
+                   a.amount AS amount, a.type AS type, a.account_id AS account_id,
+                   a.description AS description, b.description AS other_description,
+                   a.fingerprint = b.fingerprint AS exact
+            FROM transactions AS a
+            JOIN transactions AS b
+              ON b.type = a.type AND b.amount = a.amount AND b.id > a.id
+             AND b.date BETWEEN date(a.date, '-3 days') AND date(a.date, '+3 days')
+             AND IFNULL(b.account_id, 0) = IFNULL(a.account_id, 0);''',
+        'ANALYZE;',
+    ]),
+    ('1.9', 'Recurring transactions', [
+        recurring.CREATE_TABLE,
+        recurring.CREATE_INDEX,
+    ]),
+    ('1.10', 'Budgets of the expense categories', [
+        budgets.CREATE_TABLE,
+    ]),
+    ('1.11', 'One index for each order of the transactions', [
+        # The totals are read from the monthly rollup since 1.4, the wide covering indexes only slowed down every insert.
+        # idx_transactions_date_id (1.2) and idx_transactions_type_date_id (1.3), which end with the id, keep the pages
+        # sorted by date, and idx_transactions_type_id is the start of every (type, ...) index left.
+        'DROP INDEX IF EXISTS idx_transactions_date;',
+        'DROP INDEX IF EXISTS idx_transactions_type_date;',
+        'DROP INDEX IF EXISTS idx_transactions_type_id;',
+        'ANALYZE;',
+    ]),
+]
+
+def addColumn(conn, table, column, definition):
+    '''
+    Function to add a column to a table if it does not have it already (ALTER TABLE has no "IF NOT EXISTS").
+    '''
+    columns = [row[1] for row in conn.execute(f'PRAGMA table_info({table});')]
+    if column not in columns:
+        conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition};')
+
+def rebuildTransactions(conn, changeColumn, values):
+    '''
+    Function to create the transactions table again with changed columns, since SQLite can not change or remove a column.
+    'changeColumn' takes the SQL of the table and returns it with the new columns,
+    'values' gives the SQL of the value copied into each column of the new table ({new column: SQL}, the others are copied as they are).
+    The rows keep their ids and the ids of deleted transactions are not used again. The indexes, triggers and views
+    on the table are dropped first and returned as (type, name, sql), for the caller to create again the ones it wants.
+    '''
+    table = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'transactions';").fetchone()[0]
+    newTable = changeColumn(table)
+    newTable = re.sub(r'^CREATE TABLE\s+"?transactions"?', 'CREATE TABLE transactions_new', newTable, flags=re.IGNORECASE)
+
+    # Views first, then triggers and indexes, since a view can not be dropped while it is in use by the others
+    dependents = conn.execute('''
+        SELECT type, name, sql FROM sqlite_master
+        WHERE sql IS NOT NULL AND (type = 'view' OR (type IN ('index', 'trigger') AND tbl_name = 'transactions'))
+        ORDER BY CASE type WHEN 'view' THEN 0 WHEN 'trigger' THEN 1 ELSE 2 END;''').fetchall()
+    for objectType, name, sql in dependents:
+        conn.execute(f'DROP {objectType.upper()} {name};')
+
+    conn.execute(newTable)
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(transactions_new);')]
+    selected = [values.get(column, column) for column in columns]
+    sequence = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'transactions';").fetchone()
+
+    conn.execute(f'INSERT INTO transactions_new ({", ".join(columns)}) SELECT {", ".join(selected)} FROM transactions;')
+    conn.execute('DROP TABLE transactions;')
+    conn.execute('ALTER TABLE transactions_new RENAME TO transactions;')
+    if sequence is not None:  # Keeping the ids of deleted transactions from being used again
+        conn.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'transactions';", (sequence[0],))
+    return list(reversed(dependents))
+
+def replaceColumn(table, old, new):
+    '''
+    Function that returns the SQL of a table with the definition of a column replaced, 'old' being a regular expression.
+    '''
+    newTable, replaced = re.subn(old, new, table, count=1, flags=re.IGNORECASE)
+    if not replaced:
+        raise RuntimeError(f'The transactions table has no column matching "{old}"')
+    return newTable
+
+def amountsToCents(conn):
+    '''
+    Function to turn the REAL amount column of the transactions into an INTEGER column of cents.
+    The indexes, triggers and views on the table are created again from their SQL,
+    the search index is kept since the ids and the texts do not change.
+    '''
+    dependents = rebuildTransactions(conn, lambda table: replaceColumn(table, r'\bamount\s+REAL\b', 'amount INTEGER'),
+                                     {'amount': 'CAST(ROUND(amount * 100) AS INTEGER)'})
+    for objectType, name, sql in dependents:
+        conn.execute(sql)
+
+def namesToIDs(conn):
+    '''
+    Function to replace the category and account names of the transactions by the ids of their rows
+    in the categories and accounts tables, adding the names that are not in them yet.
+    The indexes are created again on the new columns, the triggers and the views are created by the next steps.
+    '''
+    conn.execute('DELETE FROM categories WHERE id NOT IN (SELECT MIN(id) FROM categories GROUP BY type, name);')
+    conn.execute('DROP INDEX IF EXISTS idx_categories_type;')
+    conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_categories_type_name ON categories (type, name);')
+    conn.execute('''INSERT OR IGNORE INTO categories (name, type)
+        SELECT DISTINCT category, type FROM transactions WHERE category IS NOT NULL AND category != '';''')
+    conn.execute(CREATE_ACCOUNTS)
+    conn.executemany('INSERT OR IGNORE INTO accounts (name) VALUES (?);', [(name,) for name in DEFAULT_ACCOUNTS])
+    conn.execute('''INSERT OR IGNORE INTO accounts (name)
+        SELECT account FROM transactions WHERE account IS NOT NULL AND account != '' GROUP BY account ORDER BY MIN(id);''')
+
+    def changeColumns(table):
+        table = replaceColumn(table, r'\bcategory\s+TEXT\b', 'category_id INTEGER REFERENCES categories (id)')
+        return replaceColumn(table, r'\baccount\s+TEXT\b', 'account_id INTEGER REFERENCES accounts (id)')
+
+    dependents = rebuildTransactions(conn, changeColumns, {
+        'category_id': '(SELECT c.id FROM categories AS c WHERE c.name = transactions.category AND c.type = transactions.type)',
+        'account_id': '(SELECT a.id FROM accounts AS a WHERE a.name = transactions.account)',
+    })
+    for objectType, name, sql in dependents:
+        if objectType == 'index':
+            conn.execute(re.sub(r'\b(category|account)\b', r'\1_id', sql))
+
+def versionTuple(version):
+    '''
+    Function to turn a version string like "1.10" into (1, 10) so that versions compare as numbers.
+    '''
+    return tuple(int(part) for part in str(version).split('.'))
+
+def pendingMigrations(currentVersion):
+    '''
+    Function that returns the migrations that are newer than the given version, in order.
+    '''
+    current = versionTuple(currentVersion)
+    pending = [m for m in MIGRATIONS if versionTuple(m[0]) > current]
+    return sorted(pending, key=lambda m: versionTuple(m[0]))
+
+def applyMigration(conn, migration):
+    '''
+    Function to apply a single migration inside one transaction.
+    If any step fails nothing of the migration is kept.
+    '''
+    version, description, steps = migration
+    conn.execute('BEGIN;')
+    try:
+        for step in steps:
+            if callable(step):
+                step(conn)
+            else:
+                conn.execute(step)
+        conn.execute('COMMIT;')
+    except Exception:
+        conn.execute('ROLLBACK;')
+        raise
+
+def migrate(currentVersion, onMigrated, dbPath=DB_PATH):
+    '''
+    Function to bring the database up to date.
+    1, Takes the version the database is at, as stored in config.json
+    2, Applies every newer migration in order
+    3, Calls onMigrated with the new version after each migration, so it is saved and a failed one is retried on the next start
+    Each migration applied is logged at INFO level, nothing is printed.
+    '''
+    pending = pendingMigrations(currentVersion)
+    if not pending:
+        return
+
+    conn = sqlite3.connect(dbPath, isolation_level=None)  # Transactions are handled in applyMigration
+    try:
+        for migration in pending:
+            applyMigration(conn, migration)
+            onMigrated(migration[0])
+            log.info('Migrated database to %s: %s', migration[0], migration[1])
+    finally:
+        conn.close()
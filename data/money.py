@@ -0,0 +1,112 @@
+'''
+This file contains Money, the type of the amounts of the program.
+An amount is a whole number of cents, so adding amounts is exact (no 0.1 + 0.2 = 0.30000000000000004 drifting into
+the totals), and the database stores it in an INTEGER column (migration 1.7), which SQLite also adds up exactly.
+A Money can be given directly as a parameter of a query, it is stored as its cents.
+'''
+# Importing modules
+import sqlite3
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from functools import total_ordering
+
+CENT = Decimal('0.01')
+
+@total_ordering
+class Money:
+    '''
+    Amount of money, a whole number of cents.
+    Include:
+    - Money(cents) and Money.fromCents for the cents read from the database
+    - Money.of for an amount in currency units, a number or a text like "12.5", rounded to the cent
+    - +, -, comparisons and sum() of amounts, all exact
+    - Formatting like a number: f'{amount:,.2f}' gives "1,234.50", str(amount) gives "1234.50"
+    '''
+    __slots__ = ('cents',)
+
+    def __init__(self, cents=0):
+        if not isinstance(cents, int):
+            raise TypeError('Money takes whole cents, use Money.of for an amount in currency units')
+        self.cents = cents
+
+    @classmethod
+    def fromCents(cls, cents):
+        '''
+        Function that returns the Money of cents read from the database, None (the SUM of no rows) being 0.
+        '''
+        return cls(int(cents or 0))
+
+    @classmethod
+    def of(cls, value):
+        '''
+        Function that returns the Money of an amount in currency units, rounded to the cent (half up).
+        A float is read from its shortest text (12.3 and not 12.2999999...), a text can have spaces around it.
+        Raises ValueError if the value is not a finite amount.
+        '''
+        if isinstance(value, Money):
+            return value
+        if isinstance(value, float):
+            value = repr(value)
+        try:
+            amount = Decimal(str(value).strip())
+        except InvalidOperation:
+            raise ValueError(f'"{value}" is not an amount') from None
+        if not amount.is_finite():
+            raise ValueError(f'"{value}" is not an amount')
+        return cls(int(amount.quantize(CENT, rounding=ROUND_HALF_UP).scaleb(2)))
+
+    def decimal(self):
+        return Decimal(self.cents).scaleb(-2)
+
+    def __add__(self, other):
+        if not isinstance(other, Money):
+            return NotImplemented
+        return Money(self.cents + other.cents)
+
+    def __radd__(self, other):
+        if other == 0:  # sum() starts from 0
+            return self
+        return NotImplemented
+
+    def __sub__(self, other):
+        if not isinstance(other, Money):
+            return NotImplemented
+        return Money(self.cents - other.cents)
+
+    def __neg__(self):
+        return Money(-self.cents)
+
+    def __abs__(self):
+        return Money(abs(self.cents))
+
+    def __bool__(self):
+        return self.cents != 0
+
+    def __eq__(self, other):
+        if not isinstance(other, Money):
+            return NotImplemented
+        return self.cents == other.cents
+
+    def __lt__(self, other):
+        if not isinstance(other, Money):
+            return NotImplemented
+        return self.cents < other.cents
+
+    def __hash__(self):
+        return hash(self.cents)
+
+    def __float__(self):
+        return self.cents / 100
+
+    def __str__(self):
+        return str(self.decimal())
+
+    def __repr__(self):
+        return f"Money('{self}')"
+
+    def __format__(self, spec):
+        if not spec:
+            return str(self)
+        return format(self.decimal(), spec)
+
+# Money given as a parameter of a query is stored as its cents
+sqlite3.register_adapter(Money, lambda money: money.cents)
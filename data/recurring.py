@@ -0,0 +1,72 @@
+'''
+This file contains the recurring transactions (rent, salary, subscriptions), the "recurring_rules" table.
+A rule repeats a transaction every N days, weeks or months from its start date, until its end date if it has one.
+It stores the number of transactions already added for it and the date of the next one (next_due, NULL once it ended),
+so the scheduler only reads the rules that are due, through the index on next_due, however many rules there are.
+DBmanager.materializeRecurring adds every transaction that became due since the program last ran.
+'''
+# Importing modules
+from calendar import monthrange
+from datetime import date, timedelta
+
+# Units of the rules and the text shown for them
+FREQUENCIES = {'daily': 'Days', 'weekly': 'Weeks', 'monthly': 'Months'}
+
+CREATE_TABLE = '''
+    CREATE TABLE IF NOT EXISTS recurring_rules (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        amount INTEGER NOT NULL,
+        type TEXT CHECK(type IN ('income', 'expense')),
+        category_id INTEGER REFERENCES categories (id),
+        description TEXT,
+        account_id INTEGER REFERENCES accounts (id),
+        frequency TEXT NOT NULL CHECK(frequency IN ('daily', 'weekly', 'monthly')),
+        interval INTEGER NOT NULL DEFAULT 1 CHECK(interval >= 1),
+        start_date TEXT NOT NULL,
+        end_date TEXT,
+        occurrences INTEGER NOT NULL DEFAULT 0,
+        next_due TEXT,
+        created_at TEXT NOT NULL DEFAULT (datetime('now'))
+    );'''
+
+# Only the rules that have not ended are in the index
+CREATE_INDEX = '''CREATE INDEX IF NOT EXISTS idx_recurring_rules_next_due ON recurring_rules (next_due)
+    WHERE next_due IS NOT NULL;'''
+
+def occurrence(frequency, interval, startDate, n):
+    '''
+    Function that returns the date of the n-th transaction of a rule ('yyyy-mm-dd'), the first one being n = 0.
+    Monthly rules count the months from the start date and keep its day, or the last day of shorter months
+    (a rule starting on the 31st is on the 28th or 29th in February and on the 31st again in March).
+    '''
+    start = date.fromisoformat(startDate)
+    if frequency == 'daily':
+        return (start + timedelta(days=n * interval)).isoformat()
+    if frequency == 'weekly':
+        return (start + timedelta(weeks=n * interval)).isoformat()
+    months = start.month - 1 + n * interval
+    year, month = start.year + months // 12, months % 12 + 1
+    return date(year, month, min(start.day, monthrange(year, month)[1])).isoformat()
+
+def nextDue(frequency, interval, startDate, endDate, n):
+    '''
+    Function that returns the date of the n-th transaction of a rule, or None if it comes after the end date.
+    '''
+    due = occurrence(frequency, interval, startDate, n)
+    if endDate is not None and due > endDate:
+        return None
+    return due
+
+def dueDates(rule, today):
+    '''
+    Function that returns the dates of the transactions of a rule that are due on or before 'today',
+    and (number of transactions of the rule, next_due) once they are added.
+    '''
+    dates = []
+    n = rule['occurrences']
+    due = rule['next_due']
+    while due is not None and due <= today:
+        dates.append(due)
+        n += 1
+        due = nextDue(rule['frequency'], rule['interval'], rule['start_date'], rule['end_date'], n)
+    return dates, (n, due)
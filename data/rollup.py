@@ -0,0 +1,119 @@
+'''
+This file contains the monthly rollup of the transactions, the "monthly_totals" table.
+It holds the total and the number of transactions of every (year, month, type, category id, account id),
+so the summary card, the barchart and the report read a few rows per month instead of every transaction.
+The table is kept exact by triggers on the transactions table (created by migration 1.4, grouped by ids since 1.8),
+and can be built again from the transactions if it ever drifts:
+    python -m data.rollup          (checks the table and rebuilds it if it does not match)
+    python -m data.rollup --force  (rebuilds it without checking)
+'''
+# Importing modules
+import sys
+
+# Importing the shared connections from another file
+from data.connection import ConnectionManager
+
+# No category or account is stored as 0 instead of NULL, so that every group has a single row (NULLs never conflict)
+# The totals are whole cents, like the amounts of the transactions (migration 1.7)
+CREATE_TABLE = '''
+    CREATE TABLE IF NOT EXISTS monthly_totals (
+        year INTEGER NOT NULL,
+        month INTEGER NOT NULL,
+        type TEXT NOT NULL,
+        category_id INTEGER NOT NULL,
+        account_id INTEGER NOT NULL,
+        total INTEGER NOT NULL DEFAULT 0,
+        count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (year, month, type, category_id, account_id)
+    );'''
+
+# Adding a transaction to its group, creating the group if it does not exist
+_ADD_NEW = '''
+        INSERT INTO monthly_totals (year, month, type, category_id, account_id, total, count)
+        VALUES (CAST(substr(NEW.date, 1, 4) AS INTEGER), CAST(substr(NEW.date, 6, 2) AS INTEGER),
+                NEW.type, IFNULL(NEW.category_id, 0), IFNULL(NEW.account_id, 0), NEW.amount, 1)
+        ON CONFLICT (year, month, type, category_id, account_id)
+        DO UPDATE SET total = total + excluded.total, count = count + 1;'''
+
+# Removing a transaction from its group, and the group once it is empty
+_OLD_GROUP = '''year = CAST(substr(OLD.date, 1, 4) AS INTEGER) AND month = CAST(substr(OLD.date, 6, 2) AS INTEGER)
+        AND type = OLD.type AND category_id = IFNULL(OLD.category_id, 0) AND account_id = IFNULL(OLD.account_id, 0)'''
+_REMOVE_OLD = f'''
+        UPDATE monthly_totals SET total = total - OLD.amount, count = count - 1
+        WHERE {_OLD_GROUP};
+        DELETE FROM monthly_totals
+        WHERE {_OLD_GROUP} AND count <= 0;'''
+
+TRIGGERS = [
+    f'''CREATE TRIGGER IF NOT EXISTS monthly_totals_insert AFTER INSERT ON transactions
+    BEGIN{_ADD_NEW}
+    END;''',
+    f'''CREATE TRIGGER IF NOT EXISTS monthly_totals_delete AFTER DELETE ON transactions
+    BEGIN{_REMOVE_OLD}
+    END;''',
+    # Only the columns of the groups and the amount, so changing a description does not touch the table
+    f'''CREATE TRIGGER IF NOT EXISTS monthly_totals_update AFTER UPDATE OF amount, type, category_id, date, account_id ON transactions
+    BEGIN{_REMOVE_OLD}{_ADD_NEW}
+    END;''',
+]
+
+def groupedTransactions(where=''):
+    '''
+    Function that returns the query of the totals of the transactions, grouped the same way as the table.
+    'where' can limit the transactions that are added up.
+    '''
+    return f'''
+    SELECT CAST(substr(date, 1, 4) AS INTEGER) AS year, CAST(substr(date, 6, 2) AS INTEGER) AS month,
+           type, IFNULL(category_id, 0) AS category_id, IFNULL(account_id, 0) AS account_id,
+           SUM(amount) AS total, COUNT(*) AS count
+    FROM transactions
+    {where}
+    GROUP BY 1, 2, 3, 4, 5'''
+
+def rebuildMonthlyTotals(conn):
+    '''
+    Function to fill the monthly_totals table again from the transactions.
+    Does not commit, so it can run inside a migration or inside "with conn:".
+    '''
+    conn.execute('DELETE FROM monthly_totals;')
+    conn.execute(f'INSERT INTO monthly_totals (year, month, type, category_id, account_id, total, count) {groupedTransactions()};')
+
+def addToMonthlyTotals(conn, afterID):
+    '''
+    Function to add the transactions whose id is above 'afterID' to the monthly_totals table, group by group.
+    Used after a bulk insert that ran without the triggers. Does not commit.
+    '''
+    conn.execute(f'''
+        INSERT INTO monthly_totals (year, month, type, category_id, account_id, total, count)
+        {groupedTransactions('WHERE id > ?')}
+        ON CONFLICT (year, month, type, category_id, account_id)
+        DO UPDATE SET total = total + excluded.total, count = count + excluded.count;''', (afterID,))
+
+def driftedGroups(conn):
+    '''
+    Function that returns the number of groups whose total or count in monthly_totals does not match the transactions.
+    The totals are whole cents, so they are compared exactly.
+    '''
+    actual = 'SELECT year, month, type, category_id, account_id, total, count FROM actual'
+    stored = 'SELECT year, month, type, category_id, account_id, total, count FROM monthly_totals'
+    cursor = conn.execute(f'''
+        WITH actual AS ({groupedTransactions()})
+        SELECT (SELECT COUNT(*) FROM ({actual} EXCEPT {stored}))
+             + (SELECT COUNT(*) FROM ({stored} EXCEPT {actual}));''')
+    return cursor.fetchone()[0]
+
+def main():
+    conn = ConnectionManager().connection()
+    if '--force' not in sys.argv:
+        drifted = driftedGroups(conn)
+        if drifted == 0:
+            print('monthly_totals matches the transactions')
+            return
+        print(f'{drifted} groups of monthly_totals do not match the transactions')
+    with conn:
+        rebuildMonthlyTotals(conn)
+    print('monthly_totals rebuilt')
+    ConnectionManager().closeAll()
+
+if __name__ == '__main__':
+    main()
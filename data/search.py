@@ -0,0 +1,121 @@
+'''
+This file contains the full-text search of the transactions, the "transactions_fts" table.
+It is an FTS5 index of the description, category and account of every transaction, that only stores the index
+and reads the text from the transactions_text view (external content), kept up to date by triggers
+(created by migration 1.6, reading the names of the categories and accounts from their tables since 1.8).
+A search is a lookup in the index instead of a scan of every transaction, ranked by relevance (bm25).
+The index can be built again from the transactions if it ever drifts:
+    python -m data.search
+'''
+# Importing modules
+import re
+
+# Importing the shared connections from another file
+from data.connection import ConnectionManager
+
+# Text of every transaction, with the names of its category and account, that the index reads (since migration 1.8)
+CREATE_VIEW = '''
+    CREATE VIEW IF NOT EXISTS transactions_text AS
+        SELECT t.id AS id, t.description AS description, c.name AS category, a.name AS account,
+               t.category_id AS category_id, t.account_id AS account_id
+        FROM transactions AS t
+        LEFT JOIN categories AS c ON c.id = t.category_id
+        LEFT JOIN accounts AS a ON a.id = t.account_id;'''
+
+# Prefix indexes of 2 and 3 characters so that search-as-you-type ("fo", "foo*") stays fast
+CREATE_TABLE = '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+        description, category, account,
+        content = 'transactions_text', content_rowid = 'id',
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    );'''
+
+def _names(row):
+    '''
+    Function that returns the SQL of the category and account names of the NEW or OLD transaction of a trigger.
+    '''
+    return (f'(SELECT name FROM categories WHERE id = {row}.category_id)',
+            f'(SELECT name FROM accounts WHERE id = {row}.account_id)')
+
+_ADD_NEW = f'''
+        INSERT INTO transactions_fts (rowid, description, category, account)
+        VALUES (NEW.id, NEW.description, {", ".join(_names('NEW'))});'''
+
+_REMOVE_OLD = f'''
+        INSERT INTO transactions_fts (transactions_fts, rowid, description, category, account)
+        VALUES ('delete', OLD.id, OLD.description, {", ".join(_names('OLD'))});'''
+
+def _renamed(column, oldNames):
+    '''
+    Function that returns the statements indexing again the transactions of a renamed category or account:
+    the transactions are removed from the index with the old name ('oldNames' is the SQL of their category and account)
+    and added with the new one. Only the index is written, the transactions keep their ids.
+    '''
+    return f'''
+        INSERT INTO transactions_fts (transactions_fts, rowid, description, category, account)
+        SELECT 'delete', id, description, {oldNames} FROM transactions_text WHERE {column} = OLD.id;
+        INSERT INTO transactions_fts (rowid, description, category, account)
+        SELECT id, description, category, account FROM transactions_text WHERE {column} = NEW.id;'''
+
+TRIGGERS = [
+    f'''CREATE TRIGGER IF NOT EXISTS transactions_fts_insert AFTER INSERT ON transactions
+    BEGIN{_ADD_NEW}
+    END;''',
+    f'''CREATE TRIGGER IF NOT EXISTS transactions_fts_delete AFTER DELETE ON transactions
+    BEGIN{_REMOVE_OLD}
+    END;''',
+    # Only the indexed columns, so changing an amount or a date does not touch the index
+    f'''CREATE TRIGGER IF NOT EXISTS transactions_fts_update AFTER UPDATE OF description, category_id, account_id ON transactions
+    BEGIN{_REMOVE_OLD}{_ADD_NEW}
+    END;''',
+    # Renaming a category or an account is a single row of its table, the index follows
+    f'''CREATE TRIGGER IF NOT EXISTS transactions_fts_category_rename AFTER UPDATE OF name ON categories
+    BEGIN{_renamed('category_id', 'OLD.name, account')}
+    END;''',
+    f'''CREATE TRIGGER IF NOT EXISTS transactions_fts_account_rename AFTER UPDATE OF name ON accounts
+    BEGIN{_renamed('account_id', 'category, OLD.name')}
+    END;''',
+]
+
+# Words of a search, everything that is not a letter or a digit separates them (like the unicode61 tokenizer)
+WORD = re.compile(r'\w+')
+
+def matchQuery(text):
+    '''
+    Function that turns what the user typed into an FTS5 query, or None if there is nothing to search.
+    Every word must match, and the last word is a prefix since the user may still be typing it.
+    The words are quoted, so characters that mean something to FTS5 (", *, -, AND, OR...) are searched as text.
+    '''
+    words = WORD.findall(text or '')
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+def rebuildSearchIndex(conn):
+    '''
+    Function to build the index again from the transactions. Does not commit.
+    '''
+    conn.execute("INSERT INTO transactions_fts (transactions_fts) VALUES ('rebuild');")
+
+def addToSearchIndex(conn, afterID):
+    '''
+    Function to add the transactions whose id is above 'afterID' to the index.
+    Used after a bulk insert that ran without the triggers. Does not commit.
+    '''
+    conn.execute('''
+        INSERT INTO transactions_fts (rowid, description, category, account)
+        SELECT id, description, category, account FROM transactions_text WHERE id > ?;''', (afterID,))
+
+def main():
+    conn = ConnectionManager().connection()
+    with conn:
+        rebuildSearchIndex(conn)
+        conn.execute("INSERT INTO transactions_fts (transactions_fts) VALUES ('optimize');")
+    print('transactions_fts rebuilt')
+    ConnectionManager().closeAll()
+
+if __name__ == '__main__':
+    main()
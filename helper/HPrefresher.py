@@ -5,15 +5,11 @@ The functions inside this file will be called and according to that the informat
 
 
 # Importing GUI elements
-from PySide6.QtWidgets import QLabel
+from PySide6.QtWidgets import QLabel, QProgressBar
 
 # Importing functions from other files
-from data.database import DBmanager
-from helper.barchartMatplotlib import update_bar_chart
 from helper.dateAndTime import greetingText, dateCompare
-
-# json to write and read json files
-import json
+from helper.configStore import ConfigStore
 
 def greetingRefresh(greetingLabel):
     '''
@@ -21,9 +17,7 @@ def greetingRefresh(greetingLabel):
     The greeting will be refreshed according to time when the refresh button is pressed
     or when the user enters the homepage again.
     '''
-    with open('data/config.json', 'r') as f:
-        data = json.load(f)
-        username = data['User'][0]['Name']
+    username = ConfigStore().userName()
 
     greeting = greetingText()
     if greeting[0] == 'G' or greeting[0] == 'W':
@@ -33,25 +27,63 @@ def greetingRefresh(greetingLabel):
         greetingLabel.setStyleSheet('margin-top:0%;')
         greetingLabel.setText(greeting)
 
-def summaryCardRefresher(budgetLabel):
+def fetchHomeData(db, parts):
+    '''
+    Function that reads from the database the data of the given parts of the homepage ("summary", "history", "chart").
+    Run on the background thread with its DBmanager, the homepage then shows the data with the functions below.
+    '''
+    data = {}
+    if 'summary' in parts:
+        data['summary'] = (db.Expense(), db.budgetVariance())
+    if 'history' in parts:
+        data['history'] = db.history()
+    if 'chart' in parts:
+        data['chart'] = db.yearlyIncomeExpense()
+    return data
+
+def summaryCardRefresher(budgetLabel, totalExpense, budgetsLayout, budgetStatuses):
     '''
     Function to refresh the summary card text in the homepage.
-    It refreshes the expenses up until then as well as the budget.
+    It refreshes the expenses up until then as well as the budget, and the budgets of the categories in 'budgetsLayout'.
+    'totalExpense' and 'budgetStatuses' are the "summary" read by fetchHomeData.
     '''
-    with open('data/config.json', 'r') as f:
-        data = json.load(f)
-        budgetRead = data['User'][1]['Budget']
-        currencySuffix = data['CurrencySuffix']
+    config = ConfigStore()
+    budgetRead = config.budget()
+    currencySuffix = config.currencySuffix()
 
-    db = DBmanager()  # Expense from Database to summary card
-    totalExpense = db.Expense()
-
-    budget = f'''Budget: {float(budgetRead):,.2f} {currencySuffix}
-Expense: {totalExpense:,} {currencySuffix}
+    budget = f'''Budget: {budgetRead:,.2f} {currencySuffix}
+Expense: {totalExpense:,.2f} {currencySuffix}
 ─────────────────────────
-Balance: {float(budgetRead) - totalExpense:,.2f} {currencySuffix}'''
+Balance: {budgetRead - totalExpense:,.2f} {currencySuffix}'''
     budgetLabel.setText(budget)
 
+    budgetProgressRefresher(budgetsLayout, budgetStatuses, currencySuffix)
+
+def budgetProgressRefresher(budgetsLayout, budgetStatuses, currencySuffix):
+    '''
+    Function to show how much of the budget of each category was spent this month, one progress bar per category.
+    The bar is red once the budget is overspent.
+    '''
+    clear_layout(budgetsLayout)
+    for status in budgetStatuses:
+        progressBar = QProgressBar()
+        progressBar.setRange(0, 100)
+        progressBar.setValue(min(status.progress(), 100))
+        progressBar.setFormat(f'{status.category}: {status.spent:,.2f} / {status.available:,.2f} {currencySuffix}')
+        progressColorCode = '#c71413' if status.remaining.cents < 0 else '#11b343'
+        progressBar.setStyleSheet(f'''
+                QProgressBar {{
+                    border: 3px solid {progressColorCode};
+                    border-radius: 5px;
+                    font-size: 14px;
+                    text-align: center;
+                    margin-top: 5px;
+                }}
+                QProgressBar::chunk {{
+                    background-color: {progressColorCode};
+                }}''')
+        budgetsLayout.addWidget(progressBar)
+
 def clear_layout(layout):
     '''
     Function to clear layouts before entering the new data
@@ -61,14 +93,13 @@ def clear_layout(layout):
         if item.widget():
             item.widget().deleteLater()
 
-def transactionHistoryRefresher(historyLayout):
+def transactionHistoryRefresher(historyLayout, transactionHistory):
     '''
     Function to refresh the data of recent transactions
+    'transactionHistory' is the "history" read by fetchHomeData.
+    Returns the transactions shown, so the homepage knows which dates they cover.
     '''
     clear_layout(historyLayout)
-    db = DBmanager()  # Expense from Database to history card
-
-    transactionHistory = db.history()  # Transaction history from DB
 
     transactionHistoryDate0 = dateCompare(transactionHistory[0][2])
     transactionHistoryDate1 = dateCompare(transactionHistory[0][2])
@@ -76,9 +107,7 @@ def transactionHistoryRefresher(historyLayout):
     transactionHistoryDate3 = dateCompare(transactionHistory[0][2])
     transactionHistoryDate4 = dateCompare(transactionHistory[0][2])
 
-    with open('data/config.json', 'r') as f:
-        data = json.load(f)
-        currencySuffix = data['CurrencySuffix']
+    currencySuffix = ConfigStore().currencySuffix()
 
     transactionHistory0 = f'''{transactionHistory[0][0]:<30}             {transactionHistory[0][1] + f' {currencySuffix}':>15}
 {transactionHistoryDate0}'''
@@ -145,9 +174,11 @@ def transactionHistoryRefresher(historyLayout):
     historyLayout.addWidget(transactionLabel2)
     historyLayout.addWidget(transactionLabel3)
     historyLayout.addWidget(transactionLabel4)
+    return transactionHistory
 
-def barchartRefresher(plt, figure, canvas):
+def barchartRefresher(chart, values):
     '''
-    Function to refresh the matplotlib barchart
+    Function to refresh the barchart, whatever its backend (see helper/barchart.py).
+    'values' are the "chart" read by fetchHomeData.
     '''
-    update_bar_chart(plt, figure, canvas)
+    chart.setValues(values)
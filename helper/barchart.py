@@ -0,0 +1,40 @@
+'''
+This file chooses the backend of the homepage barchart according to the "ChartBackend" setting.
+- "native": the chart is painted with QPainter (helper/barchartNative.py), nothing else to import
+- "matplotlib": the chart is drawn by matplotlib (helper/barchartMatplotlib.py)
+Both backends give an object with:
+- widget: the widget to add to the layout of the homepage
+- setValues((income, expense)): shows the totals of each month, 12 values each, index 0 being January
+'''
+# Importing modules
+import importlib
+
+# Importing classes from other files
+from helper.configStore import ConfigStore
+
+# Labels of the bars, in the same order as the buckets returned by the database
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+# Colors of the bars
+INCOME_COLOR = '#3e9c35'
+EXPENSE_COLOR = '#c71413'
+
+# Module and class of each backend, the module is only imported when its backend is used
+BACKENDS = {
+    'native': ('helper.barchartNative', 'NativeBarChart'),
+    'matplotlib': ('helper.barchartMatplotlib', 'MatplotlibBarChart'),
+}
+
+def createBarChart():
+    '''
+    Function that creates the barchart with the backend selected in the settings.
+    An unknown backend, or matplotlib when it is not installed, falls back to the native one.
+    '''
+    backend = ConfigStore().chartBackend()
+    moduleName, className = BACKENDS.get(backend, BACKENDS['native'])
+    try:
+        module = importlib.import_module(moduleName)
+    except ImportError:
+        moduleName, className = BACKENDS['native']
+        module = importlib.import_module(moduleName)
+    return getattr(module, className)()
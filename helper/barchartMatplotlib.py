@@ -1,16 +1,15 @@
 '''
 This file is for the creation of a barchart in the homepage and for refereshing it with new data.
+It is the "matplotlib" chart backend, used when it is selected in the settings (see helper/barchart.py).
 '''
 
 # Importing matplotlib modules for the barchart
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 
-# Importing class from other file
-from data.database import DBmanager
-
-# Importing json to read the data from json file
-import json
+# Importing classes from other files
+from helper.configStore import ConfigStore
+from helper.barchart import MONTHS
 
 def initiation():
     '''
@@ -20,52 +19,20 @@ def initiation():
     canvas = FigureCanvas(figure) # Convertion of canvas for Qt widget
     return figure, canvas
 
-def plot_bar_chart(figure, canvas):
+def plot_bar_chart(figure, canvas, values):
     '''
     Function to create the barchart in the homepage.
+    'values' gives the (income, expense) of each month.
     '''
     # Theme data
-    with open('data/config.json', 'r') as f:
-        data = json.load(f)
-        currentTheme = data['CurrentTheme']
-
-        for i in data['Themes']:
-            themeSecondary = i[currentTheme]['Secondary']
-
-            fontConfig = i[currentTheme]['Font']
-
-            font_color1 = fontConfig['font-color1']
+    colors = ConfigStore().themeColors()
+    themeSecondary = colors['Secondary']
+    font_color1 = colors['Font']['font-color1']
 
     # Values for the barchart
-    db = DBmanager()
-    income = {
-        'Jan': db.incomeExpense('01', 'I'),
-        'Feb': db.incomeExpense('02', 'I'),
-        'Mar': db.incomeExpense('03', 'I'),
-        'Apr': db.incomeExpense('04', 'I'),
-        'May': db.incomeExpense('05', 'I'),
-        'Jun': db.incomeExpense('06', 'I'),
-        'Jul': db.incomeExpense('07', 'I'),
-        'Aug': db.incomeExpense('08', 'I'),
-        'Sep': db.incomeExpense('09', 'I'),
-        'Oct': db.incomeExpense('10', 'I'),
-        'Nov': db.incomeExpense('11', 'I'),
-        'Dec': db.incomeExpense('12', 'I')
-    }
-    expense = {
-        'Jan': db.incomeExpense('01', 'E'),
-        'Feb': db.incomeExpense('02', 'E'),
-        'Mar': db.incomeExpense('03', 'E'),
-        'Apr': db.incomeExpense('04', 'E'),
-        'May': db.incomeExpense('05', 'E'),
-        'Jun': db.incomeExpense('06', 'E'),
-        'Jul': db.incomeExpense('07', 'E'),
-        'Aug': db.incomeExpense('08', 'E'),
-        'Sep': db.incomeExpense('09', 'E'),
-        'Oct': db.incomeExpense('10', 'E'),
-        'Nov': db.incomeExpense('11', 'E'),
-        'Dec': db.incomeExpense('12', 'E')
-    }
+    incomeValues, expenseValues = ([float(v) for v in series] for series in values)  # Money to numbers for matplotlib
+    income = dict(zip(MONTHS, incomeValues))
+    expense = dict(zip(MONTHS, expenseValues))
 
     plt = figure.add_subplot()  # <-- Don't use during update
     plt.clear()
@@ -82,53 +49,20 @@ def plot_bar_chart(figure, canvas):
     canvas.draw()
     return plt
 
-def update_bar_chart(plt, figure, canvas):
+def update_bar_chart(plt, figure, canvas, values):
     '''
     Function to update the barchart data.
     This function is identical to 'plot_bar_chart' fucntion with minor changes
     '''
     # Theme data
-    with open('data/config.json', 'r') as f:
-        data = json.load(f)
-        currentTheme = data['CurrentTheme']
-
-        for i in data['Themes']:
-            themeSecondary = i[currentTheme]['Secondary']
-
-            fontConfig = i[currentTheme]['Font']
-
-            font_color1 = fontConfig['font-color1']
+    colors = ConfigStore().themeColors()
+    themeSecondary = colors['Secondary']
+    font_color1 = colors['Font']['font-color1']
 
     plt.clear()
-    db = DBmanager()
-    income = {
-        'Jan': db.incomeExpense('01', 'I'),
-        'Feb': db.incomeExpense('02', 'I'),
-        'Mar': db.incomeExpense('03', 'I'),
-        'Apr': db.incomeExpense('04', 'I'),
-        'May': db.incomeExpense('05', 'I'),
-        'Jun': db.incomeExpense('06', 'I'),
-        'Jul': db.incomeExpense('07', 'I'),
-        'Aug': db.incomeExpense('08', 'I'),
-        'Sep': db.incomeExpense('09', 'I'),
-        'Oct': db.incomeExpense('10', 'I'),
-        'Nov': db.incomeExpense('11', 'I'),
-        'Dec': db.incomeExpense('12', 'I')
-    }
-    expense = {
-        'Jan': db.incomeExpense('01', 'E'),
-        'Feb': db.incomeExpense('02', 'E'),
-        'Mar': db.incomeExpense('03', 'E'),
-        'Apr': db.incomeExpense('04', 'E'),
-        'May': db.incomeExpense('05', 'E'),
-        'Jun': db.incomeExpense('06', 'E'),
-        'Jul': db.incomeExpense('07', 'E'),
-        'Aug': db.incomeExpense('08', 'E'),
-        'Sep': db.incomeExpense('09', 'E'),
-        'Oct': db.incomeExpense('10', 'E'),
-        'Nov': db.incomeExpense('11', 'E'),
-        'Dec': db.incomeExpense('12', 'E')
-    }
+    incomeValues, expenseValues = ([float(v) for v in series] for series in values)  # Money to numbers for matplotlib
+    income = dict(zip(MONTHS, incomeValues))
+    expense = dict(zip(MONTHS, expenseValues))
     plt.bar(income.keys(), income.values(), color='#3e9c35', width=0.8)
     plt.bar(expense.keys(), expense.values(), color='#c71413', width=0.8)
     plt.tick_params(axis='x', colors=font_color1)
@@ -138,4 +72,16 @@ def update_bar_chart(plt, figure, canvas):
     plt.get_yaxis().get_major_formatter().set_scientific(False)  # Scientific notation gone
     figure.patch.set_facecolor(themeSecondary)  # Bg color changed (barchart surround area)
     plt.set_facecolor(themeSecondary)  # (barchart area)
-    canvas.draw_idle()
\ No newline at end of file
+    canvas.draw_idle()
+
+class MatplotlibBarChart:
+    '''
+    The "matplotlib" chart backend (see helper/barchart.py), the barchart drawn by the functions above.
+    '''
+    def __init__(self):
+        self.figure, self.canvas = initiation()
+        self.widget = self.canvas
+        self.plt = plot_bar_chart(self.figure, self.canvas, ([0] * 12, [0] * 12))
+
+    def setValues(self, values):
+        update_bar_chart(self.plt, self.figure, self.canvas, values)
\ No newline at end of file
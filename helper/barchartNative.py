@@ -0,0 +1,158 @@
+'''
+This file contains the homepage barchart painted with QPainter, the "native" chart backend.
+It draws the same chart as the matplotlib backend (income and expense of each month of the year)
+without importing matplotlib or rasterizing a figure, and adds tooltips and an animation when the values change.
+'''
+# Importing GUI elements
+from PySide6.QtWidgets import QWidget, QToolTip
+from PySide6.QtGui import QPainter, QColor, QPen
+from PySide6.QtCore import Qt, QRectF, QPointF, QEvent, QVariantAnimation, QEasingCurve
+
+# Importing from other files
+from helper.barchart import MONTHS, INCOME_COLOR, EXPENSE_COLOR
+from helper.configStore import ConfigStore
+
+def niceStep(value):
+    '''
+    Function that returns the step of the y axis, a 1, 2 or 5 times a power of ten just above the given value.
+    '''
+    if value <= 0:
+        return 1
+    power = 10 ** (len(str(int(value))) - 1)
+    for multiple in (1, 2, 5, 10):
+        if multiple * power >= value:
+            return multiple * power
+    return 10 * power
+
+class NativeBarChart(QWidget):
+    '''
+    Barchart of the income and expense of each month, painted with QPainter.
+    Include:
+    - setValues: shows new totals, the bars move from the old totals to the new ones
+    - Tooltip with the totals of the month under the mouse
+    - Colors of the current theme, read when painting so a theme change only needs a repaint
+    '''
+    ANIMATION_DURATION = 350  # ms
+    TICKS = 5  # Lines of the y axis
+    MARGINS = (70, 15, 15, 35)  # left, top, right, bottom, room for the labels of the axes
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.widget = self
+        self.setMinimumHeight(300)
+        self.setMouseTracking(True)  # For the highlight of the month under the mouse
+
+        empty = ([0] * 12, [0] * 12)
+        self.values = empty  # Values the chart shows once the animation is over
+        self.startValues = empty  # Values the animation starts from
+        self.shown = empty  # Values painted right now
+        self.hovered = None  # Month under the mouse
+
+        self.animation = QVariantAnimation(self)
+        self.animation.setStartValue(0.0)
+        self.animation.setEndValue(1.0)
+        self.animation.setDuration(self.ANIMATION_DURATION)
+        self.animation.setEasingCurve(QEasingCurve.OutCubic)
+        self.animation.valueChanged.connect(self.animate)
+
+    def setValues(self, values):
+        '''
+        Function to show new (income, expense) values, animating the bars from where they are.
+        '''
+        values = tuple([float(v) for v in series] for series in values)
+        self.animation.stop()
+        self.startValues = self.shown
+        self.values = values
+        if values == self.startValues:
+            self.update()  # Same values, only repainting (for a theme change)
+            return
+        self.animation.start()
+
+    def animate(self, progress):
+        self.shown = tuple(
+            [start + (end - start) * progress for start, end in zip(startSeries, endSeries)]
+            for startSeries, endSeries in zip(self.startValues, self.values))
+        self.update()
+
+    def plotRect(self):
+        left, top, right, bottom = self.MARGINS
+        return QRectF(self.rect()).adjusted(left, top, -right, -bottom)
+
+    def monthAt(self, x):
+        '''
+        Function that returns the month (0 to 11) whose bar is at the given x, or None.
+        '''
+        plot = self.plotRect()
+        if not plot.left() <= x < plot.right():
+            return None
+        return int((x - plot.left()) / (plot.width() / 12))
+
+    def paintEvent(self, event):
+        colors = ConfigStore().themeColors()
+        fontColor = QColor(colors['Font']['font-color1'])
+        plot = self.plotRect()
+
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(colors['Secondary']))
+        if plot.width() <= 0 or plot.height() <= 0:
+            return
+
+        # y axis, the scale is the one of the final values so it does not move during the animation
+        step = niceStep(max(max(self.values[0]), max(self.values[1]), 1) / self.TICKS)
+        top = step * self.TICKS
+        gridColor = QColor(fontColor)
+        gridColor.setAlpha(40)
+        painter.setFont(self.font())
+        for tick in range(self.TICKS + 1):
+            y = plot.bottom() - plot.height() * tick / self.TICKS
+            painter.setPen(QPen(gridColor, 1))
+            painter.drawLine(QPointF(plot.left(), y), QPointF(plot.right(), y))
+            painter.setPen(fontColor)
+            painter.drawText(QRectF(0, y - 10, plot.left() - 8, 20), Qt.AlignRight | Qt.AlignVCenter, f'{step * tick:,.0f}')
+
+        # Bars, the expense is drawn over the income like in the matplotlib chart
+        slot = plot.width() / 12
+        barWidth = slot * 0.8
+        painter.setPen(Qt.NoPen)
+        for month in range(12):
+            x = plot.left() + slot * month + (slot - barWidth) / 2
+            if month == self.hovered:
+                highlight = QColor(fontColor)
+                highlight.setAlpha(25)
+                painter.fillRect(QRectF(plot.left() + slot * month, plot.top(), slot, plot.height()), highlight)
+            for series, color in ((self.shown[0], INCOME_COLOR), (self.shown[1], EXPENSE_COLOR)):
+                height = plot.height() * min(max(series[month], 0) / top, 1)
+                painter.fillRect(QRectF(x, plot.bottom() - height, barWidth, height), QColor(color))
+
+            painter.setPen(fontColor)
+            painter.drawText(QRectF(plot.left() + slot * month, plot.bottom() + 4, slot, self.MARGINS[3] - 4),
+                             Qt.AlignHCenter | Qt.AlignTop, MONTHS[month])
+            painter.setPen(Qt.NoPen)
+
+    def mouseMoveEvent(self, event):
+        hovered = self.monthAt(event.position().x())
+        if hovered != self.hovered:
+            self.hovered = hovered
+            self.update()
+        super().mouseMoveEvent(event)
+
+    def leaveEvent(self, event):
+        self.hovered = None
+        self.update()
+        super().leaveEvent(event)
+
+    def event(self, event):
+        '''
+        Function to show the totals of the month under the mouse as a tooltip.
+        '''
+        if event.type() == QEvent.ToolTip:
+            month = self.monthAt(event.pos().x())
+            if month is None:
+                QToolTip.hideText()
+            else:
+                suffix = f' {ConfigStore().currencySuffix()}'
+                income, expense = self.values[0][month], self.values[1][month]
+                QToolTip.showText(event.globalPos(),
+                                  f'{MONTHS[month]}\nIncome: {income:,.2f}{suffix}\nExpense: {expense:,.2f}{suffix}', self)
+            return True
+        return super().event(event)
@@ -0,0 +1,134 @@
+'''
+This file contains the cache of the categories offered by the add transaction and edit windows.
+The categories of each type are read once and kept in Qt models that the combo boxes and the autocomplete use directly,
+so changing the type of a transaction or opening a window does not query the database.
+The cache listens to the change bus and reads the categories again, on the background thread,
+only after a write that can add a category or change how often the categories are used.
+'''
+# Importing Qt elements
+from PySide6.QtWidgets import QCompleter
+from PySide6.QtCore import QObject, QStringListModel, Qt, Signal
+
+# Importing functions from other files
+from data.changeBus import ChangeBus
+from helper.dbExecutor import DBExecutor
+
+TYPES = ('income', 'expense')
+
+def updateModel(model, names):
+    '''
+    Function to show the given names in a model.
+    Names added at the end are inserted as new rows, so the combo boxes using the model keep what is selected in them.
+    '''
+    current = model.stringList()
+    if current == names:
+        return
+    if names[:len(current)] == current:
+        model.insertRows(len(current), len(names) - len(current))
+        for row in range(len(current), len(names)):
+            model.setData(model.index(row), names[row])
+    else:
+        model.setStringList(names)
+
+class CategoryCache(QObject):
+    '''
+    Class that keeps the categories of each type in Qt models.
+    There is only one instance of it, shared by every window.
+    Include:
+    - model: the categories of a type in the order they were added, for QComboBox.setModel
+    - completer: autocomplete of the categories of a type, the ones used the most in the last months first
+    - names: the categories of a type, to check a name typed by the user
+    The models are filled on the background thread, at startup or the first time they are needed, and updated in place
+    afterwards, so a combo box or a completer using them shows the categories as soon as they are read.
+    '''
+    changed = Signal()  # Emitted on the thread of the write, delivered on the GUI thread
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        '''
+        Function to create the instance in the memory so that it can be used by every window.
+        '''
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        '''
+        Function checks if there is "_initialized" attribute inside the object.
+        Only configures the object the first time it is created.
+        '''
+        if not hasattr(self, "_initialized"):
+            super().__init__()
+            self._initialized = True
+            self.models = {type: QStringListModel(self) for type in TYPES}  # In the order they were added
+            self.rankedModels = {type: QStringListModel(self) for type in TYPES}  # Most used first
+            self.loaded = False
+            self.loading = False
+            self.changed.connect(self.reload)
+            ChangeBus().subscribe(self.dataChanged)
+
+    @staticmethod
+    def read(db):
+        '''
+        Function that returns {type: (categories in the order they were added, categories ranked by use)}.
+        '''
+        return {type: (db.categories(type), db.categoriesByUse(type)) for type in TYPES}
+
+    def load(self):
+        '''
+        Function to read the categories on the background thread the first time they are needed.
+        The models stay empty until the result arrives, then setCategories fills them in place.
+        '''
+        if not self.loaded and not self.loading:
+            self.loading = True
+            DBExecutor().submit(self.read, onResult=self.setCategories, onError=self.loadFailed, key=('categoryCache',))
+
+    def loadFailed(self, message):
+        self.loading = False  # Read again the next time they are needed
+        DBExecutor.printError(message)
+
+    def setCategories(self, categories):
+        for type, (names, ranked) in categories.items():
+            updateModel(self.models[type], names)
+            self.rankedModels[type].setStringList(ranked)
+        self.loaded = True
+        self.loading = False
+
+    def model(self, type):
+        '''
+        Function that returns the model of the categories of a type ("income" or "expense").
+        '''
+        self.load()
+        return self.models[type]
+
+    def names(self, type):
+        '''
+        Function that returns the list of the categories of a type, empty until they were read.
+        '''
+        return self.model(type).stringList()
+
+    def completer(self, type, parent=None):
+        '''
+        Function that returns a QCompleter of the categories of a type, case insensitive,
+        suggesting first the categories with the most transactions in the last months.
+        '''
+        self.load()
+        completer = QCompleter(self.rankedModels[type], parent)
+        completer.setCaseSensitivity(Qt.CaseInsensitive)
+        return completer
+
+    def dataChanged(self, change):
+        '''
+        Function subscribed to the change bus. Called on the thread that made the write, so it only emits 'changed'.
+        Inserts and deletes change how often the categories are used, and may add categories.
+        '''
+        if change.changes('category', 'type', 'date'):
+            self.changed.emit()
+
+    def reload(self):
+        '''
+        Function to read the categories again on the background thread, once for several writes in a row.
+        '''
+        if not self.loaded and not self.loading:
+            return  # Read when a window first needs them
+        DBExecutor().submit(self.read, onResult=self.setCategories, key=('categoryCache',))
@@ -0,0 +1,193 @@
+'''
+This file contains the class that holds the settings of config.json in memory.
+The file is read once when the program starts, every window reads the settings from this class,
+and changes are written back to the file shortly after they are made.
+'''
+from PySide6.QtCore import QObject, Signal, QTimer, QFileSystemWatcher
+from pathlib import Path
+import tempfile
+import json
+import os
+
+# Importing the amounts from another file
+from data.money import Money
+
+CONFIG_PATH = 'data/config.json'
+
+class ConfigStore(QObject):
+    '''
+    Class that holds the content of config.json.
+    Include:
+    - Typed functions to read and change each setting
+    - Writing the changes to the file after a short delay, so many changes in a row are written once
+    - Writing through a temporary file that replaces config.json, so the file is never half written
+    - Signal with the name of the setting that changed, or "" when the file was edited outside the program
+    '''
+    configChanged = Signal(str)
+    _instance = None
+    FLUSH_DELAY = 500  # ms
+
+    def __new__(cls, *args, **kwargs):
+        '''
+        Function to create the instance in the memeory so that it can be used by every window.
+        '''
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self, path=CONFIG_PATH):
+        '''
+        Function checks if there is "_initialized" attribute inside the object.
+        Only configures the object if attribute "_initialized" is False, and loads the file.
+        '''
+        if not hasattr(self, "_initialized"):
+            super().__init__()
+            self._initialized = True
+            self.path = Path(path)
+            self.data = {}
+            self.mtime = None
+            self.pending = False  # True when there are changes not written yet
+
+            self.flushTimer = QTimer(self)
+            self.flushTimer.setSingleShot(True)
+            self.flushTimer.setInterval(self.FLUSH_DELAY)
+            self.flushTimer.timeout.connect(self.flush)
+
+            # Tells when the file is changed by something else than this class
+            self.watcher = QFileSystemWatcher(self)
+            self.watcher.fileChanged.connect(self.reloadIfChanged)
+
+            self.load()
+
+    def load(self):
+        '''
+        Function to read the file into memory.
+        '''
+        with open(self.path, 'r') as f:
+            self.data = json.load(f)
+        self.mtime = os.stat(self.path).st_mtime_ns
+        self.watch()
+
+    def watch(self):
+        '''
+        Function to make sure the file is watched. Replacing the file removes it from the watcher.
+        '''
+        if str(self.path) not in self.watcher.files():
+            self.watcher.addPath(str(self.path))
+
+    def reloadIfChanged(self, *args):
+        '''
+        Function called when the file changes on the disk.
+        If the modification time is not the one of the last write of this class, the file was edited outside the program,
+        so it is read again and every window is told with configChanged("").
+        '''
+        if not self.path.exists():
+            return
+        self.watch()
+        if os.stat(self.path).st_mtime_ns == self.mtime:
+            return
+        self.load()
+        self.configChanged.emit('')
+
+    def set(self, section, key, value):
+        '''
+        Function to change a setting in memory, write the file a bit later and tell the windows.
+        'section' is the dictionary of the data that holds the setting.
+        '''
+        section[key] = value
+        self.pending = True
+        self.flushTimer.start()  # Restarting the timer so a burst of changes is written once
+        self.configChanged.emit(key)
+
+    def flush(self):
+        '''
+        Function to write the changes to the file.
+        The data is written to a temporary file in the same folder which then replaces config.json.
+        '''
+        self.flushTimer.stop()
+        if not self.pending:
+            return
+        fd, tempPath = tempfile.mkstemp(dir=self.path.parent, prefix='.config-', suffix='.json')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self.data, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tempPath, self.path)
+        except Exception:
+            if os.path.exists(tempPath):
+                os.remove(tempPath)
+            raise
+        self.mtime = os.stat(self.path).st_mtime_ns
+        self.pending = False
+        self.watch()
+
+    # User
+    def userName(self):
+        return self.data['User'][0]['Name']
+
+    def setUserName(self, name):
+        self.set(self.data['User'][0], 'Name', name)
+
+    def budget(self):
+        return Money.of(self.data['User'][1]['Budget'])
+
+    def setBudget(self, budget):
+        self.set(self.data['User'][1], 'Budget', str(budget))
+
+    # Report
+    def reportPath(self):
+        return self.data['Report'][0]['Path']
+
+    def setReportPath(self, path):
+        self.set(self.data['Report'][0], 'Path', path)
+
+    def lastGenDate(self):
+        return self.data['Report'][1]['LastGenDate']
+
+    def setLastGenDate(self, date):
+        self.set(self.data['Report'][1], 'LastGenDate', date)
+
+    # Themes
+    def themeNames(self):
+        return list(self.data['Themes'][0].keys())
+
+    def themeColors(self, theme=None):
+        '''
+        Function that returns the colors of the given theme, or of the current one if no theme is given.
+        '''
+        return self.data['Themes'][0][theme or self.currentTheme()]
+
+    def currentTheme(self):
+        return self.data['CurrentTheme']
+
+    def setCurrentTheme(self, theme):
+        self.set(self.data, 'CurrentTheme', theme)
+
+    # Other settings
+    def currencySuffix(self):
+        return self.data['CurrencySuffix']
+
+    def setCurrencySuffix(self, suffix):
+        self.set(self.data, 'CurrencySuffix', suffix)
+
+    def chartBackend(self):
+        '''
+        Function that returns the backend of the homepage barchart, "native" or "matplotlib".
+        Older config.json files do not have the setting, they get the native one.
+        '''
+        return self.data.get('ChartBackend', 'native')
+
+    def setChartBackend(self, backend):
+        self.set(self.data, 'ChartBackend', backend)
+
+    def version(self):
+        return self.data['Version']
+
+    def setVersion(self, version):
+        '''
+        Function to save the version the database was migrated to.
+        Written right away, so a migration is never applied twice.
+        '''
+        self.set(self.data, 'Version', version)
+        self.flush()
@@ -82,17 +82,15 @@ def NdateToFormattedDate(newDate):
     formatted_date = datetime.strptime(newDate, "%d-%m-%Y").strftime("%Y-%m-%d")
     return formatted_date
 
-def reportDateCompare(lastDate):
-    '''
-    Function to compare the date at which the last report was made and the current date to make the decision on if we have to make a new report.
-    '''
-    currentDate = todayDate().strftime('%Y-%m')
-    year1 = lastDate[0:4]
-    year2 = currentDate[0:4]
-
-    month1 = lastDate[5:7]
-    month2 = currentDate[5:7]
-    if int(year1) < int(year2) or int(month1) < int(month2):
-        return 'Outdated', year2, month2
-    else:
-        return 'Uptodate', year2, month2
\ No newline at end of file
+def monthsSince(lastDate):
+    '''
+    Function that returns the months after the given 'yyyy-mm' up to the current month, as a list of (year, month).
+    Used to find the months whose report was not generated yet.
+    '''
+    today = todayDate()
+    year, month = int(lastDate[0:4]), int(lastDate[5:7])
+    months = []
+    while (year, month) < (today.year, today.month):
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        months.append((year, month))
+    return months
@@ -0,0 +1,208 @@
+'''
+This file contains the executor that runs the database work of the windows on a background thread.
+A window gives it a function that takes a DBmanager, and gets the result back through a signal on the GUI thread,
+so a large fetch or a bulk edit never freezes the window.
+All the tasks run one after the other on a single thread, so a read asked after a write always sees the write.
+'''
+# Importing Qt elements
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+# Importing modules
+import sqlite3
+import threading
+import traceback
+
+# Importing the database class from another file
+from data.database import DBmanager
+
+class TaskSignals(QObject):
+    '''
+    Signals of a task, emitted on the worker thread with the task and its result, error message or progress.
+    They are connected to the executor, which lives on the GUI thread, so Qt delivers them on the GUI thread.
+    '''
+    finished = Signal(object, object)
+    failed = Signal(object, str)
+    progress = Signal(object, object)
+
+class DBTask(QRunnable):
+    '''
+    One function to run with the DBmanager of the worker thread.
+    '''
+    def __init__(self, function, args, onResult=None, onError=None, key=None, onProgress=None):
+        super().__init__()
+        self.setAutoDelete(False)  # The executor keeps the task until its result is delivered
+        self.function = function
+        self.args = args
+        self.onResult = onResult
+        self.onError = onError
+        self.onProgress = onProgress
+        self.key = key
+        self.signals = TaskSignals()
+        self.cancelled = False
+        self.stopped = False  # Asked to stop by stop(), its result is still delivered
+        self.conn = None  # Connection running the task, only set while the function runs
+        self.lock = threading.Lock()  # Held to set or clear conn, and by cancel() to interrupt it
+
+    def run(self):
+        '''
+        Function run on the worker thread. Always emits one of the signals, so the executor knows the task is over.
+        '''
+        db = DBmanager()
+        with self.lock:
+            if self.cancelled:
+                self.signals.finished.emit(self, None)
+                return
+            self.conn = db.conn
+        try:
+            try:
+                if self.onProgress is not None:
+                    result = self.function(db, *self.args, progress=self.reportProgress)
+                else:
+                    result = self.function(db, *self.args)
+            finally:
+                with self.lock:  # From here cancel() can not interrupt the connection, which the next task will use
+                    self.conn = None
+        except sqlite3.OperationalError as error:
+            if self.cancelled:  # Interrupted by cancel(), the result is dropped anyway
+                self.signals.finished.emit(self, None)
+            else:
+                self.signals.failed.emit(self, str(error))
+            return
+        except Exception:
+            self.signals.failed.emit(self, traceback.format_exc())
+            return
+        self.signals.finished.emit(self, result)
+
+    def reportProgress(self, value):
+        '''
+        Function given to the function of the task as 'progress', to send 'value' to onProgress on the GUI thread.
+        Returns False once the task is cancelled or stopped, so a long task can stop at its next step.
+        '''
+        self.signals.progress.emit(self, value)
+        return not (self.cancelled or self.stopped)
+
+class DBExecutor(QObject):
+    '''
+    Class that runs the database work of the windows on a background thread.
+    There is only one instance of it, shared by every window.
+    Include:
+    - submit: runs a function with a DBmanager and calls back on the GUI thread with its result
+    - Tasks submitted with a key replace the previous task of that key, whose result is never delivered
+    - cancel: drops the task of a key, stopping its query if it is already running
+    - onProgress: a long task can report its progress, and stop when it is cancelled
+    - stop: asks a task with progress to stop at its next step, and still delivers its result
+    - busyChanged: tells when there is work running or waiting, for the loading indicators
+    '''
+    busyChanged = Signal(bool)
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        '''
+        Function to create the instance in the memeory so that it can be used by every window.
+        '''
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        '''
+        Function checks if there is "_initialized" attribute inside the object.
+        Only configures the object the first time it is created.
+        '''
+        if not hasattr(self, "_initialized"):
+            super().__init__()
+            self._initialized = True
+            self.pool = QThreadPool(self)
+            self.pool.setMaxThreadCount(1)  # SQLite has one writer, and one thread keeps the order of the tasks
+            self.pool.setExpiryTimeout(-1)  # Keeping the thread, and so its connection, alive
+            self.tasks = set()  # Tasks submitted and not finished yet
+            self.keyed = {}  # {key: latest task of that key}
+
+    def submit(self, function, *args, onResult=None, onError=None, onProgress=None, key=None):
+        '''
+        Function to run 'function(db, *args)' on the worker thread.
+        'onResult' is called on the GUI thread with what the function returned, 'onError' with the error message.
+        If 'onProgress' is given the function is called with a 'progress' keyword argument, a function to call
+        with a value for onProgress (called on the GUI thread), which returns False once the task is cancelled.
+        If 'key' is given, the task of the same key that was submitted before is cancelled.
+        '''
+        task = DBTask(function, args, onResult, onError or self.printError, key, onProgress)
+        if key is not None:
+            self.cancel(key)
+            self.keyed[key] = task
+
+        task.signals.finished.connect(self.taskFinished)
+        task.signals.failed.connect(self.taskFailed)
+        task.signals.progress.connect(self.taskProgress)
+
+        self.tasks.add(task)
+        if len(self.tasks) == 1:
+            self.busyChanged.emit(True)
+        self.pool.start(task)
+        return task
+
+    def cancel(self, key):
+        '''
+        Function to cancel the task of the given key.
+        If it did not start it is taken out of the queue, if it is running its query is interrupted.
+        The interrupt is made under the lock of the task, so it only reaches the connection while that task's
+        function runs, never a task that runs after it.
+        '''
+        task = self.keyed.pop(key, None)
+        if task is None:
+            return
+        with task.lock:
+            task.cancelled = True
+            if task.conn is not None:
+                task.conn.interrupt()
+                return
+        if self.pool.tryTake(task):
+            self.forget(task)
+
+    def stop(self, key):
+        '''
+        Function to ask the task of the given key to stop, through the progress function it checks between its steps.
+        Unlike cancel, its result is still delivered: a task asked too late finishes its work,
+        and its result tells the window what was actually done.
+        '''
+        task = self.keyed.get(key)
+        if task is not None:
+            task.stopped = True
+
+    def taskFinished(self, task, result):
+        self.done(task, task.onResult, result)
+
+    def taskFailed(self, task, message):
+        self.done(task, task.onError, message)
+
+    def taskProgress(self, task, value):
+        if not task.cancelled and task.onProgress is not None:
+            task.onProgress(value)
+
+    def done(self, task, callback, value):
+        '''
+        Function called on the GUI thread when a task is over, to deliver its result unless it was cancelled.
+        '''
+        self.forget(task)
+        if task.cancelled:
+            return
+        if task.key is not None and self.keyed.get(task.key) is task:
+            del self.keyed[task.key]
+        if callback is not None:
+            callback(value)
+
+    def forget(self, task):
+        '''
+        Function to drop a task that finished or was taken out of the queue.
+        '''
+        if task in self.tasks:
+            self.tasks.discard(task)
+            if not self.tasks:
+                self.busyChanged.emit(False)
+
+    def isBusy(self):
+        return bool(self.tasks)
+
+    @staticmethod
+    def printError(message):
+        print(f'Database task failed:\n{message}')
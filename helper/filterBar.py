@@ -0,0 +1,192 @@
+'''
+This file contains the row of filters of the history and edit windows.
+The choices of the user are turned into a TransactionFilter (data/filters.py), which the model of the transactions
+adds to its queries, so the filtering is done by SQLite and only the matching transactions are fetched.
+'''
+# Importing GUI elements
+from PySide6.QtWidgets import QFrame, QHBoxLayout, QComboBox, QDateEdit, QDoubleSpinBox, QPushButton, QMenu
+from PySide6.QtCore import Signal, QDate, QTimer
+
+# Importing functions from other files
+from data.filters import TransactionFilter
+from data.money import Money
+from helper.dbExecutor import DBExecutor
+
+class FilterBar(QFrame):
+    '''
+    Row of filter controls.
+    Include:
+    - From and to dates, "any" when left at their lowest date
+    - Type, only when the window shows both types
+    - Categories and accounts, several can be checked in their menus
+    - Smallest and largest amount, "any" when left at 0
+    - Clear button to remove every filter
+    filtersChanged is emitted with the new TransactionFilter a moment after the last change,
+    so changing several filters in a row only fetches the transactions once.
+    '''
+    filtersChanged = Signal(object)
+    NO_DATE = QDate(2000, 1, 1)  # Lowest date of the date entries, shown as "any"
+    CHANGE_DELAY = 300  # ms
+
+    def __init__(self, themeManager, transactionType=None, parent=None):
+        super().__init__(parent)
+        self.themeManager = themeManager
+        self.transactionType = transactionType  # Type of the window, None if it shows both types
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(10)
+
+        self.changeTimer = QTimer(self)
+        self.changeTimer.setSingleShot(True)
+        self.changeTimer.setInterval(self.CHANGE_DELAY)
+        self.changeTimer.timeout.connect(lambda: self.filtersChanged.emit(self.filters()))
+
+        # Dates
+        self.fromDate = self.dateEntry('From: any')
+        self.toDate = self.dateEntry('To: any')
+        layout.addWidget(self.fromDate)
+        layout.addWidget(self.toDate)
+
+        # Type
+        self.typeMenu = QComboBox()
+        self.typeMenu.addItems(['All types', 'Income', 'Expense'])
+        self.typeMenu.currentIndexChanged.connect(self.changed)
+        self.typeMenu.setVisible(transactionType is None)
+        layout.addWidget(self.typeMenu)
+
+        # Categories and accounts
+        self.categoryButton, self.categoryMenu = self.checkMenu('Categories')
+        self.accountButton, self.accountMenu = self.checkMenu('Accounts')
+        layout.addWidget(self.categoryButton)
+        layout.addWidget(self.accountButton)
+
+        # Amounts
+        self.amountMin = self.amountEntry('Min: any')
+        self.amountMax = self.amountEntry('Max: any')
+        layout.addWidget(self.amountMin)
+        layout.addWidget(self.amountMax)
+
+        self.clearButton = QPushButton('Clear Filters')
+        self.clearButton.clicked.connect(self.clear)
+        layout.addWidget(self.clearButton)
+        layout.addStretch()
+
+        self.loadOptions()
+
+    def dateEntry(self, anyText):
+        entry = QDateEdit()
+        entry.setCalendarPopup(True)
+        entry.setDisplayFormat('dd-MM-yyyy')
+        entry.setMinimumDate(self.NO_DATE)
+        entry.setSpecialValueText(anyText)  # Shown instead of the lowest date
+        entry.setDate(self.NO_DATE)
+        entry.dateChanged.connect(self.changed)
+        return entry
+
+    def amountEntry(self, anyText):
+        entry = QDoubleSpinBox()
+        entry.setDecimals(2)
+        entry.setMaximum(10_000_000)
+        entry.setSpecialValueText(anyText)  # Shown instead of 0
+        entry.valueChanged.connect(self.changed)
+        return entry
+
+    def checkMenu(self, text):
+        button = QPushButton(text)
+        menu = QMenu(button)
+        button.setMenu(menu)
+        return button, menu
+
+    def loadOptions(self):
+        '''
+        Function to fill the category and account menus with the ones the transactions have, read on the background thread.
+        The options that were checked stay checked.
+        '''
+        DBExecutor().submit(lambda db, transactionType: db.filterOptions(transactionType), self.transactionType,
+                            onResult=self.setOptions, key=('filterOptions', id(self)))
+
+    def setOptions(self, options):
+        categories, accounts = options
+        for menu, names in ((self.categoryMenu, categories), (self.accountMenu, accounts)):
+            checked = self.checkedNames(menu)
+            menu.clear()
+            for name in names:
+                action = menu.addAction(name)
+                action.setCheckable(True)
+                action.setChecked(name in checked)
+                action.toggled.connect(self.changed)
+        self.updateMenuButtons()
+
+    @staticmethod
+    def checkedNames(menu):
+        return {action.text() for action in menu.actions() if action.isChecked()}
+
+    def updateMenuButtons(self):
+        '''
+        Function to show on the category and account buttons how many of them are checked.
+        '''
+        for button, menu, text in ((self.categoryButton, self.categoryMenu, 'Categories'), (self.accountButton, self.accountMenu, 'Accounts')):
+            count = len(self.checkedNames(menu))
+            button.setText(f'{text} ({count})' if count else text)
+
+    def changed(self, *args):
+        self.updateMenuButtons()
+        self.changeTimer.start()  # Restarting the timer on every change
+
+    def filters(self):
+        '''
+        Function that returns the TransactionFilter of what is chosen in the controls.
+        '''
+        def date(entry):
+            return None if entry.date() == self.NO_DATE else entry.date().toString('yyyy-MM-dd')
+
+        def amount(entry):
+            return Money.of(entry.value()) if entry.value() else None
+
+        types = ()
+        if self.transactionType is None and self.typeMenu.currentIndex() > 0:
+            types = (self.typeMenu.currentText().lower(),)
+        return TransactionFilter(
+            dateFrom=date(self.fromDate),
+            dateTo=date(self.toDate),
+            types=types,
+            categories=self.checkedNames(self.categoryMenu),
+            accounts=self.checkedNames(self.accountMenu),
+            amountMin=amount(self.amountMin),
+            amountMax=amount(self.amountMax),
+        )
+
+    def clear(self):
+        '''
+        Function to remove every filter, emitting filtersChanged once.
+        '''
+        widgets = [self.fromDate, self.toDate, self.typeMenu, self.amountMin, self.amountMax]
+        actions = self.categoryMenu.actions() + self.accountMenu.actions()
+        for item in widgets + actions:
+            item.blockSignals(True)
+        self.fromDate.setDate(self.NO_DATE)
+        self.toDate.setDate(self.NO_DATE)
+        self.typeMenu.setCurrentIndex(0)
+        self.amountMin.setValue(0)
+        self.amountMax.setValue(0)
+        for action in actions:
+            action.setChecked(False)
+        for item in widgets + actions:
+            item.blockSignals(False)
+        self.changed()
+
+    def refreshTheme(self):
+        entryStyle = '''
+            font-size: 16px;
+            font-family: Adwaita mono;
+            padding: 6px;
+            border-radius: 5px;
+        '''
+        for entry in (self.fromDate, self.toDate):
+            entry.setStyleSheet(self.themeManager.get_stylesheet('QDateEdit'))
+        for entry in (self.amountMin, self.amountMax):
+            entry.setStyleSheet(f'QDoubleSpinBox {{{entryStyle}}}' + self.themeManager.get_stylesheet('QDoubleSpinBox') + self.themeManager.get_stylesheet('QLabel'))
+        self.typeMenu.setStyleSheet(f'QComboBox {{{entryStyle}}}' + self.themeManager.get_stylesheet('QComboBox'))
+        for button in (self.categoryButton, self.accountButton, self.clearButton):
+            button.setStyleSheet(f'QPushButton {{{entryStyle}}}' + self.themeManager.get_stylesheet('QPushButton'))
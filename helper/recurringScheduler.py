@@ -0,0 +1,18 @@
+'''
+This file contains the scheduler of the recurring transactions (data/recurring.py).
+It runs when the program starts and adds every transaction of the recurring rules that became due since it last ran,
+so the rent, the salary and the subscriptions are never entered by hand and no month is missed if the program was closed.
+'''
+# Importing functions from other files
+from helper.dbExecutor import DBExecutor
+
+def recurringTransactions(onAdded=None):
+    '''
+    Function to add the due recurring transactions on the background thread.
+    'onAdded' is called on the GUI thread with the number of transactions added, if any were.
+    '''
+    def done(count):
+        if count and onAdded is not None:
+            onAdded(count)
+
+    DBExecutor().submit(lambda db: db.materializeRecurring(), onResult=done, key='recurringTransactions')
@@ -1,60 +1,83 @@
 # Importing functions from other files
-from helper.dateAndTime import reportDateCompare
-from data.database import DBmanager
+from helper.dateAndTime import monthsSince
+from helper.configStore import ConfigStore
+from helper.dbExecutor import DBExecutor
+from data.money import Money
 
 # Importing from modules
 from pathlib import Path
-import json
+import tempfile
+import os
 
-def monthlyReport():
+def reportText(year, month, report, budget, currencySuffix):
     '''
-    Function to generate monthly report.
-    Generated .txt files as a report right now but will change later on to a PDF or/and .xlsx files.
-    Will generate a report for the previous month if the date is too old in the json file.
-    A button will be added to the user window or some other window which will allow the user to generate a report on demand.
+    Function that returns the text of the report of a month from its data (see DBmanager.monthlyReportData).
+    The totals and the budget are Money, so the saved amount is exact.
     '''
-    with open('data/config.json', 'r') as pathFile:
-        JSONfile = json.load(pathFile)
-        path = Path(JSONfile['Report'][0]['Path'])
-
-    if path.exists():
-        data = JSONfile['Report'][1]['LastGenDate']
-        update, year, month = reportDateCompare(data)
-        if update == 'Outdated':
-            db = DBmanager()
-            categories, total_income = db.ReportData(year, month)
-            total_expense = db.Expense()
-
-            with open('data/config.json') as f:
-                data = json.load(f)
-                currencySuffix = f' {data["CurrencySuffix"]}'
-
-            budgetRead = JSONfile['User'][1]['Budget']
-            TXT = f'''FundTrack Monthly Report
+    totalExpense = report['expense']
+    TXT = f'''FundTrack Monthly Report
 =========================
 Year: {year}
-Month: {month}
+Month: {month:02d}
 
-Total Income: {total_income}{currencySuffix}
+Total Income: {report['income']:,.2f}{currencySuffix}
 
-Budget: {float(budgetRead):,.2f}{currencySuffix}
-Total Expense: {total_expense}{currencySuffix}
-Saved: {float(budgetRead)-total_expense:,.2f}{currencySuffix}
+Budget: {budget:,.2f}{currencySuffix}
+Total Expense: {totalExpense:,.2f}{currencySuffix}
+Saved: {budget - totalExpense:,.2f}{currencySuffix}
 
 Expenses By Category:
 
 '''
-            for i in categories:
-                TXT+=f'- {i[0]}: {i[1]:,.2f}{currencySuffix}\n'
-
+    for i in report['categories']:
+        TXT += f'- {i[0]}: {i[1]:,.2f}{currencySuffix}\n'
+    return TXT
 
-            with open(str(path)+f'/Report{year}-{month}.txt','a') as report:
-                report.write(TXT)
+def writeAtomically(path, text):
+    '''
+    Function to write a file through a temporary file in the same folder that then replaces it,
+    so a report is never left half written.
+    '''
+    fd, tempPath = tempfile.mkstemp(dir=path.parent, prefix='.report-', suffix='.txt')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tempPath, path)
+    except Exception:
+        if os.path.exists(tempPath):
+            os.remove(tempPath)
+        raise
 
-            with open('data/config.json', 'r') as f:
-                data = json.load(f)
+def generateReports(db, path, months, budget, currencySuffix):
+    '''
+    Function run on the background thread to write the reports of the given months.
+    The data of every month is read with a single query. Returns the last month written as 'yyyy-mm'.
+    '''
+    reports = db.monthlyReportData(months)
+    empty = {'income': Money(), 'expense': Money(), 'categories': []}
+    for year, month in months:
+        text = reportText(year, month, reports.get((year, month), empty), budget, currencySuffix)
+        writeAtomically(path / f'Report{year}-{month:02d}.txt', text)
+    year, month = months[-1]
+    return f'{year}-{month:02d}'
 
-            data['Report'][1]['LastGenDate'] = f'{year}-{month}'
+def monthlyReport():
+    '''
+    Function to generate monthly report.
+    Generated .txt files as a report right now but will change later on to a PDF or/and .xlsx files.
+    Generates the report of every month since the last one generated (LastGenDate in the settings),
+    so months the program was not opened in are not missed.
+    The reports are written on the background thread, so opening the program never waits for them.
+    A button will be added to the user window or some other window which will allow the user to generate a report on demand.
+    '''
+    config = ConfigStore()
+    path = Path(config.reportPath())
 
-            with open('data/config.json', 'w') as f:
-                json.dump(data, f, indent=4)
\ No newline at end of file
+    if path.exists():
+        months = monthsSince(config.lastGenDate())
+        if months:
+            currencySuffix = f' {config.currencySuffix()}'
+            DBExecutor().submit(generateReports, path, months, config.budget(), currencySuffix,
+                                onResult=config.setLastGenDate, key='monthlyReport')
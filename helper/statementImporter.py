@@ -0,0 +1,295 @@
+'''
+This file contains the importer of bank statements (CSV or OFX files) into the database.
+The file is read as a stream, one transaction at a time, so a statement with millions of lines never has to fit in memory.
+The transactions are checked and inserted in batches with executemany, all of them in one transaction of the database,
+so an import that fails or is cancelled leaves nothing behind.
+'''
+# Importing modules
+import csv
+import os
+import re
+from datetime import datetime
+
+# Importing the database class and the amounts from other files
+from data.database import DBmanager
+from data.money import Money
+
+BATCH_SIZE = 10_000  # Transactions inserted per executemany, progress is reported after each
+MAX_ERRORS = 100  # Lines with errors kept in the result, the others are only counted
+
+DEFAULT_CATEGORY = 'Other'
+DEFAULT_ACCOUNT = 'Bank'
+
+'''
+Names the columns of a CSV file can have for each field of a transaction, in lowercase.
+The first row of the file is compared to these names, so most bank exports are mapped without asking.
+'''
+COLUMN_NAMES = {
+    'amount': ['amount', 'value', 'sum', 'transaction amount'],
+    'type': ['type', 'transaction type', 'income/expense'],
+    'category': ['category', 'categories'],
+    'date': ['date', 'transaction date', 'posting date', 'booking date', 'value date'],
+    'description': ['description', 'memo', 'details', 'name', 'payee', 'narrative', 'reference'],
+    'account': ['account', 'account name'],
+    'debit': ['debit', 'withdrawal', 'money out', 'paid out'],
+    'credit': ['credit', 'deposit', 'money in', 'paid in'],
+}
+
+# Date formats tried on the first dates of a file, the first one that works is used for the whole file
+DATE_FORMATS = ['%Y-%m-%d', '%d-%m-%Y', '%d/%m/%Y', '%m/%d/%Y', '%Y/%m/%d', '%d.%m.%Y', '%Y%m%d']
+
+class ImportResult:
+    '''
+    Result of an import.
+    Includes:
+    - inserted: number of transactions inserted
+    - duplicates: number of transactions not inserted because they were already in the database
+    - skipped: number of lines that could not be read as a transaction
+    - errors: (line number, reason) of the first skipped lines
+    - cancelled: True if the import was stopped before the end of the file
+    '''
+    def __init__(self):
+        self.inserted = 0
+        self.duplicates = 0
+        self.skipped = 0
+        self.errors = []
+        self.cancelled = False
+
+    def addError(self, line, reason):
+        self.skipped += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append((line, reason))
+
+def mapColumns(header, mapping=None):
+    '''
+    Function that returns {field: column number} for the given header row of a CSV file.
+    'mapping' can give {field: column name} for the columns that are not named like in COLUMN_NAMES.
+    '''
+    names = [name.strip().lower() for name in header]
+    columns = {}
+    for field, aliases in COLUMN_NAMES.items():
+        if mapping and field in mapping:
+            aliases = [mapping[field].strip().lower()]
+        for alias in aliases:
+            if alias in names:
+                columns[field] = names.index(alias)
+                break
+    if 'date' not in columns or not ('amount' in columns or 'debit' in columns or 'credit' in columns):
+        raise ValueError('The statement needs a date column and an amount (or debit/credit) column')
+    return columns
+
+def readCSV(file, mapping=None):
+    '''
+    Generator that yields (line number, {field: text}) for every line of a CSV file opened as text.
+    The delimiter is guessed from the start of the file.
+    '''
+    sample = file.read(64 * 1024)
+    file.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=',;\t|')
+    except csv.Error:
+        dialect = csv.excel
+
+    reader = csv.reader(file, dialect)
+    header = next(reader, None)
+    if header is None:
+        return
+    columns = mapColumns(header, mapping)
+    for row in reader:
+        if not row:
+            continue
+        yield reader.line_num, {field: row[number] if number < len(row) else '' for field, number in columns.items()}
+
+# Tags of an OFX transaction, <TAG>value, closed or not (OFX 1 is SGML and does not close them)
+OFX_TAG = re.compile(r'<(\w+)>([^<\r\n]*)')
+
+def readOFX(file):
+    '''
+    Generator that yields (line number, {field: text}) for every transaction (<STMTTRN>) of an OFX/QFX file opened as text.
+    The file is read line by line, keeping only the transaction being read.
+    '''
+    account = None
+    current = None
+    start = 0
+    for number, line in enumerate(file, 1):
+        for tag, value in OFX_TAG.findall(line):
+            tag = tag.upper()
+            value = value.strip()
+            if tag == 'ACCTID':
+                account = value
+            elif tag == 'STMTTRN':
+                current = {}
+                start = number
+            elif current is not None:
+                current[tag] = value
+        if current is not None and '</STMTTRN>' in line.upper():
+            yield start, {
+                'amount': current.get('TRNAMT', ''),
+                'date': current.get('DTPOSTED', '')[0:8],
+                'description': current.get('NAME') or current.get('MEMO', ''),
+                'account': account or '',
+            }
+            current = None
+
+class RowParser:
+    '''
+    Class that turns the text of a line into the values of a transaction (amount, type, category, date, description, account).
+    The date format is found on the first date and kept for the rest of the file.
+    '''
+    def __init__(self, defaultAccount=DEFAULT_ACCOUNT):
+        self.dateFormat = None
+        self.defaultAccount = defaultAccount
+        self.dates = {}  # Dates already read, a statement has many transactions on the same day
+
+    def parseDate(self, text):
+        if text in self.dates:
+            return self.dates[text]
+        parsed = self.readDate(text.strip())
+        self.dates[text] = parsed
+        return parsed
+
+    def readDate(self, text):
+        if self.dateFormat is not None:
+            try:
+                return datetime.strptime(text, self.dateFormat).strftime('%Y-%m-%d')
+            except ValueError:
+                pass
+        for dateFormat in DATE_FORMATS:
+            try:
+                parsed = datetime.strptime(text, dateFormat).strftime('%Y-%m-%d')
+            except ValueError:
+                continue
+            self.dateFormat = dateFormat
+            return parsed
+        raise ValueError(f'Unknown date "{text}"')
+
+    @staticmethod
+    def parseAmount(text):
+        '''
+        Function that returns the amount of a text as Money, read as a decimal number so no cent is lost on the way.
+        '''
+        try:
+            return Money.of(text)  # Most amounts are plain numbers
+        except ValueError:
+            pass
+        text = text.strip().replace(' ', '').replace('\u00a0', '')  # Spaces and non-breaking spaces between thousands
+        if not text:
+            return Money()
+        negative = text.startswith('(') and text.endswith(')')  # Accounting notation
+        text = text.strip('()')
+        # "1.234,56" and "1,234.56": the last separator is the decimal one, "1,234" is read as a thousand
+        comma = text.rfind(',')
+        if comma > text.rfind('.') and ('.' in text or len(text) - comma - 1 != 3):
+            text = text.replace('.', '').replace(',', '.')
+        else:
+            text = text.replace(',', '')
+        text = re.sub(r'[^\d.+-]', '', text)  # Currency symbols
+        amount = Money.of(text)
+        return -amount if negative else amount
+
+    def parse(self, fields):
+        '''
+        Function that returns the transaction of a line as a tuple in the order of the columns of the table.
+        Raises ValueError if the line is not a valid transaction.
+        '''
+        if fields.get('amount', '').strip():
+            amount = self.parseAmount(fields['amount'])
+        else:
+            amount = self.parseAmount(fields.get('credit', '')) - abs(self.parseAmount(fields.get('debit', '')))
+
+        transactionType = fields.get('type', '').strip().lower()
+        if transactionType in ('income', 'credit', 'cr', 'deposit'):
+            transactionType = 'income'
+        elif transactionType in ('expense', 'debit', 'dr', 'withdrawal'):
+            transactionType = 'expense'
+        else:
+            transactionType = 'expense' if amount < Money() else 'income'
+        amount = abs(amount)
+        if not amount:
+            raise ValueError('Amount is zero')
+
+        return (
+            amount,
+            transactionType,
+            fields.get('category', '').strip() or DEFAULT_CATEGORY,
+            self.parseDate(fields['date']),
+            fields.get('description', '').strip(),
+            fields.get('account', '').strip() or self.defaultAccount,
+        )
+
+def batched(iterable, size):
+    '''
+    Generator that yields lists of at most 'size' items of the iterable.
+    '''
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def estimateRows(path):
+    '''
+    Function that estimates the number of lines of a file from the length of its first lines.
+    '''
+    size = os.path.getsize(path)
+    with open(path, 'rb') as file:
+        sample = file.read(64 * 1024)
+    lines = sample.count(b'\n')
+    if lines == 0:
+        return 0
+    return int(size / (len(sample) / lines))
+
+def importStatement(path, progress=None, mapping=None, defaultAccount=DEFAULT_ACCOUNT, batchSize=BATCH_SIZE):
+    '''
+    Function to import a CSV or OFX/QFX statement into the database.
+    1, Reads the file as a stream of lines
+    2, Turns every line into a transaction, lines that can not be read are counted in the result
+    3, Inserts the transactions 'batchSize' at a time, all in one transaction of the database committed at the end,
+       skipping the ones already in the database (see DBmanager.bulkInsert), so importing overlapping statements is safe
+    'progress' is called after every batch with (bytes read, size of the file), and a last time with (size, size)
+    before the transactions are committed. If it returns False the import is cancelled and nothing is inserted,
+    once that last call returned True the import can not be cancelled anymore.
+    Returns an ImportResult.
+    '''
+    result = ImportResult()
+    parser = RowParser(defaultAccount)
+    db = DBmanager()
+    size = os.path.getsize(path)
+    isOFX = os.path.splitext(path)[1].lower() in ('.ofx', '.qfx')
+
+    with open(path, 'r', newline='', encoding='utf-8-sig', errors='replace') as file:
+        lines = readOFX(file) if isOFX else readCSV(file, mapping)
+
+        def transactions():
+            for number, fields in lines:
+                try:
+                    yield parser.parse(fields)
+                except (ValueError, KeyError) as error:
+                    result.addError(number, str(error))
+
+        db.beginBulkInsert(estimateRows(path) // (6 if isOFX else 1))  # An OFX transaction takes about 6 lines
+        try:
+            for batch in batched(transactions(), batchSize):
+                duplicates = db.bulkInsert(batch)
+                result.duplicates += duplicates
+                result.inserted += len(batch) - duplicates
+                if progress is not None and progress(file.buffer.tell(), size) is False:
+                    result.cancelled = True
+                    break
+            else:
+                # Committing builds the dropped indexes again, which can take a while on a large statement
+                if progress is not None and progress(size, size) is False:
+                    result.cancelled = True
+        except Exception:
+            db.cancelBulkInsert()
+            raise
+
+    if result.cancelled:
+        db.cancelBulkInsert()
+        result.inserted = 0
+    else:
+        db.endBulkInsert()
+    return result
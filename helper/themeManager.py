@@ -1,5 +1,7 @@
 from PySide6.QtCore import QObject, Signal
-import json
+
+# Importing the settings from another file
+from helper.configStore import ConfigStore
 
 class ThemeManager(QObject):
     themeChanged = Signal()
@@ -22,101 +24,113 @@ class ThemeManager(QObject):
             super().__init__()
             self._initialized = True
             self.colors = {}
+            self.stylesheets = {}  # Stylesheet of every element type for the current theme
             self.load_theme()
+            ConfigStore().configChanged.connect(self.configChanged)
 
     def load_theme(self):
         '''
         Function to load the current theme.
-        This function will fetch all the theme values from the config.json file.
+        This function will fetch all the theme values from the settings kept in memory.
+        '''
+        config = ConfigStore()
+        self.currentTheme = config.currentTheme()
+        self.colors = config.themeColors(self.currentTheme)
+        self.stylesheets = self.compile_stylesheets()
+
+    def configChanged(self, key):
         '''
-        with open('data/config.json', 'r') as f:
-            data = json.load(f)
-        self.currentTheme = data["CurrentTheme"]
-        self.colors = data["Themes"][0][self.currentTheme]
+        Function called when a setting changes.
+        If config.json was edited outside the program ("") the theme is loaded again and the windows are told.
+        '''
+        if key == '':
+            self.load_theme()
+            self.themeChanged.emit()
 
     def apply_theme(self, chosen_theme):
         '''
         1, This function will apply the chosen theme to the current theme.
         2, Then fetches the values for the new theme selected.
-        3, Changes the current theme to the newly chosen theme.
+        3, Changes the current theme to the newly chosen theme and builds its stylesheets.
         4, Emits signal of changed theme.
+        Nothing is done if the chosen theme is already the current one.
         '''
-        with open('data/config.json', 'r') as f:
-            data = json.load(f)
-
-        data['CurrentTheme'] = chosen_theme
-        self.colors = data['Themes'][0][chosen_theme]
-
-        with open('data/config.json', 'w') as f:
-            json.dump(data, f, indent=4)
+        if chosen_theme == self.currentTheme:
+            return
+        config = ConfigStore()
+        self.currentTheme = chosen_theme
+        self.colors = config.themeColors(chosen_theme)
+        self.stylesheets = self.compile_stylesheets()
+        config.setCurrentTheme(chosen_theme)
 
         self.themeChanged.emit()
 
     def get_stylesheet(self, type):
         '''
         This function returns the stylesheet for the selected theme.
-        The function returns theme colors for the element type that is inside the variable 'type'
+        The function returns theme colors for the element type that is inside the variable 'type'.
+        The stylesheets are built once per theme by 'compile_stylesheets', so this is only a lookup.
+        '''
+        return self.stylesheets.get(type)
+
+    def compile_stylesheets(self):
         '''
-        with open('data/config.json', 'r') as f:
-            data = json.load(f)
-            currentTheme = data['CurrentTheme']
-            for i in data['Themes']:
-                themePrimary = i[currentTheme]['Primary']
-                themeSecondary = i[currentTheme]['Secondary']
-
-                buttonConfig = i[currentTheme]['Button']
-                entryConfig = i[currentTheme]['Entry']
-                fontConfig = i[currentTheme]["Font"]
-                sortConfig = i[currentTheme]["Sortmenu"]
-
-                buttonBgColor = buttonConfig['bgcolor']
-                buttonHoverBgColor = buttonConfig['hoverbgcolor']
-                buttonClickedBgColor = buttonConfig['clickbgcolor']
-                buttonColor = buttonConfig['color']
-
-                entryBgColor = entryConfig['bgcolor']
-                entryColor = entryConfig['color']
-                entryBorderColor = entryConfig['bordercolor']
-
-                font_color0 = fontConfig['font-color0']
-                font_color1 = fontConfig['font-color1']
-                font_color2 = fontConfig['font-color2']
-
-                sortNormalBgColor = sortConfig["bgcolor"]
-
-        if type == 'QFrame':
-            return f'''
+        This function builds the stylesheets of every element type with the colors of the current theme.
+        It is called when a theme is loaded or applied, and returns {element type: stylesheet}.
+        '''
+        currentTheme = self.currentTheme
+        colors = self.colors
+        themePrimary = colors['Primary']
+        themeSecondary = colors['Secondary']
+
+        buttonConfig = colors['Button']
+        entryConfig = colors['Entry']
+        fontConfig = colors["Font"]
+        sortConfig = colors["Sortmenu"]
+
+        buttonBgColor = buttonConfig['bgcolor']
+        buttonHoverBgColor = buttonConfig['hoverbgcolor']
+        buttonClickedBgColor = buttonConfig['clickbgcolor']
+        buttonColor = buttonConfig['color']
+
+        entryBgColor = entryConfig['bgcolor']
+        entryColor = entryConfig['color']
+        entryBorderColor = entryConfig['bordercolor']
+
+        font_color0 = fontConfig['font-color0']
+        font_color1 = fontConfig['font-color1']
+        font_color2 = fontConfig['font-color2']
+
+        sortNormalBgColor = sortConfig["bgcolor"]
+
+        stylesheets = {}
+        stylesheets['QFrame'] = f'''
                         background-color: {themeSecondary};
                         border: 3px solid {font_color0};
                         color: {font_color0};
                     '''
 
-        elif type == 'Toolbar':
-            return f'''
+        stylesheets['Toolbar'] = f'''
                         background-color: {font_color0};
                         color: {font_color2}
                     '''
 
-        elif type == 'QLabel':
-            return f'''
+        stylesheets['QLabel'] = f'''
                         color: {font_color0};
                     '''
 
-        elif type == 'QComboBox':
-            return f'''
+        stylesheets['QComboBox'] = f'''
                         color: {font_color0};
                         border: 2px solid {font_color0};
                         background-color: {sortNormalBgColor};
                     '''
 
-        elif type == 'PrimaryASecondary':
-            return f'''
+        stylesheets['PrimaryASecondary'] = f'''
                         background-color: {themePrimary}; 
                         color: {font_color1};
                     '''
 
-        elif type == 'QPushButton':
-            return f'''
+        stylesheets['QPushButton'] = f'''
                         QPushButton {{
                             background-color: {buttonBgColor};
                             color: {buttonColor};
@@ -129,8 +143,7 @@ class ThemeManager(QObject):
                         }}
                     '''
 
-        elif type == 'QLineEdit':
-            return f'''
+        stylesheets['QLineEdit'] = f'''
                         QLineEdit {{
                             background-color: {entryBgColor};
                             border: 2px solid {entryColor};
@@ -144,8 +157,7 @@ class ThemeManager(QObject):
                         }}
                     '''
 
-        elif type == 'QDoubleSpinBox':
-            return f'''
+        stylesheets['QDoubleSpinBox'] = f'''
                         QDoubleSpinBox {{
                             background-color: {entryBgColor};
                             border: 2px solid {entryColor};
@@ -158,17 +170,13 @@ class ThemeManager(QObject):
                         }}
                     '''
 
-        elif type == 'BorderDelete1px':
-            return f'border: 1px solid {themeSecondary};'
+        stylesheets['BorderDelete1px'] = f'border: 1px solid {themeSecondary};'
 
-        elif type == 'BorderDelete3px':
-            return f'border: 3px solid {themeSecondary};'
+        stylesheets['BorderDelete3px'] = f'border: 3px solid {themeSecondary};'
 
-        elif type == 'font_color1':
-            return f'color: {font_color1};'
+        stylesheets['font_color1'] = f'color: {font_color1};'
 
-        elif type == 'QDateEdit':
-            return f'''
+        stylesheets['QDateEdit'] = f'''
                         QDateEdit {{
                             background-color: {entryBgColor};
                             border: 2px solid {entryColor};
@@ -213,8 +221,7 @@ class ThemeManager(QObject):
                         }}
                     '''
 
-        elif type == 'QCheckBox':
-            return f'''
+        stylesheets['QCheckBox'] = f'''
                         QCheckBox {{
                             spacing: 10px;
                             font-size: 14px;
@@ -238,4 +245,6 @@ class ThemeManager(QObject):
                             border-radius: 4px;
                             background-color: {font_color0};
                         }}
-                    '''
\ No newline at end of file
+                    '''
+
+        return stylesheets
@@ -0,0 +1,377 @@
+'''
+This file contains the model and the delegate that show the list of transactions.
+The model only holds the pages of transactions that were scrolled to, fetching the next page from the database
+on the background thread when the view reaches the end of it, and the delegate paints every transaction as a card.
+No widget is created per transaction, so opening the window costs the same no matter how big the database is.
+'''
+# Importing GUI elements
+from PySide6.QtWidgets import QStyledItemDelegate
+from PySide6.QtGui import QColor, QPen, QFont
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QRectF, QSize, QEvent, Signal
+
+# Importing functions from other files
+from data.database import pageCursor, searchCursor
+from data.money import Money
+from helper.dbExecutor import DBExecutor
+from helper.dateAndTime import dateExtraction
+
+# Role through which the delegate gets the whole transaction of a row
+RowRole = Qt.UserRole + 1
+
+# Border colors of the cards according to the transaction type
+TYPE_COLORS = {
+    'income': '#11b343',
+    'expense': '#c71413'
+}
+
+class TransactionTableModel(QAbstractTableModel):
+    '''
+    Model of the transactions, fetched from the database one page at a time.
+    Include:
+    - One row per transaction and one column per field
+    - The whole transaction through RowRole, for the delegate
+    - Fetching the next page on the background thread when the view asks for more rows (canFetchMore/fetchMore)
+    - Showing only the transactions matching a search (setSearch), the best matches first
+    - Showing only the transactions matching the filters of the window (setFilters), filtered by the database
+    - loadingChanged, True while a page is being fetched, for the loading indicator of the window
+    '''
+    loadingChanged = Signal(bool)
+    COLUMNS = [('date', 'Date'), ('category', 'Category'), ('account', 'Account'), ('amount', 'Amount'), ('description', 'Description'), ('created_at', 'Created')]
+    PAGE_SIZE = 200
+
+    def __init__(self, sortedTo='Date DESC', transactionType=None, parent=None):
+        super().__init__(parent)
+        self.sortedTo = sortedTo
+        self.transactionType = transactionType  # "income", "expense" or None for both
+        self.searchText = ''  # Text searched, '' shows every transaction in the order of sortedTo
+        self.filters = None  # TransactionFilter (data/filters.py) of the window, None shows every transaction
+        self.rows = []
+        self.hasMore = True
+        self.after = None  # Position of the last fetched transaction, where the next page starts
+        self.loading = False
+        self.executor = DBExecutor()
+        self.pageKey = ('page', id(self))  # Key of the page being fetched, a new fetch or sort replaces it
+
+    def setLoading(self, loading):
+        if loading != self.loading:
+            self.loading = loading
+            self.loadingChanged.emit(loading)
+
+    def setSort(self, sortedTo):
+        '''
+        Function to change the sorting option.
+        The page being fetched for the old order is cancelled, the pages that were fetched are dropped
+        and the view will ask for the first page of the new order.
+        '''
+        self.beginResetModel()
+        self.sortedTo = sortedTo
+        self.dropPages()
+        self.endResetModel()
+
+    def setSearch(self, text):
+        '''
+        Function to show only the transactions whose description, category or account match the text, '' to show all of them.
+        The results are fetched page by page like the transactions, the best matches first (see DBmanager.search).
+        '''
+        text = text.strip()
+        if text == self.searchText:
+            return
+        self.beginResetModel()
+        self.searchText = text
+        self.dropPages()
+        self.endResetModel()
+
+    def setFilters(self, filters):
+        '''
+        Function to show only the transactions matching a TransactionFilter (data/filters.py), None to show all of them.
+        The filters are added to the query of every page, so only the matching transactions are fetched.
+        '''
+        if filters is not None and filters.isEmpty():
+            filters = None
+        self.beginResetModel()
+        self.filters = filters
+        self.dropPages()
+        self.endResetModel()
+
+    def dropPages(self):
+        '''
+        Function to drop the fetched pages after the order, the search or the filters changed, cancelling the page being fetched.
+        '''
+        self.executor.cancel(self.pageKey)
+        self.rows = []
+        self.hasMore = True
+        self.after = None
+        self.setLoading(False)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return self.hasMore and not self.loading
+
+    def fetchMore(self, parent=QModelIndex()):
+        '''
+        Function to ask the background thread for the page of transactions that comes after the last fetched one.
+        The page is added at the end of the model by addPage when it arrives.
+        '''
+        if parent.isValid() or not self.hasMore or self.loading:
+            return
+        self.setLoading(True)
+        if self.searchText:
+            self.executor.submit(
+                lambda db, text, after, transactionType, filters: db.search(text, self.PAGE_SIZE, after, transactionType, filters),
+                self.searchText, self.after, self.transactionType, self.filters,
+                onResult=self.addPage, onError=self.pageFailed, key=self.pageKey)
+        else:
+            self.executor.submit(
+                lambda db, sortedTo, after, transactionType, filters: db.transactionHistoryPage(sortedTo, self.PAGE_SIZE, after, transactionType, filters),
+                self.sortedTo, self.after, self.transactionType, self.filters,
+                onResult=self.addPage, onError=self.pageFailed, key=self.pageKey)
+
+    def addPage(self, page):
+        '''
+        Function to add a fetched page of transactions at the end of the model.
+        '''
+        self.setLoading(False)
+        self.hasMore = len(page) == self.PAGE_SIZE
+        if not page:
+            return
+        # Kept as fetched, so editing the last row does not move the next page
+        self.after = searchCursor(page[-1]) if self.searchText else pageCursor(self.sortedTo, page[-1])
+        self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(page) - 1)
+        self.rows.extend(page)
+        self.endInsertRows()
+
+    def pageFailed(self, message):
+        self.setLoading(False)
+        self.hasMore = False  # Not asking again for a page that fails, until the order is changed
+        DBExecutor.printError(message)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        if role == RowRole:
+            return row
+        if role == Qt.DisplayRole:
+            column = self.COLUMNS[index.column()][0]
+            if column == 'amount':
+                return str(Money.fromCents(row['amount']))
+            return str(row[column])
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section][1]
+        return None
+
+    def rowsOf(self, selectedIDs):
+        '''
+        Function that returns {id: row number} of the given transactions that are fetched in the model.
+        '''
+        selectedIDs = set(selectedIDs)
+        return {row['id']: number for number, row in enumerate(self.rows) if row['id'] in selectedIDs}
+
+    def removeIDs(self, selectedIDs):
+        '''
+        Function to remove the given transactions from the model, after they were deleted, without fetching anything.
+        '''
+        numbers = sorted(self.rowsOf(selectedIDs).values(), reverse=True)
+        # Removing runs of consecutive rows from the bottom, so the row numbers above stay valid
+        while numbers:
+            last = numbers.pop(0)
+            first = last
+            while numbers and numbers[0] == first - 1:
+                first = numbers.pop(0)
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self.rows[first:last + 1]
+            self.endRemoveRows()
+
+    def updateIDs(self, selectedIDs):
+        '''
+        Function to refresh the given transactions after they were edited.
+        Only the fetched rows are read again from the database, and only their rows are repainted.
+        Rows that no longer have the type of the model (after a change of type) are removed from it.
+        Rows stay where they are even if the edit changed their place in the order, until the order is changed.
+        The rows are read on the background thread, after any edit submitted before.
+        '''
+        fetchedIDs = list(self.rowsOf(selectedIDs).keys())
+        if not fetchedIDs:
+            return
+        self.executor.submit(lambda db, ids: db.transactionsByIDs(ids), fetchedIDs, onResult=self.replaceRows)
+
+    def replaceRows(self, rows):
+        '''
+        Function to put the rows read again by updateIDs in the model.
+        The row numbers are looked up again, since rows may have been removed while they were read.
+        '''
+        numbers = self.rowsOf(row['id'] for row in rows)
+        removed = []
+        for row in rows:
+            if row['id'] not in numbers:
+                continue
+            if self.transactionType is not None and row['type'] != self.transactionType:
+                removed.append(row['id'])
+                continue
+            number = numbers[row['id']]
+            self.rows[number] = row
+            self.dataChanged.emit(self.index(number, 0), self.index(number, self.columnCount() - 1))
+        self.removeIDs(removed)
+
+class CheckableTransactionModel(TransactionTableModel):
+    '''
+    Model of the transactions where every transaction can be checked, for the edit windows.
+    The checked transactions are kept as a set of ids, so it does not matter if they are fetched or not,
+    which lets "select all" check every transaction without fetching them.
+    '''
+    def __init__(self, sortedTo='Date DESC', transactionType=None, parent=None):
+        super().__init__(sortedTo, transactionType, parent)
+        self.checkedIDs = set()
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsUserCheckable
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.CheckStateRole and index.isValid():
+            return Qt.Checked if self.rows[index.row()]['id'] in self.checkedIDs else Qt.Unchecked
+        return super().data(index, role)
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.CheckStateRole or not index.isValid():
+            return False
+        transactionID = self.rows[index.row()]['id']
+        if Qt.CheckState(value) == Qt.Checked:
+            self.checkedIDs.add(transactionID)
+        else:
+            self.checkedIDs.discard(transactionID)
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        return True
+
+    def setAllChecked(self, checked):
+        '''
+        Function to check every transaction of the model, including the ones not fetched yet, or to uncheck all of them.
+        While searching or filtering only the transactions shown are checked.
+        Only the ids are read from the database, on the background thread.
+        '''
+        if checked:
+            if self.searchText:
+                self.executor.submit(lambda db, text, transactionType, filters: set(db.searchIDs(text, transactionType, filters)),
+                                     self.searchText, self.transactionType, self.filters,
+                                     onResult=self.setCheckedIDs, key=('checkAll', id(self)))
+            else:
+                self.executor.submit(lambda db, transactionType, filters: set(db.transactionIDs(transactionType, filters)),
+                                     self.transactionType, self.filters,
+                                     onResult=self.setCheckedIDs, key=('checkAll', id(self)))
+        else:
+            self.executor.cancel(('checkAll', id(self)))
+            self.setCheckedIDs(set())
+
+    def setCheckedIDs(self, checkedIDs):
+        self.checkedIDs = checkedIDs
+        if self.rows:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self.rows) - 1, 0), [Qt.CheckStateRole])
+
+    def removeIDs(self, selectedIDs):
+        self.checkedIDs.difference_update(selectedIDs)
+        super().removeIDs(selectedIDs)
+
+class TransactionCardDelegate(QStyledItemDelegate):
+    '''
+    Delegate that paints a transaction as a card, the same look the windows had with one QLabel per transaction.
+    The theme colors are read from the ThemeManager when painting, so a theme change only needs a repaint.
+    If the model is checkable, a checkbox is painted on the left of the card and clicking the card toggles it.
+    '''
+    CARD_HEIGHT = 110
+    SPACING = 15
+    CHECKBOX_SIZE = 20
+
+    def __init__(self, themeManager, parent=None):
+        super().__init__(parent)
+        self.themeManager = themeManager
+        self.currencySuffix = ''
+
+        self.font = QFont('Noto Sans Mono')
+        self.font.setPixelSize(24)
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.CARD_HEIGHT + self.SPACING)
+
+    def cardRect(self, option):
+        '''
+        Function that returns the rectangle of the card inside the row, leaving the spacing between cards.
+        '''
+        return QRectF(option.rect.adjusted(2, 2, -2, -self.SPACING - 2))
+
+    def paint(self, painter, option, index):
+        row = index.data(RowRole)
+        if row is None:
+            return
+
+        colors = self.themeManager.colors
+        rect = self.cardRect(option)
+
+        painter.save()
+        painter.setRenderHint(painter.RenderHint.Antialiasing)
+
+        # Card
+        pen = QPen(QColor(TYPE_COLORS.get(row['type'], colors['Font']['font-color1'])))
+        pen.setWidth(3)
+        painter.setPen(pen)
+        painter.setBrush(QColor(colors['Entry']['bgcolor']))
+        painter.drawRoundedRect(rect, 15, 15)
+
+        textRect = rect.adjusted(15, 8, -15, -8)
+
+        # Checkbox
+        checkState = index.data(Qt.CheckStateRole)
+        if checkState is not None:
+            box = QRectF(textRect.left(), textRect.center().y() - self.CHECKBOX_SIZE / 2, self.CHECKBOX_SIZE, self.CHECKBOX_SIZE)
+            pen.setColor(QColor(colors['Font']['font-color0']))
+            pen.setWidth(2)
+            painter.setPen(pen)
+            if Qt.CheckState(checkState) == Qt.Checked:
+                painter.setBrush(QColor(colors['Button']['bgcolor']))
+            else:
+                painter.setBrush(QColor(colors['Secondary']))
+            painter.drawRoundedRect(box, 4, 4)
+            textRect = textRect.adjusted(self.CHECKBOX_SIZE + 15, 0, 0, 0)
+
+        # Text
+        year, month, day = dateExtraction(row['date'])
+        topHalf = textRect.adjusted(0, 0, 0, -textRect.height() / 2)
+        bottomHalf = textRect.adjusted(0, textRect.height() / 2, 0, 0)
+        width = topHalf.width()
+
+        painter.setFont(self.font)
+        painter.setPen(QColor(colors['Font']['font-color1']))
+        painter.drawText(topHalf, Qt.AlignLeft | Qt.AlignVCenter, f'{day}-{month}-{year}')
+        painter.drawText(topHalf.adjusted(width * 0.25, 0, 0, 0), Qt.AlignLeft | Qt.AlignVCenter, str(row['category']))
+        painter.drawText(topHalf.adjusted(width * 0.5, 0, 0, 0), Qt.AlignLeft | Qt.AlignVCenter, str(row['account']))
+        painter.drawText(topHalf, Qt.AlignRight | Qt.AlignVCenter, f"{Money.fromCents(row['amount']):,.2f} {self.currencySuffix}")
+        painter.drawText(bottomHalf, Qt.AlignLeft | Qt.AlignVCenter, str(row['description'] or ''))
+        painter.drawText(bottomHalf, Qt.AlignRight | Qt.AlignVCenter, str(row['created_at']))
+
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        '''
+        Function to toggle the checkbox of a checkable card when the card is clicked.
+        '''
+        if not (index.flags() & Qt.ItemIsUserCheckable):
+            return False
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            if self.cardRect(option).contains(event.position()):
+                checked = Qt.CheckState(index.data(Qt.CheckStateRole)) == Qt.Checked
+                return model.setData(index, Qt.Unchecked if checked else Qt.Checked, Qt.CheckStateRole)
+        return False
@@ -3,18 +3,24 @@ This file controls all the other files opening, processing, etc.
 Opening of all the application windows goes through this file.
 '''
 from PySide6.QtWidgets import QApplication  # Pyside6 for the GUI element of the program
+from PySide6.QtCore import QTimer
 import sys #  sys for proper opening and closing of the program
+import importlib
+from collections import OrderedDict
 
 # Other Python files being imported
+# The subwindows are imported the first time they are opened (see AppController.subWindow), so startup only imports the homepage
 from windows.home import MainWindow
-from windows.addTransaction import addTransactionWindow
-from windows.editExpense import editExpenseWindow
-from windows.editIncome import editIncomeWindow
-from windows.history import historyWindow
-from windows.user import userWindow
-from windows.settings import settingsWindow
 from helper.reportGenerator import monthlyReport
+from helper.recurringScheduler import recurringTransactions
+from helper.categoryCache import CategoryCache
 from helper.themeManager import ThemeManager
+from helper.configStore import ConfigStore
+from data.migrations import migrate
+from data.connection import ConnectionManager
+
+# Number of subwindows kept alive after they are closed, the least recently used one is destroyed above it
+MAX_CACHED_WINDOWS = 3
 
 
 class AppController:
@@ -24,9 +30,24 @@ class AppController:
     - Opening Windows
     - Closing Windows
     - Refreshing homepage
+    - Keeping the subwindows that were opened last, so opening them again does not build them again
     '''
+    # Module and class of each subwindow
+    WINDOWS = {
+        'addTransaction': ('windows.addTransaction', 'addTransactionWindow'),
+        'editExpense': ('windows.editExpense', 'editExpenseWindow'),
+        'editIncome': ('windows.editIncome', 'editIncomeWindow'),
+        'history': ('windows.history', 'historyWindow'),
+        'user': ('windows.user', 'userWindow'),
+        'settings': ('windows.settings', 'settingsWindow'),
+    }
+
     def __init__(self):
+        config = ConfigStore()  # Reads config.json once, every window reads the settings from it
+        migrate(config.version(), config.setVersion)  # Brings the database schema up to date before any window queries it
         self.window = MainWindow(ThemeManager)
+        self.sub_window = None
+        self.windowCache = OrderedDict()  # {name: subwindow}, the least recently shown first
 
         # Taskbar Buttons with functions linked
         self.window.refresh_Signal.connect(self.refresh)
@@ -37,9 +58,13 @@ class AppController:
         self.window.user_Signal.connect(self.open_user)
         self.window.settings_Signal.connect(self.open_settings)
         self.window.show()
-        monthlyReport()  # Automated finance report generator
+        # Recurring transactions due since the last run, submitted before the report so that it includes them
+        QTimer.singleShot(0, lambda: recurringTransactions(onAdded=lambda count: self.window.refreshChanged()))
+        QTimer.singleShot(0, CategoryCache().load)  # Categories of the windows read before one of them is opened
+        QTimer.singleShot(0, monthlyReport)  # Automated finance report generator
         '''
         Monthly report is being called here so that the report generation will happen as soon as the application opened.
+        It starts once the homepage is shown and the reports are written on the background thread, so it never delays it.
         The report will only be generated once a month, so it does not generate one every time you open the application.
         '''
 
@@ -50,98 +75,90 @@ class AppController:
     # To go back to Homescreen using the back button
     def go_home(self):
         '''
-            1, Closing the subwindow if it exists
+            1, Hiding the subwindow if it exists, it stays in the window cache to be shown again
             2, Showing the Homepage again
-            3, Refreshing the homepage
+            3, Refreshing the parts of the homepage whose data changed
         '''
         if self.sub_window:
-            self.sub_window.close()
+            self.sub_window.hide()
 
         self.window.show()
-        self.window.refresh()
+        self.window.refreshChanged()
+
+    def subWindow(self, name):
+        '''
+        Function that returns the subwindow of the given name from the window cache.
+        1, If the window is in the cache, only its data is refreshed (reloadData) instead of building every widget again
+        2, Otherwise its module is imported, the window is created and its back button is connected to the Homepage
+        3, The window becomes the most recently used one, and the least recently used windows
+           above MAX_CACHED_WINDOWS are destroyed with deleteLater
+        '''
+        window = self.windowCache.pop(name, None)
+        if window is None:
+            moduleName, className = self.WINDOWS[name]
+            windowClass = getattr(importlib.import_module(moduleName), className)
+            window = windowClass(ThemeManager)
+            window.goHome_Signal.connect(self.go_home)
+        else:
+            window.reloadData()
+        self.windowCache[name] = window
+
+        while len(self.windowCache) > MAX_CACHED_WINDOWS:
+            _, evicted = self.windowCache.popitem(last=False)
+            evicted.deleteLater()
+        return window
+
+    def open_window(self, name):
+        '''
+            Opens a subwindow
+            1. Takes the subwindow from the window cache, creating it the first time
+            2. Show the subwindow
+            3, hide the Homepage (main window)
+        '''
+        self.sub_window = self.subWindow(name)
+        self.sub_window.show()
+        self.window.hide()
 
     def open_addtransaction(self):
         '''
             Opens Add Transaction Window
-            1. Creates subwindow (Add Transaction Window)
-            2. Creates the back button in the subwindow to come back to the Homepage
-            3. Show the subwindow
-            4, hide the Homepage (main window)
         '''
-        self.sub_window = addTransactionWindow(ThemeManager)
-        self.sub_window.goHome_Signal.connect(self.go_home)
-        self.sub_window.show()
-        self.window.hide()
-
+        self.open_window('addTransaction')
 
     def open_editexpense(self):
         '''
             Opens Edit Expenses Window
-            1. Creates subwindow (Edit Expenses Window)
-            2. Creates the back button in the subwindow to come back to the Homepage
-            3. Show the subwindow
-            4, hide the Homepage (main window)
         '''
-        self.sub_window = editExpenseWindow(ThemeManager)
-        self.sub_window.goHome_Signal.connect(self.go_home)
-        self.sub_window.show()
-        self.window.hide()
+        self.open_window('editExpense')
 
     def open_editincome(self):
         '''
             Opens Edit Income Window
-            1. Creates subwindow (Edit Income Window)
-            2. Creates the back button in the subwindow to come back to the Homepage
-            3. Show the subwindow
-            4, hide the Homepage (main window)
         '''
-        self.sub_window = editIncomeWindow(ThemeManager)
-        self.sub_window.goHome_Signal.connect(self.go_home)
-        self.sub_window.show()
-        self.window.hide()
+        self.open_window('editIncome')
 
     def open_history(self):
         '''
             Opens History Window
-            1. Creates subwindow (History Window)
-            2. Creates the back button in the subwindow to come back to the Homepage
-            3. Show the subwindow
-            4, hide the Homepage (main window)
         '''
-        self.sub_window = historyWindow(ThemeManager)
-        self.sub_window.goHome_Signal.connect(self.go_home)
-        self.sub_window.show()
-        self.window.hide()
+        self.open_window('history')
 
     def open_user(self):
         '''
             Opens User Window
-            1. Creates subwindow (User Window)
-            2. Creates the back button in the subwindow to come back to the Homepage
-            3. Show the subwindow
-            4, hide the Homepage (main window)
         '''
-        self.sub_window = userWindow(ThemeManager)
-        self.sub_window.goHome_Signal.connect(self.go_home)
-        self.sub_window.show()
-        self.window.hide()
+        self.open_window('user')
 
     def open_settings(self):
         '''
             Opens Settings Window
-            1. Creates subwindow (Settings Window)
-            2. Creates the back button in the subwindow to come back to the Homepage
-            3. Show the subwindow
-            4, hide the Homepage (main window)
         '''
-        self.sub_window = settingsWindow(ThemeManager)
-        self.sub_window.goHome_Signal.connect(self.go_home)
-        self.sub_window.show()
-        self.window.hide()
-
+        self.open_window('settings')
 
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
+    app.aboutToQuit.connect(ConnectionManager().closeAll)  # Closing the shared database connections on exit
+    app.aboutToQuit.connect(lambda: ConfigStore().flush())  # Writing the settings changed in the last moments
     controller = AppController()
     sys.exit(app.exec())
\ No newline at end of file
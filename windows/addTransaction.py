@@ -4,16 +4,31 @@ This file will get opened by main.py when the add transaction button is pressed
 '''
 
 # Importing GUI elements
-from PySide6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QLabel, QPushButton, QDoubleSpinBox, QDateEdit, QComboBox, QTextEdit, QHBoxLayout, QFrame, QCheckBox
+from PySide6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QLabel, QPushButton, QDoubleSpinBox, QDateEdit, QComboBox, QTextEdit, QHBoxLayout, QFrame, QCheckBox, QMessageBox
 from PySide6.QtGui import QIcon, QFont, QKeySequence
 from PySide6.QtCore import Qt, Signal, QDate
 
 # Importing functions from other files
 from helper.dateAndTime import todayDate, dateFormat
-from data.database import DBmanager
+from helper.dbExecutor import DBExecutor
+from data.money import Money
+from data.recurring import FREQUENCIES
+from helper.configStore import ConfigStore
+from helper.categoryCache import CategoryCache
 
-# json to write and read json files
-import json
+
+def addEntry(db, entry):
+    '''
+    Function run on the background thread to add a transaction entered in the window.
+    A recurring transaction is added as a rule, whose transactions from the date entered up to today are then added.
+    '''
+    if entry['rule'] is None:
+        db.addTransactionToDB(entry['amount'], entry['IorE'], entry['category'], entry['date'], entry['description'], entry['account'])
+        return
+    frequency, interval, endDate = entry['rule']
+    db.addRecurringRule(entry['amount'], entry['IorE'], entry['category'], entry['date'], entry['description'], entry['account'],
+                        frequency, interval, endDate)
+    db.materializeRecurring()
 
 class addTransactionWindow(QMainWindow):
     '''
@@ -27,8 +42,10 @@ class addTransactionWindow(QMainWindow):
     - Select the means of transaction
     - Enter description for the transaction
     - Checkbox to no reset the value entered and selected
+    - Repeat the transaction every N days, weeks or months, until an end date or with no end
     '''
     goHome_Signal = Signal()
+    NO_END_DATE = QDate(2000, 1, 1)  # Lowest date of the end date entry, shown as "No end date"
 
     def __init__(self, ThemeManager):
         super().__init__()
@@ -73,10 +90,6 @@ class addTransactionWindow(QMainWindow):
         '''
         # UI elements
         # Theme
-        with open('data/config.json', 'r') as f:
-            data = json.load(f)
-            currentTheme = data['CurrentTheme']
-
         self.themeManager = ThemeManager()
         self.themeManager.themeChanged.connect(self.refreshTheme)
 
@@ -132,11 +145,52 @@ class addTransactionWindow(QMainWindow):
         calendar = self.dateEntry.calendarWidget()
         calendar.setMinimumSize(360, 300)
 
+        '''
+        repeatEntry makes the transaction recurring, it is then added again every intervalEntry days, weeks or months
+        from the date entered, until endDateEntry ("No end date" when left at its lowest date).
+        '''
+        self.repeatEntry = QComboBox()
+        self.repeatEntry.addItems(['Does not repeat'] + [f'Repeats every {unit.lower()}' for unit in FREQUENCIES.values()])
+        self.repeatEntry.currentIndexChanged.connect(self.repeatChange)
+        self.repeatEntryBaseStyle = '''
+            QComboBox {
+                font-size: 18px;
+                padding: 8px;
+                border-radius: 5px;
+                font-family: Adwaita mono;
+            }
+        '''
+
+        self.intervalEntry = QDoubleSpinBox()  # Whole numbers, a QDoubleSpinBox to share the style of the amount entry
+        self.intervalEntry.setDecimals(0)
+        self.intervalEntry.setRange(1, 365)
+        self.intervalEntry.setPrefix('Every ')
+        self.intervalEntryBaseStyle = '''
+            QDoubleSpinBox {
+                border-radius: 8px;
+                padding: 6px 10px;
+                font-size: 16px;
+            }
+        '''
+
+        self.endDateEntry = QDateEdit()
+        self.endDateEntry.setCalendarPopup(True)
+        self.endDateEntry.setDisplayFormat('dd-MM-yyyy')
+        self.endDateEntry.setFixedWidth(170)
+        self.endDateEntry.setMinimumDate(self.NO_END_DATE)
+        self.endDateEntry.setSpecialValueText('No end date')  # Shown instead of the lowest date
+        self.endDateEntry.setDate(self.NO_END_DATE)
+        self.repeatChange(0)
+
         '''
         Layout for the row1Card, uses horizontal layout
         '''
         row1CardLayout = QHBoxLayout(self.row1Card)
+        row1CardLayout.setSpacing(40)
         row1CardLayout.addWidget(self.dateEntry)
+        row1CardLayout.addWidget(self.repeatEntry)
+        row1CardLayout.addWidget(self.intervalEntry)
+        row1CardLayout.addWidget(self.endDateEntry)
 
         # Amount
         '''
@@ -149,11 +203,9 @@ class addTransactionWindow(QMainWindow):
         '''
 
         '''
-                Fetching the suffix for the currency from the json file.
+                Fetching the suffix for the currency from the settings.
                 '''
-        with open('data/config.json') as f:
-            data = json.load(f)
-            currencySuffix = f' {data["CurrencySuffix"]}'
+        currencySuffix = f' {ConfigStore().currencySuffix()}'
 
         '''
         To allow the user to enter the amount for the transaction
@@ -218,10 +270,11 @@ class addTransactionWindow(QMainWindow):
 
         # Account
         '''
-        accountEntry is to select the account through which the transaction is made
+        accountEntry is to select the account through which the transaction is made, from the accounts table.
         '''
+        self.executor = DBExecutor()
         self.accountEntry = QComboBox()
-        self.accountEntry.addItems(["Cash", "Bank", "Credit Card"])
+        self.accountChange()
         self.accountEntryBaseStyle = """
             QComboBox {
                 font-size: 18px;
@@ -311,6 +364,15 @@ class addTransactionWindow(QMainWindow):
 
         pageLayout.addStretch()
 
+    def reloadData(self):
+        '''
+        Function called when the window is shown again from the window cache of main.py.
+        Reads the currency suffix and the accounts again, since they may have changed while the window was hidden.
+        The categories are models of the category cache, which keeps them up to date.
+        '''
+        self.amountEntry.setSuffix(f' {ConfigStore().currencySuffix()}')
+        self.accountChange()
+
     def resetForm(self):
         '''
         Function to reset the value entered and selected after a transaction has been added
@@ -321,46 +383,88 @@ class addTransactionWindow(QMainWindow):
         self.categoryEntry.setCurrentIndex(0)
         self.accountEntry.setCurrentIndex(0)
         self.descriptionEntry.clear()
+        self.repeatEntry.setCurrentIndex(0)
+        self.intervalEntry.setValue(1)
+        self.endDateEntry.setDate(self.NO_END_DATE)
 
     def enterData(self):
         '''
-        Function to add the transaction into the database with the data given
-        '''
-        db = DBmanager()
-        amount = self.amountEntry.text()
-        IorE = self.typeEntry.currentText()
-        category = self.categoryEntry.currentText()
-        date = self.dateEntry.text()
-        new_date = dateFormat(date)
-        description = self.descriptionEntry.toPlainText()
-        account = self.accountEntry.currentText()
-
-        with open('data/config.json') as f:
-            data = json.load(f)
-            currencySuffix = f' {data["CurrencySuffix"]}'
-        amount = amount.rstrip(currencySuffix)
-
-        db.addTransactionToDB(float(amount), IorE.lower(), category, new_date, description, account)
-        if self.resetCh.isChecked():
-            pass
-        else:
+        Function to add the transaction into the database with the data given.
+        The duplicate check and the write run on the background thread, the button is disabled until the write is saved
+        so that a double click does not add the transaction twice.
+        '''
+        entry = {
+            'amount': Money.of(self.amountEntry.value()),  # The value, the text has the currency suffix
+            'IorE': self.typeEntry.currentText().lower(),
+            'category': self.categoryEntry.currentText(),
+            'date': dateFormat(self.dateEntry.text()),
+            'description': self.descriptionEntry.toPlainText(),
+            'account': self.accountEntry.currentText(),
+            'rule': None,  # (frequency, interval, end date) of a recurring transaction
+        }
+        if self.repeatEntry.currentIndex() > 0:
+            frequency = list(FREQUENCIES)[self.repeatEntry.currentIndex() - 1]
+            endDate = None if self.endDateEntry.date() == self.NO_END_DATE else self.endDateEntry.date().toString('yyyy-MM-dd')
+            if endDate is not None and endDate < entry['date']:
+                QMessageBox.warning(self, 'FundTrack', 'The end date is before the date of the transaction')
+                return
+            entry['rule'] = (frequency, int(self.intervalEntry.value()), endDate)
+
+        self.submitBtn.setEnabled(False)
+        self.executor.submit(lambda db: bool(db.findDuplicates(entry['amount'], entry['IorE'], entry['date'], entry['description'], entry['account'])),
+                             onResult=lambda duplicate: self.confirmEntry(entry, duplicate), onError=self.entryFailed)
+
+    def confirmEntry(self, entry, duplicate):
+        '''
+        Function called with the result of the duplicate check, asking before adding a transaction that is already in the database.
+        '''
+        if duplicate:
+            answer = QMessageBox.question(self, 'FundTrack', 'The same transaction was already added. Add it again?')
+            if answer != QMessageBox.Yes:
+                self.submitBtn.setEnabled(True)
+                return
+        self.executor.submit(addEntry, entry, onResult=self.entryDone, onError=self.entryFailed)
+
+    def entryDone(self, result):
+        self.submitBtn.setEnabled(True)
+        if not self.resetCh.isChecked():
             self.resetForm()
 
+    def entryFailed(self, message):
+        self.submitBtn.setEnabled(True)
+        QMessageBox.warning(self, 'FundTrack', f'The transaction could not be added:\n{message}')
+
     def categoryChange(self, typeSelected):
         '''
-        Function to change the options to select for category according to type selected
+        Function to change the options to select for category according to type selected.
+        The options are the model of the cached categories of that type, so no query is made.
+        '''
+        self.categoryEntry.setModel(CategoryCache().model(typeSelected.lower()))
+        self.categoryEntry.setCurrentIndex(0)
+
+    def repeatChange(self, index):
+        '''
+        Function to enable the interval and the end date only for a recurring transaction, and to show the unit of the interval.
         '''
-        self.categoryEntry.clear()
+        repeats = index > 0
+        self.intervalEntry.setEnabled(repeats)
+        self.endDateEntry.setEnabled(repeats)
+        if repeats:
+            self.intervalEntry.setSuffix(f' {list(FREQUENCIES.values())[index - 1].lower()}')
 
-        db = DBmanager()
-        self.categoryDBIncome = db.categories('income')
-        self.categoryDBExpense = db.categories('expense')
-        db.close()
+    def accountChange(self):
+        '''
+        Function to fill the options of the account entry with the accounts read on the background thread,
+        keeping the account that was selected.
+        '''
+        self.executor.submit(lambda db: db.accounts(), onResult=self.setAccounts, key=('accounts', id(self)))
 
-        if typeSelected == 'Income':
-            self.categoryEntry.addItems(self.categoryDBIncome)
-        else:
-            self.categoryEntry.addItems(self.categoryDBExpense)
+    def setAccounts(self, accounts):
+        selected = self.accountEntry.currentText()
+        self.accountEntry.clear()
+        self.accountEntry.addItems(accounts)
+        if selected:
+            self.accountEntry.setCurrentText(selected)
 
     def refreshTheme(self):
         self.mainWidget.setStyleSheet(self.themeManager.get_stylesheet('PrimaryASecondary'))
@@ -368,6 +472,9 @@ class addTransactionWindow(QMainWindow):
         self.backButton.setStyleSheet(self.backButtonBaseStyle + self.themeManager.get_stylesheet('QPushButton'))
         self.row1Card.setStyleSheet(self.row1CardBaseStyle)
         self.dateEntry.setStyleSheet(self.themeManager.get_stylesheet('QDateEdit'))
+        self.repeatEntry.setStyleSheet(self.repeatEntryBaseStyle + self.themeManager.get_stylesheet('QComboBox') + self.themeManager.get_stylesheet('QLabel'))
+        self.intervalEntry.setStyleSheet(self.intervalEntryBaseStyle + self.themeManager.get_stylesheet('QDoubleSpinBox') + self.themeManager.get_stylesheet('font_color1'))
+        self.endDateEntry.setStyleSheet(self.themeManager.get_stylesheet('QDateEdit'))
         self.row2Card.setStyleSheet(self.row2CardBaseStyle)
         self.amountEntry.setStyleSheet(self.amountEntryBaseStyle + self.themeManager.get_stylesheet('QDoubleSpinBox') + self.themeManager.get_stylesheet('font_color1'))
         self.typeEntry.setStyleSheet(self.typeEntryBaseStyle + self.themeManager.get_stylesheet('QComboBox') + self.themeManager.get_stylesheet('QLabel'))
@@ -0,0 +1,467 @@
+'''
+This file controls all the GUI elements shared by the Edit Expense and Edit Income windows.
+The two windows only differ by the type of the transactions they show (see editExpense.py and editIncome.py).
+'''
+
+# Importing GUI elements
+from PySide6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QLabel, QPushButton, QFrame, QListView, QComboBox, QCheckBox, QHBoxLayout, QLineEdit, QAbstractItemView, QProgressBar
+from PySide6.QtGui import QIcon, QFont, QKeySequence
+from PySide6.QtCore import Qt, Signal, QSize, QTimer
+
+# Importing functions from other files
+from helper.dateAndTime import NdateToFormattedDate
+from helper.transactionView import CheckableTransactionModel, TransactionCardDelegate
+from helper.configStore import ConfigStore
+from data.money import Money
+from helper.filterBar import FilterBar
+from helper.dbExecutor import DBExecutor
+from helper.categoryCache import CategoryCache
+
+
+class editTransactionWindow(QMainWindow):
+    '''
+    Controls all the GUI elements and functions of the edit window of a type of transactions ("income" or "expense").
+    Includes:
+    - Delete Transactions
+    - Change Amount
+    - Change Type
+    - Change Category
+    - Change Date
+    - Change Description
+    '''
+    goHome_Signal = Signal()
+    SEARCH_DELAY = 250  # ms
+
+    def __init__(self, ThemeManager, transactionType):
+        super().__init__()
+        self.transactionType = transactionType
+        self.setWindowTitle('FundTrack') # Title of the window
+
+        # Window settings
+        self.resize(1920, 1080)
+        self.setMinimumSize(1170, 650)
+
+        self.setWindowIcon(QIcon('img/iconOrange141414bgR.png'))
+
+        # Font elements
+        font = QFont()
+        font.setPointSize(26)
+        font.setBold(True)
+
+        # Layout
+        pageLayout = QVBoxLayout()
+        pageLayout.setAlignment(Qt.AlignTop)
+        pageLayout.setSpacing(35)
+
+
+        topRow = QHBoxLayout()
+        topRow.setAlignment(Qt.AlignLeft)
+
+
+        # UI elements
+        '''
+            mainWidget is one in which all the elements that should be in the central widget is added
+        '''
+        self.mainWidget = QWidget()
+        self.mainWidget.setLayout(pageLayout)
+        self.setCentralWidget(self.mainWidget)
+
+        # Theme
+        self.themeManager = ThemeManager()
+        self.themeManager.themeChanged.connect(self.refreshTheme)
+
+        '''
+            headingLabel is label for to display the heading of the window
+        '''
+        # Heading
+        self.headingLabel = QLabel(f"""Edit {transactionType.title()}
+──────────────────────────────────────────────────────────────────────────────────────────""")
+        self.headingLabel.setAlignment(Qt.AlignLeft)
+        self.headingLabelBaseStyle = """
+            font-size: 36px;
+            font-family: DejaVu Sans Mono;
+            padding-top: 15px;
+            padding-left: 10px;
+        """
+
+
+        '''
+        buttonCard is the card to hold all the buttons of options which can be used to manipulate the transactions.
+
+        The backButton allows the user to go back to the Homepage.
+        It also has the shortcut key of Ctrl + W, doing either of these will let the user get to the Homepage.
+        '''
+        buttonCard = QFrame()
+        buttonCardLayout = QHBoxLayout(buttonCard)
+
+        self.backButton = QPushButton(QIcon('img/back_icon.png'), 'Back')
+        self.backButton.setShortcut(QKeySequence('Ctrl+W'))
+        self.backButtonBaseStyle = '''
+            QPushButton {
+                padding: 10px 20px 10px 20px;
+                border-radius: 8px;
+                font-size: 16px;
+                text-align: left;
+            }
+            '''
+
+        self.backButton.clicked.connect(self.goHome_Signal.emit)
+
+        '''
+        deleteButton is a button that has the function linked to delete transactions that are selected.
+        '''
+        self.deleteButton = QPushButton(QIcon('img/bin_icon.png'), 'Delete')
+        self.deleteButton.setIconSize(QSize(18, 18))
+        self.deleteButton.setShortcut(QKeySequence('Ctrl+D'))
+        self.deleteButtonBaseStyle = '''
+            QPushButton {
+                padding: 10px 20px 10px 20px;
+                border-radius: 8px;
+                font-size: 18px;
+                text-align: left;
+            }
+        '''
+
+        self.deleteButton.clicked.connect(lambda: self.handleSelected('del'))
+
+        '''
+        changeAmountButton allows the user to change the amount of the transactions that are selected.
+        '''
+        self.changeAmountButton = QPushButton(QIcon('img/editAmount_icon.png'), 'Change Amount')
+        self.changeAmountButton.setIconSize(QSize(22, 22))
+        self.changeAmountButtonBaseStyle = '''
+            QPushButton {
+                padding: 10px 20px 10px 20px;
+                border-radius: 8px;
+                font-size: 18px;
+                text-align: left;
+            }
+            '''
+
+        self.changeAmountButton.clicked.connect(lambda: self.handleSelected('chAmnt'))
+
+        '''
+        changeTypeButton allows the user to change the type of transaction for the transactions selected.
+        The type will be changed to the opposite type with instantly with nothing else to do.
+        '''
+        self.changeTypeButton = QPushButton(QIcon('img/changeType_icon.png'), 'Change Type')
+        self.changeTypeButton.setIconSize(QSize(26, 26))
+        self.changeTypeButtonBaseStyle = '''
+            QPushButton {
+                padding: 10px 20px 10px 20px;
+                border-radius: 8px;
+                font-size: 18px;
+                text-align: left;
+            }
+            '''
+        self.changeTypeButton.clicked.connect(lambda: self.handleSelected('chType'))
+
+        '''
+        changeCategoryButton allows the user to change the category of the transactions selected.
+        '''
+        self.changeCategoryButton = QPushButton(QIcon('img/changeCategory_icon.png'), 'Change Category')
+        self.changeCategoryButton.setIconSize(QSize(26, 26))
+        self.changeCategoryButtonBaseStyle = '''
+            QPushButton {
+                padding: 10px 20px 10px 20px;
+                border-radius: 8px;
+                font-size: 18px;
+                text-align: left;
+            }
+            '''
+        self.changeCategoryButton.clicked.connect(lambda: self.handleSelected('chCate'))
+
+        '''
+        changeDateButton allows the user to change the date of the transactions that are selected.
+        '''
+        self.changeDateButton = QPushButton(QIcon('img/changeDate_icon.png'), 'Change Date')
+        self.changeDateButton.setIconSize(QSize(26, 26))
+        self.changeDateButtonBaseStyle = '''
+            QPushButton {
+                padding: 10px 20px 10px 20px;
+                border-radius: 8px;
+                font-size: 18px;
+                text-align: left;
+            }
+            '''
+
+        self.changeDateButton.clicked.connect(lambda: self.handleSelected('chDate'))
+
+        '''
+        changeDescriptionButton allows the user to change the description of the transactions that are selected.
+        '''
+        self.changeDescriptionButton = QPushButton(QIcon('img/changeDescription_icon.png'), 'Change Description')
+        self.changeDescriptionButton.setIconSize(QSize(26, 26))
+        self.changeDescriptionButtonBaseStyle = '''
+            QPushButton {
+                padding: 10px 20px 10px 20px;
+                border-radius: 8px;
+                font-size: 18px;
+                text-align: left;
+            }
+            '''
+
+        self.changeDescriptionButton.clicked.connect(lambda: self.handleSelected('chDesc'))
+
+        '''
+        textEntry is to enter the new data to replace the current one with the selected transactions.
+        '''
+        self.textEntry = QLineEdit()
+        self.textEntry.setPlaceholderText('Amount: Number | Date: DD-MM-YYYY ')
+        self.textEntry.setAlignment(Qt.AlignLeft)
+        self.textEntry.setCompleter(CategoryCache().completer(transactionType, self.textEntry))  # Most used categories first
+        self.textEntryBaseStyle = '''
+            QLineEdit {
+                font-size: 18px;
+                font-family: Adwaita mono;
+                padding-top: 7px;
+                padding-bottom: 7px;
+                border-radius: 5px;
+            }
+            '''
+
+        buttonCardLayout.addWidget(self.deleteButton)
+        buttonCardLayout.addWidget(self.changeAmountButton)
+        buttonCardLayout.addWidget(self.changeTypeButton)
+        buttonCardLayout.addWidget(self.changeCategoryButton)
+        buttonCardLayout.addWidget(self.changeDateButton)
+        buttonCardLayout.addWidget(self.changeDescriptionButton)
+        buttonCardLayout.addWidget(self.textEntry)
+
+        topRow.addWidget(buttonCard)
+
+        '''
+        selectAllCheckBox checks every transaction at once, even the ones that were not scrolled to yet.
+        '''
+        self.selectAllCheckBox = QCheckBox('Select All')
+        self.selectAllCheckBox.toggled.connect(self.selectAll)
+
+        '''
+        transactionView is the list of the transactions, with a checkbox on each of them to select it.
+        Only the visible transactions are painted and the next ones are fetched when scrolling to the end.
+        '''
+        self.transactionModel = CheckableTransactionModel(transactionType=transactionType)
+        self.transactionDelegate = TransactionCardDelegate(self.themeManager)
+
+        self.transactionView = QListView()
+        self.transactionView.setModel(self.transactionModel)
+        self.transactionView.setItemDelegate(self.transactionDelegate)
+        self.transactionView.setUniformItemSizes(True)  # Every card has the same height, so Qt does not measure each row
+        self.transactionView.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.transactionView.setSelectionMode(QAbstractItemView.NoSelection)
+        self.transactionViewBaseStyle = '''
+            border: none;
+        '''
+
+        '''
+        loadingBar is shown while the transactions are being fetched or changed on the background thread.
+        '''
+        self.executor = DBExecutor()
+        self.loadingBar = QProgressBar()
+        self.loadingBar.setRange(0, 0)  # No end, it only shows that something is running
+        self.loadingBar.setTextVisible(False)
+        self.loadingBar.setFixedHeight(6)
+        self.loadingBar.setVisible(self.executor.isBusy())
+        self.executor.busyChanged.connect(self.loadingBar.setVisible)
+
+        # Sort Feature
+        '''
+        menu to sort the transactions in order.
+        '''
+        self.sortMenu = QComboBox()
+        self.sortMenuBaseStyle = """
+            QComboBox {
+                font-size: 18px;
+                padding: 8px;
+                border-radius: 5px;
+                font-family: Adwaita mono;
+            }
+        """
+        self.sortMenu.addItems(
+            ['Date DESC',
+             'Date ASC',
+             'Created ASC',
+             'Created DESC',
+             'Amount H->L',
+             'Amount L->H'])
+        pageLayout.addWidget(self.sortMenu)
+
+        self.selectedIDs = []
+        self.sortToSaver = ''
+
+        self.sortMenu.currentTextChanged.connect(self.transactionSort)
+        self.transactionSort(self.sortMenu.currentText())
+
+        '''
+        searchEntry shows only the transactions whose description, category or account match what is typed.
+        The search runs once the user stopped typing for SEARCH_DELAY ms, so typing a word runs a single query.
+        '''
+        self.searchEntry = QLineEdit()
+        self.searchEntry.setPlaceholderText('Search description, category or account')
+        self.searchEntry.setClearButtonEnabled(True)
+        self.searchEntryBaseStyle = '''
+            QLineEdit {
+                font-size: 18px;
+                font-family: Adwaita mono;
+                padding: 8px;
+                border-radius: 5px;
+            }
+            '''
+        self.searchTimer = QTimer(self)
+        self.searchTimer.setSingleShot(True)
+        self.searchTimer.setInterval(self.SEARCH_DELAY)
+        self.searchTimer.timeout.connect(self.transactionSearch)
+        self.searchEntry.textChanged.connect(self.searchTimer.start)  # Restarting the timer on every key
+
+
+        '''
+        filterBar keeps only the transactions of a date range, categories, accounts or amount range.
+        The filters are added to the queries of the model, so only the matching transactions are fetched.
+        '''
+        self.filterBar = FilterBar(self.themeManager, transactionType=transactionType)
+        self.filterBar.filtersChanged.connect(self.transactionFilter)
+
+        pageLayout.addWidget(self.backButton)
+        pageLayout.addWidget(self.headingLabel)
+        pageLayout.addLayout(topRow)
+        pageLayout.addWidget(self.sortMenu)
+        pageLayout.addWidget(self.searchEntry)
+        pageLayout.addWidget(self.filterBar)
+        pageLayout.addWidget(self.selectAllCheckBox)
+        pageLayout.addWidget(self.loadingBar)
+        pageLayout.addWidget(self.transactionView, 1)
+        self.refreshTheme()
+        pageLayout.addStretch()
+
+        self.setCentralWidget(self.mainWidget)
+
+    def transactionSort(self, sortedTo):
+        '''
+        Function to sort the transactions in order according to what is selected in the menu.
+        The model drops the fetched transactions and the view fetches the first page of the new order.
+        '''
+        self.sortToSaver = sortedTo
+        self.deleteSelectedIDs()
+        self.transactionDelegate.currencySuffix = ConfigStore().currencySuffix()
+
+        self.transactionModel.setSort(sortedTo)
+
+    def reloadData(self):
+        '''
+        Function called when the window is shown again from the window cache of main.py.
+        The selection and the entry are cleared and the transactions are fetched again from the first page.
+        '''
+        self.textEntry.clear()
+        self.filterBar.loadOptions()
+        self.transactionSort(self.sortMenu.currentText())
+
+    def transactionSearch(self):
+        '''
+        Function to show only the transactions matching the text of searchEntry, the best matches first.
+        The selection is cleared since the checked transactions may not be in the results.
+        The sorting menu does not apply to the results of a search, so it is disabled while searching.
+        '''
+        text = self.searchEntry.text()
+        self.deleteSelectedIDs()
+        self.sortMenu.setEnabled(not text.strip())
+        self.transactionModel.setSearch(text)
+
+    def transactionFilter(self, filters):
+        '''
+        Function to show only the transactions matching the filters of filterBar.
+        The selection is cleared since the checked transactions may not match the filters.
+        '''
+        self.deleteSelectedIDs()
+        self.transactionModel.setFilters(filters)
+
+    def selectAll(self, checked):
+        '''
+        Function to check or uncheck every transaction of the window.
+        '''
+        self.transactionModel.setAllChecked(checked)
+
+    def handleSelected(self, function):
+        '''
+        Function to make changes to the transaction which are selected, and to make changes according to the option clicked.
+        The change runs on the background thread so a large selection does not freeze the window,
+        then only the edited transactions are updated in the list instead of building it again.
+        '''
+        self.selectedIDs = list(self.transactionModel.checkedIDs)
+        if not self.selectedIDs:
+            return
+        selectedIDs = list(self.selectedIDs)
+        change = None  # Function run with the DBmanager of the background thread
+
+        if function == 'del':
+            change = lambda db: db.deleteSelected(selectedIDs)
+
+        elif function == 'chAmnt':
+            newAmount = self.textEntry.text()
+            if newAmount.isnumeric():
+                newAmount = Money.of(newAmount)
+                change = lambda db: db.changeAmount(selectedIDs, newAmount)
+
+        elif function == 'chType':
+            change = lambda db: db.changeType(selectedIDs)  # The transactions leave this window
+
+        elif function == 'chCate':
+            newCategory = self.textEntry.text().title()
+            if newCategory in CategoryCache().names(self.transactionType):  # Checked against the cached categories, before any query
+                change = lambda db: db.changeCategory(selectedIDs, newCategory)
+
+        elif function == 'chDate':
+            newDate = self.textEntry.text()
+            points = 0
+            if newDate[2] == '-' and newDate[5] == '-':
+                points += 1
+            if newDate[0].isnumeric() and newDate[1].isnumeric() and newDate[3].isnumeric() and newDate[4].isnumeric() and newDate[6].isnumeric() and newDate[7].isnumeric() and newDate[8].isnumeric() and newDate[9].isnumeric():
+                points += 1
+            if points == 2:
+                formattedDate = NdateToFormattedDate(newDate)
+                change = lambda db: db.changeDate(selectedIDs, formattedDate)
+
+        elif function == 'chDesc':
+            newDescription = self.textEntry.text()
+            change = lambda db: db.changeDecription(selectedIDs, newDescription)
+
+        if change is not None:
+            self.executor.submit(change, onResult=lambda result: self.changeDone(function, selectedIDs))
+        self.deleteSelectedIDs()
+
+    def changeDone(self, function, selectedIDs):
+        '''
+        Function called when a change made by handleSelected is saved, to update the transactions in the list.
+        '''
+        if function == 'del':
+            self.transactionModel.removeIDs(selectedIDs)
+        else:
+            self.transactionModel.updateIDs(selectedIDs)
+        self.filterBar.loadOptions()  # A category may have been added or removed
+
+    def deleteSelectedIDs(self):
+        '''
+        Function to clear the selected transactions.
+        '''
+        self.selectedIDs.clear()
+        self.selectAllCheckBox.blockSignals(True)  # Unticking it here should not uncheck everything a second time
+        self.selectAllCheckBox.setChecked(False)
+        self.selectAllCheckBox.blockSignals(False)
+        self.transactionModel.setAllChecked(False)
+
+    def refreshTheme(self):
+        self.headingLabel.setStyleSheet(self.headingLabelBaseStyle + self.themeManager.get_stylesheet("QLabel"))
+        self.backButton.setStyleSheet(self.backButtonBaseStyle + self.themeManager.get_stylesheet('QPushButton'))
+        self.deleteButton.setStyleSheet(self.deleteButtonBaseStyle + self.themeManager.get_stylesheet('QPushButton'))
+        self.changeAmountButton.setStyleSheet(self.changeAmountButtonBaseStyle + self.themeManager.get_stylesheet('QPushButton'))
+        self.changeTypeButton.setStyleSheet(self.changeTypeButtonBaseStyle + self.themeManager.get_stylesheet('QPushButton'))
+        self.changeCategoryButton.setStyleSheet(self.changeCategoryButtonBaseStyle + self.themeManager.get_stylesheet('QPushButton'))
+        self.changeDateButton.setStyleSheet(self.changeDateButtonBaseStyle + self.themeManager.get_stylesheet('QPushButton'))
+        self.changeDescriptionButton.setStyleSheet(self.changeDescriptionButtonBaseStyle + self.themeManager.get_stylesheet('QPushButton'))
+        self.textEntry.setStyleSheet(self.textEntryBaseStyle + self.themeManager.get_stylesheet('QLineEdit'))
+        self.searchEntry.setStyleSheet(self.searchEntryBaseStyle + self.themeManager.get_stylesheet('QLineEdit'))
+        self.filterBar.refreshTheme()
+        self.sortMenu.setStyleSheet(self.sortMenuBaseStyle + self.themeManager.get_stylesheet('QComboBox') + self.themeManager.get_stylesheet('QLabel'))
+        self.selectAllCheckBox.setStyleSheet(self.themeManager.get_stylesheet('QCheckBox'))
+        self.mainWidget.setStyleSheet(self.themeManager.get_stylesheet('PrimaryASecondary'))
+        self.transactionView.setStyleSheet(self.transactionViewBaseStyle)
+        self.transactionView.viewport().update()  # Cards are painted with the theme colors
\ No newline at end of file
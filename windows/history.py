@@ -5,17 +5,15 @@ or when the shortcut key is pressed.
 '''
 
 # Importing GUI elements
-from PySide6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QLabel, QPushButton, QFrame, QScrollArea, QComboBox
+from PySide6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QLabel, QPushButton, QFrame, QListView, QComboBox, QAbstractItemView, QProgressBar, QLineEdit
 from PySide6.QtGui import QIcon, QFont, QKeySequence
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import Qt, Signal, QTimer
 
 # Importing functions from other files
-from data.database import DBmanager
-from helper.dateAndTime import dateExtraction
-from helper.HPrefresher import clear_layout
+from helper.transactionView import TransactionTableModel, TransactionCardDelegate
+from helper.configStore import ConfigStore
+from helper.filterBar import FilterBar
 
-# json to write and read json file
-import json
 
 class historyWindow(QMainWindow):
     '''
@@ -26,6 +24,7 @@ class historyWindow(QMainWindow):
     - Display all the available shortcuts in the program
     '''
     goHome_Signal = Signal()
+    SEARCH_DELAY = 250  # ms
 
     def __init__(self, ThemeManager):
         super().__init__()
@@ -54,7 +53,8 @@ class historyWindow(QMainWindow):
         
         backButton is the button on the top part of the window that allows user to return to the HomePage.
         
-        scroll is the variable which allows the user to scroll through the page of recent transactions.
+        transactionView is the list of transactions. It only paints the transactions that are visible and asks
+        the model for the next page of transactions when the user scrolls to the end.
         '''
 
         self.mainWidget = QWidget()
@@ -62,12 +62,8 @@ class historyWindow(QMainWindow):
         self.setCentralWidget(self.mainWidget)
 
         # Theme
-        with open('data/config.json', 'r') as f:
-            data = json.load(f)
-            currentTheme = data['CurrentTheme']
-
-            self.themeManager = ThemeManager()
-            self.themeManager.themeChanged.connect(self.refreshTheme)
+        self.themeManager = ThemeManager()
+        self.themeManager.themeChanged.connect(self.refreshTheme)
 
         # Heading
         self.headingLabel = QLabel("""History
@@ -92,14 +88,28 @@ class historyWindow(QMainWindow):
         '''
         self.backButton.clicked.connect(self.goHome_Signal.emit)
 
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-
-        content = QWidget()
-        self.contentLayout = QVBoxLayout(content)
-        self.contentLayout.setSpacing(30)
+        self.transactionModel = TransactionTableModel()
+        self.transactionDelegate = TransactionCardDelegate(self.themeManager)
+
+        self.transactionView = QListView()
+        self.transactionView.setModel(self.transactionModel)
+        self.transactionView.setItemDelegate(self.transactionDelegate)
+        self.transactionView.setUniformItemSizes(True)  # Every card has the same height, so Qt does not measure each row
+        self.transactionView.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.transactionView.setSelectionMode(QAbstractItemView.NoSelection)
+        self.transactionViewBaseStyle = '''
+            border: none;
+        '''
 
-        scroll.setWidget(content)
+        '''
+        loadingBar is shown while a page of transactions is being fetched on the background thread.
+        '''
+        self.loadingBar = QProgressBar()
+        self.loadingBar.setRange(0, 0)  # No end, it only shows that something is running
+        self.loadingBar.setTextVisible(False)
+        self.loadingBar.setFixedHeight(6)
+        self.loadingBar.setVisible(False)
+        self.transactionModel.loadingChanged.connect(self.loadingBar.setVisible)
 
         # Sort Feature
         '''
@@ -130,10 +140,42 @@ class historyWindow(QMainWindow):
         self.sortMenu.currentTextChanged.connect(self.transactionSort)
         self.transactionSort(self.sortMenu.currentText())
 
+        '''
+        searchEntry shows only the transactions whose description, category or account match what is typed.
+        The search runs once the user stopped typing for SEARCH_DELAY ms, so typing a word runs a single query.
+        '''
+        self.searchEntry = QLineEdit()
+        self.searchEntry.setPlaceholderText('Search description, category or account')
+        self.searchEntry.setClearButtonEnabled(True)
+        self.searchEntryBaseStyle = '''
+            QLineEdit {
+                font-size: 18px;
+                font-family: Adwaita mono;
+                padding: 8px;
+                border-radius: 5px;
+            }
+            '''
+        self.searchTimer = QTimer(self)
+        self.searchTimer.setSingleShot(True)
+        self.searchTimer.setInterval(self.SEARCH_DELAY)
+        self.searchTimer.timeout.connect(self.transactionSearch)
+        self.searchEntry.textChanged.connect(self.searchTimer.start)  # Restarting the timer on every key
+
+
+        '''
+        filterBar keeps only the transactions of a date range, type, categories, accounts or amount range.
+        The filters are added to the queries of the model, so only the matching transactions are fetched.
+        '''
+        self.filterBar = FilterBar(self.themeManager)
+        self.filterBar.filtersChanged.connect(self.transactionFilter)
+
         pageLayout.addWidget(self.backButton)
         pageLayout.addWidget(self.headingLabel)
         pageLayout.addWidget(self.sortMenu)
-        pageLayout.addWidget(scroll, 1)
+        pageLayout.addWidget(self.searchEntry)
+        pageLayout.addWidget(self.filterBar)
+        pageLayout.addWidget(self.loadingBar)
+        pageLayout.addWidget(self.transactionView, 1)
         self.refreshTheme()
         pageLayout.addStretch()
 
@@ -143,51 +185,43 @@ class historyWindow(QMainWindow):
         This function will be called whenever the history windows is opened,
         and when the option inside the sorter is changed.
 
-        - First clears out layout with another function imported.
-        - Fetches the suffix from the JSON file.
-        - Converts the date format, selects border color according to the transaction type and
-          creates Label with content.
+        - Fetches the suffix from the settings for the delegate.
+        - Changes the order of the model, which cancels the page being fetched and drops the fetched pages.
+          The view then fetches the first page of the new order, and the next ones as the user scrolls.
         '''
-        clear_layout(self.contentLayout)
-        db = DBmanager()
-        data = db.transactionHistory(sortedTo)
-
-        with open('data/config.json') as f:
-            read = json.load(f)
-            currencySuffix = f' {read["CurrencySuffix"]}'
-
-            currentTheme = read["CurrentTheme"]
-            for i in read['Themes']:
-                fontConfig = i[currentTheme]['Font']
-                font_color1 = fontConfig['font-color1']
-
-                entryConfig = i[currentTheme]['Entry']
-                entryConfigBgColor = entryConfig["bgcolor"]
-
-
-        for i in data:
-            year, month, day = dateExtraction(i['date'])
-            fullDate = day+'-'+month+'-'+year
+        self.transactionDelegate.currencySuffix = ConfigStore().currencySuffix()
 
-            if i['type'] == 'income':
-                transactionColorCode = '#11b343'
-            elif i['type'] == 'expense':
-                transactionColorCode = '#c71413'
+        self.transactionModel.setSort(sortedTo)
 
-            label = QLabel(f'''{fullDate:<10}                    {i['category']:^22}              {i['account']:^20}                        {i['amount']:>8}{currencySuffix}
+    def transactionSearch(self):
+        '''
+        Function to show only the transactions matching the text of searchEntry, the best matches first.
+        The sorting menu does not apply to the results of a search, so it is disabled while searching.
+        '''
+        text = self.searchEntry.text()
+        self.sortMenu.setEnabled(not text.strip())
+        self.transactionModel.setSearch(text)
 
-{i['description']}                                                                                     {i['created_at']:>20}''')
-            label.setStyleSheet(f'''
-                font-size: 24px;
-                background-color: {entryConfigBgColor};
-                border: 3px solid {transactionColorCode};
-                border-radius: 15px;
-                color: {font_color1};''')
+    def transactionFilter(self, filters):
+        '''
+        Function to show only the transactions matching the filters of filterBar.
+        '''
+        self.transactionModel.setFilters(filters)
 
-            self.contentLayout.addWidget(label)
+    def reloadData(self):
+        '''
+        Function called when the window is shown again from the window cache of main.py.
+        The transactions are fetched again from the first page, in the order that was selected.
+        '''
+        self.filterBar.loadOptions()
+        self.transactionSort(self.sortMenu.currentText())
 
     def refreshTheme(self):
         self.headingLabel.setStyleSheet(self.headingLabelBaseStyle + self.themeManager.get_stylesheet("QLabel"))
         self.backButton.setStyleSheet(self.backButtonBaseStyle + self.themeManager.get_stylesheet("QPushButton"))
+        self.searchEntry.setStyleSheet(self.searchEntryBaseStyle + self.themeManager.get_stylesheet('QLineEdit'))
+        self.filterBar.refreshTheme()
         self.sortMenu.setStyleSheet(self.sortMenuBaseStyle + self.themeManager.get_stylesheet("QComboBox") + self.themeManager.get_stylesheet('QLabel'))
-        self.mainWidget.setStyleSheet(self.themeManager.get_stylesheet("PrimaryASecondary"))
\ No newline at end of file
+        self.mainWidget.setStyleSheet(self.themeManager.get_stylesheet("PrimaryASecondary"))
+        self.transactionView.setStyleSheet(self.transactionViewBaseStyle)
+        self.transactionView.viewport().update()  # Cards are painted with the theme colors
\ No newline at end of file
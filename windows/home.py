@@ -8,26 +8,27 @@ we can update the changes onto the homepage
 '''
 
 # Importing GUI elements
-from PySide6.QtWidgets import QMainWindow, QWidget, QLabel, QVBoxLayout, QHBoxLayout, QToolBar, QFrame
+from PySide6.QtWidgets import QMainWindow, QWidget, QLabel, QVBoxLayout, QHBoxLayout, QToolBar, QFrame, QProgressBar
 from PySide6.QtGui import QAction, QFont, QIcon, QKeySequence
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import Qt, Signal, QTimer
 
 # Importing functions from other files
-from data.database import DBmanager
-from helper.barchartMatplotlib import initiation, plot_bar_chart
-from helper.HPrefresher import summaryCardRefresher, transactionHistoryRefresher, greetingRefresh, barchartRefresher
+from data.changeBus import ChangeBus
+from helper.dateAndTime import tdy
+from helper.HPrefresher import fetchHomeData, summaryCardRefresher, transactionHistoryRefresher, greetingRefresh, barchartRefresher
+from helper.configStore import ConfigStore
+from helper.dbExecutor import DBExecutor
+from helper.barchart import createBarChart
 
-# json to write and read json files
-import json
 
 class MainWindow(QMainWindow):
     '''
     Controls all the GUI elements and functions of the homepage.
     Include:
     - Displaying a greeting for the user
-    - A barchart using matplotlib of Income and Expense
+    - A barchart of Income and Expense, painted natively or with matplotlib according to the settings
     - Five recent transactions
-    - Displays budget, expense and whats left under summary
+    - Displays budget, expense and whats left under summary, and how much of the budget of each category was spent
     '''
     refresh_Signal = Signal()
     addTransaction_Signal = Signal()
@@ -36,6 +37,7 @@ class MainWindow(QMainWindow):
     history_Signal = Signal()
     user_Signal = Signal()
     settings_Signal = Signal()
+    changeReceived = Signal(object)  # DataChange, emitted on the thread of the write and delivered on the GUI thread
 
     def __init__(self, ThemeManager):
         super().__init__()
@@ -75,12 +77,23 @@ class MainWindow(QMainWindow):
 
         # Create UI elements
         # Theme
-        with open('data/config.json', 'r') as f:
-            data = json.load(f)
-            currentTheme = data['CurrentTheme']
-
         self.themeManager = ThemeManager()
         self.themeManager.themeChanged.connect(self.refreshTheme)
+        self.themeManager.themeChanged.connect(lambda: self.markDirty('chart'))  # The barchart is drawn with the theme colors
+
+        '''
+        dirty holds the parts of the homepage that have to be fetched again before they are shown.
+        They are marked by the changes the database publishes, so coming back to the homepage
+        only fetches the parts whose data changed.
+        '''
+        self.dirty = {'summary', 'history', 'chart'}
+        self.fetching = set()  # Parts being fetched on the background thread
+        self.executor = DBExecutor()
+        self.shownMonth = None  # Month the summary and barchart were fetched for
+        self.historyOldestDate = None  # Oldest date among the recent transactions shown
+        self.changeReceived.connect(self.markChanged)
+        ChangeBus().subscribe(self.dataChanged)
+        ConfigStore().configChanged.connect(self.configChanged)
 
 
         # Toolbar options
@@ -150,6 +163,16 @@ class MainWindow(QMainWindow):
             padding-left: 10px;
         """
 
+        '''
+        loadingBar is shown while the data of the homepage is being fetched on the background thread.
+        '''
+        self.loadingBar = QProgressBar()
+        self.loadingBar.setRange(0, 0)  # No end, it only shows that something is running
+        self.loadingBar.setTextVisible(False)
+        self.loadingBar.setFixedHeight(6)
+        self.loadingBar.setVisible(False)
+        self.executor.busyChanged.connect(self.loadingBar.setVisible)
+
         # Top row
         '''
         Top row is after the "HomePage" text on the top of the window.
@@ -184,9 +207,13 @@ class MainWindow(QMainWindow):
             font-size: 18px;
         '''
 
+        # Progress of the budget of each category this month, filled by summaryCardRefresher
+        self.budgetsLayout = QVBoxLayout()
+
         summaryLayout = QVBoxLayout(self.summaryCard)
         summaryLayout.addWidget(self.summaryLabel)
         summaryLayout.addWidget(self.budgetLabel)
+        summaryLayout.addLayout(self.budgetsLayout)
 
         topRow.addWidget(self.summaryCard)
 
@@ -215,10 +242,12 @@ class MainWindow(QMainWindow):
         historyCard is the card in which the five most recent transactions will be shown.
         historyLayout is layout for historyCard. It is vertical, therefore the labels in vertical order.
         
-        barCard is the card in which the canvas for matplotlib goes.
+        barCard is the card in which the barchart goes.
         barLayout is the layout for barCard to display the barchart.
-        The barchart is drawn using functions which are located in other file. Only the final data is being used
-        in this file.
+        The barchart is drawn by the backend selected in the settings (see helper/barchart.py). Only the final data is
+        being used in this file.
+        Importing matplotlib takes longer than building the rest of the window, so the barchart is only created
+        by createChart once the homepage is shown.
         '''
         self.historyCard = QFrame()
         self.historyCard.setFixedWidth(900)
@@ -238,24 +267,23 @@ class MainWindow(QMainWindow):
         self.historyLayout = QVBoxLayout(self.historyCard)
         self.historyLayout.addWidget(self.historyLabel)
 
-        # Bar chart with Matplotlib
+        # Bar chart
         self.barCard = QFrame()
         self.barCard.setFixedWidth(750)
         self.barCardBaseStyle = '''
             border-radius: 20px;
         '''
 
+        self.chart = None
+        self.chartValues = None  # Values fetched before the barchart was created
 
-        self.figure, self.canvas = initiation()
-        self.plt = plot_bar_chart(self.figure, self.canvas)
-
-        barLayout = QVBoxLayout(self.barCard)
-        barLayout.addWidget(self.canvas)
+        self.barLayout = QVBoxLayout(self.barCard)
 
         bottomRow.addWidget(self.historyCard)
         bottomRow.addWidget(self.barCard)
 
         pageLayout.addWidget(self.headingLabel)
+        pageLayout.addWidget(self.loadingBar)
         pageLayout.addLayout(topRow)
         pageLayout.addLayout(bottomRow)
 
@@ -268,7 +296,17 @@ class MainWindow(QMainWindow):
         self.mainWidget.setLayout(pageLayout)
         self.setCentralWidget(self.mainWidget)
 
-        self.refresh()
+        self.refresh()  # The data is fetched on the background thread while the window is shown
+        QTimer.singleShot(0, self.createChart)  # Runs once the event loop started, after the homepage is painted
+
+    def createChart(self):
+        '''
+        Function to create the barchart with the backend selected in the settings, after the rest of the homepage is shown.
+        '''
+        self.chart = createBarChart()
+        if self.chartValues is not None:
+            self.chart.setValues(self.chartValues)
+        self.barLayout.addWidget(self.chart.widget)
 
     def refresh(self):
         '''
@@ -276,12 +314,93 @@ class MainWindow(QMainWindow):
         This function calls other individual functions which are assigned to refresh the data of each element
         in the homepage window.
         '''
-        summaryCardRefresher(self.budgetLabel)
-        transactionHistoryRefresher(self.historyLayout)
-        greetingRefresh(self.greetingLabel)
-        barchartRefresher(self.plt, self.figure, self.canvas)
+        self.markDirty('summary', 'history', 'chart')
+        self.refreshChanged()
         self.refreshTheme()
 
+    def refreshChanged(self):
+        '''
+        Function to refresh only the parts of the homepage whose data changed since they were last shown.
+        The greeting is always refreshed since it depends on the time.
+        The data of the other parts is fetched on the background thread and shown by showData when it arrives.
+        '''
+        today = tdy()
+        if self.shownMonth != (today.year, today.month):
+            self.markDirty('summary', 'chart')
+            self.shownMonth = (today.year, today.month)
+
+        greetingRefresh(self.greetingLabel)
+        if not self.dirty:
+            return
+        # A fetch still running is replaced by this one, so its parts are fetched again with the new ones
+        self.fetching |= self.dirty
+        self.dirty.clear()
+        self.executor.submit(fetchHomeData, set(self.fetching), onResult=self.showData, key=('home', id(self)))
+
+    def showData(self, data):
+        '''
+        Function to show the data fetched by refreshChanged in the parts of the homepage.
+        '''
+        self.fetching.clear()
+        if 'summary' in data:
+            totalExpense, budgetStatuses = data['summary']
+            summaryCardRefresher(self.budgetLabel, totalExpense, self.budgetsLayout, budgetStatuses)
+        if 'history' in data:
+            shown = transactionHistoryRefresher(self.historyLayout, data['history'])
+            self.historyOldestDate = min(row[2] for row in shown) if shown else None
+        if 'chart' in data:
+            if self.chart is None:
+                self.chartValues = data['chart']  # Drawn by createChart
+            else:
+                barchartRefresher(self.chart, data['chart'])
+
+    def markDirty(self, *parts):
+        '''
+        Function to mark parts of the homepage ("summary", "history", "chart") to be fetched again.
+        '''
+        self.dirty.update(parts)
+
+    def dataChanged(self, change):
+        '''
+        Function subscribed to the change bus, called on the thread that made the change, usually the background thread.
+        It only passes the change to markChanged through a signal, so the parts are marked on the GUI thread,
+        never while refreshChanged is taking them.
+        '''
+        self.changeReceived.emit(change)
+
+    def markChanged(self, change):
+        '''
+        Function run on the GUI thread to mark the parts of the homepage that a change affects.
+        - summary: expenses and category budgets of the current month, which carry what the months before left
+        - chart: income and expense totals of the current year
+        - history: the recent transactions, if the change reaches their dates
+        '''
+        if self.shownMonth is None:
+            return
+        year, month = self.shownMonth
+        totalsChanged = change.changes('amount', 'type', 'date')
+
+        # With rollover the budgets of the month depend on the expenses of the months before it too
+        shownPrefix = f'{int(year):04d}-{int(month):02d}'
+        budgetsChanged = change.changes('amount', 'type', 'date', 'category', 'budget')
+        if budgetsChanged and 'expense' in change.types and any(d[:7] <= shownPrefix for d in change.dates):
+            self.markDirty('summary')
+        if totalsChanged and change.touchesYear(year):
+            self.markDirty('chart')
+        if change.changes('category', 'amount', 'date', 'type'):
+            if self.historyOldestDate is None or any(d >= self.historyOldestDate for d in change.dates):
+                self.markDirty('history')
+        if self.dirty and self.isVisible():  # A write that ended while the homepage is shown, such as a recurring transaction
+            self.refreshChanged()
+
+    def configChanged(self, key):
+        '''
+        Function called when a setting changes. The budget and the currency suffix are shown in the summary and the history.
+        "" means config.json was edited outside the program, so anything could have changed.
+        '''
+        if key in ('Budget', 'CurrencySuffix', ''):
+            self.markDirty('summary', 'history')
+
     def refreshTheme(self):
         '''
             Function to refresh the theme color values of every element in this window using the class ThemeManager.
@@ -4,12 +4,26 @@ This file will get opened by main.py whenever the Settings button is clicked or
 '''
 
 # Importing GUI elements
-from PySide6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QLabel, QPushButton, QFrame, QLineEdit, QHBoxLayout, QFileDialog, QComboBox
+from PySide6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QLabel, QPushButton, QFrame, QLineEdit, QHBoxLayout, QFileDialog, QComboBox, QProgressDialog, QMessageBox
 from PySide6.QtGui import QIcon, QFont, QKeySequence
 from PySide6.QtCore import Qt, Signal
 
-# json to read and write json file for the options selected
-import json
+# Importing functions from other files
+from helper.configStore import ConfigStore
+from helper.statementImporter import importStatement
+from helper.dbExecutor import DBExecutor
+
+
+def runImport(db, path, progress):
+    '''
+    Function run on the background thread to import a statement.
+    'progress' sends (bytes read, size of the file) to the window and returns False once the import is cancelled.
+    Returns the ImportResult, or the reason the file could not be read.
+    '''
+    try:
+        return importStatement(path, lambda read, size: progress((read, size)))
+    except (ValueError, OSError) as error:
+        return str(error)
 
 class settingsWindow(QMainWindow):
     '''
@@ -17,6 +31,7 @@ class settingsWindow(QMainWindow):
     Includes:
     - Changing the finance report path
     - Changing the currency suffix
+    - Importing the transactions of a bank statement (CSV or OFX)
     '''
     goHome_Signal = Signal()
 
@@ -42,12 +57,9 @@ class settingsWindow(QMainWindow):
 
         # UI elements
         # Theme
-        with open('data/config.json', 'r') as f:
-            data = json.load(f)
-            currentTheme = data['CurrentTheme']
-            themes = []
-            for i in data['Themes'][0].keys():
-                themes.append(i)
+        config = ConfigStore()
+        currentTheme = config.currentTheme()
+        themes = config.themeNames()
 
         self.themeManager = ThemeManager()
         self.themeManager.themeChanged.connect(self.refreshTheme)
@@ -100,6 +112,11 @@ class settingsWindow(QMainWindow):
         '''
         self.exportBtn.clicked.connect(self.pathChanger)
 
+        # Button to import a bank statement (CSV or OFX)
+        self.importBtn = QPushButton('Import Statement')
+        self.importBtnBaseStyle = self.exportBtnBaseStyle
+        self.importBtn.clicked.connect(self.importStatement)
+
         # 'Entry' to enter new currency symbol
         self.currencyEntry = QLineEdit()
         self.currencyEntry.setPlaceholderText('Currency Symbol')
@@ -195,6 +212,7 @@ class settingsWindow(QMainWindow):
         stay in the same horizontal line with export button.
         '''
         pathCardLayout.addWidget(self.exportBtn)
+        pathCardLayout.addWidget(self.importBtn)
         pathCardLayout.addWidget(currencyCard)
 
         # Shortcuts
@@ -297,21 +315,94 @@ class settingsWindow(QMainWindow):
         self.mainWidget = QWidget()
         self.mainWidget.setLayout(pageLayout)
         self.setCentralWidget(self.mainWidget)
-        self.changeTheme(self.themeMenu.currentText()) # This is here so that QComboBox won't get activated before everything is setup
+        self.refreshTheme()  # Styling the window with the current theme, applying it again would restyle every window
+
+    def reloadData(self):
+        '''
+        Function called when the window is shown again from the window cache of main.py.
+        Clears the currency entry and shows the current theme in the menu without applying it again.
+        '''
+        self.currencyEntry.clear()
+        self.themeMenu.blockSignals(True)
+        self.themeMenu.setCurrentText(ConfigStore().currentTheme())
+        self.themeMenu.blockSignals(False)
 
     def pathChanger(self):
         '''
-        Function to change the path of the report exporting in the json file
+        Function to change the path of the report exporting in the settings
         '''
         folder = QFileDialog.getExistingDirectory(self, 'Select Directory', '', QFileDialog.ShowDirsOnly)
 
-        with open('data/config.json', 'r') as f:
-            data = json.load(f)
+        ConfigStore().setReportPath(folder)
 
-        data['Report'][0]['Path'] = folder
+    def importStatement(self):
+        '''
+        Function to import the transactions of a bank statement chosen by the user.
+        The import runs on the background thread, after the database work already submitted, so it never holds the database
+        while a window writes to it. A progress dialog shows how much of the file was read, cancelling it imports nothing
+        until the transactions are being committed, when the Cancel button is removed.
+        '''
+        path, _ = QFileDialog.getOpenFileName(self, 'Select Statement', '', 'Statements (*.csv *.ofx *.qfx)')
+        if not path:
+            return
+
+        self.importDialog = QProgressDialog('Importing transactions...', 'Cancel', 0, 100, self)
+        self.importDialog.setWindowTitle('FundTrack')
+        self.importDialog.setWindowModality(Qt.WindowModal)
+        self.importDialog.setMinimumDuration(500)
+        self.importDialog.setAutoClose(False)
+        self.importDialog.setAutoReset(False)
+        self.importDialog.canceled.connect(self.cancelImport)
+        self.importCancelled = False
+
+        DBExecutor().submit(runImport, path, onResult=self.importDone, onError=self.importFailed,
+                            onProgress=self.importProgress, key='importStatement')
+
+    def importProgress(self, value):
+        read, size = value
+        self.importDialog.setValue(int(read * 100 / size) if size else 100)
+        if read >= size:  # The whole file was read, the transactions are being committed
+            self.importDialog.setLabelText('Saving the transactions...')
+            self.importDialog.setCancelButton(None)
+
+    def cancelImport(self):
+        '''
+        Function called when the Cancel button of the progress dialog is pressed.
+        The import stops after its current batch and rolls back. Its result still arrives in importDone,
+        since an import that was already committing when the button was pressed has added its transactions.
+        '''
+        self.importCancelled = True
+        DBExecutor().stop('importStatement')
 
-        with open('data/config.json', 'w') as f:
-            json.dump(data, f, indent=4)
+    def closeImportDialog(self):
+        self.importDialog.canceled.disconnect(self.cancelImport)  # Closing the dialog emits canceled
+        self.importDialog.close()
+        self.importDialog.deleteLater()
+
+    def importFailed(self, message):
+        self.closeImportDialog()
+        QMessageBox.warning(self, 'FundTrack', f'Could not import the statement:\n{message}')
+
+    def importDone(self, result):
+        '''
+        Function called on the GUI thread with the ImportResult, or the reason the file could not be read.
+        '''
+        if isinstance(result, str):
+            self.importFailed(result)
+            return
+        self.closeImportDialog()
+        if result.cancelled:
+            QMessageBox.information(self, 'FundTrack', 'Import cancelled, no transaction was added.')
+            return
+        message = f'{result.inserted:,} transactions imported.'
+        if self.importCancelled:
+            message = 'The import was already being saved when it was cancelled.\n' + message
+        if result.duplicates:
+            message += f'\n{result.duplicates:,} transactions were already in the database and were not added again.'
+        if result.skipped:
+            message += f'\n{result.skipped:,} lines skipped, first ones:\n'
+            message += '\n'.join(f'Line {line}: {reason}' for line, reason in result.errors[:10])
+        QMessageBox.information(self, 'FundTrack', message)
 
     def saveSettings(self):
         '''
@@ -319,13 +410,7 @@ class settingsWindow(QMainWindow):
         '''
         newCurrency = self.currencyEntry.text()
 
-        with open('data/config.json', 'r') as f:
-            data = json.load(f)
-
-        data['CurrencySuffix'] = newCurrency
-
-        with open('data/config.json', 'w') as f:
-            json.dump(data, f, indent=4)
+        ConfigStore().setCurrencySuffix(newCurrency)
 
         self.currencyEntry.clear()
 
@@ -336,6 +421,7 @@ class settingsWindow(QMainWindow):
         self.headingLabel.setStyleSheet(self.headingLabelBaseStyle + self.themeManager.get_stylesheet("QLabel"))
         self.backButton.setStyleSheet(self.backButtonBaseStyle + self.themeManager.get_stylesheet("QPushButton"))
         self.exportBtn.setStyleSheet(self.exportBtnBaseStyle + self.themeManager.get_stylesheet("QPushButton"))
+        self.importBtn.setStyleSheet(self.importBtnBaseStyle + self.themeManager.get_stylesheet("QPushButton"))
         self.currencyEntry.setStyleSheet(self.currencyEntryBaseStyle + self.themeManager.get_stylesheet("QLineEdit"))
         self.saveBtn.setStyleSheet(self.saveBtnBaseStyle + self.themeManager.get_stylesheet("QPushButton"))
         self.themeCard.setStyleSheet(self.themeCardBaseStyle + self.themeManager.get_stylesheet("QFrame"))
@@ -4,12 +4,18 @@ This file will get opened by main.py whenever the User button is clicked  or the
 '''
 
 # Importing GUI elements
-from PySide6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QLabel, QPushButton, QLineEdit, QDoubleSpinBox
+from PySide6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QLineEdit, QDoubleSpinBox, QComboBox, QCheckBox
 from PySide6.QtGui import QIcon, QFont, QKeySequence
 from PySide6.QtCore import Qt, Signal
 
-# json to read and write json file for the options selected
-import json
+# Importing the settings and functions from other files
+from helper.configStore import ConfigStore
+from helper.categoryCache import CategoryCache
+from helper.dbExecutor import DBExecutor
+from helper.dateAndTime import tdy
+from helper.HPrefresher import budgetProgressRefresher
+from data.money import Money
+
 
 class userWindow(QMainWindow):
     '''
@@ -17,6 +23,8 @@ class userWindow(QMainWindow):
     Includes:
     - Change in name
     - Change in budget
+    - Budget of each expense category from this month on, with what is left carried to the next month if wanted
+    - How much of the budget of each category was spent this month
     '''
     goHome_Signal = Signal()
 
@@ -50,10 +58,6 @@ class userWindow(QMainWindow):
         self.setCentralWidget(self.mainWidget)
 
         # Theme
-        with open('data/config.json', 'r') as f:
-            data = json.load(f)
-            currentTheme = data['CurrentTheme']
-
         self.themeManager = ThemeManager()
         self.themeManager.themeChanged.connect(self.refreshTheme)
 
@@ -97,11 +101,9 @@ class userWindow(QMainWindow):
         self.budgetEntry.setDecimals(2)
         self.budgetEntry.setMaximum(10_000_000)
 
-        # Getting suffix from json file
+        # Getting suffix from the settings
         # TODO: Option to select between sufix and prefix
-        with open('data/config.json', 'r') as f:
-            data = json.load(f)
-            currencySuffix = f' {data["CurrencySuffix"]}'
+        currencySuffix = f' {ConfigStore().currencySuffix()}'
         self.budgetEntry.setSuffix(currencySuffix)
         self.budgetEntryBaseStyle = '''
             QDoubleSpinBox {
@@ -123,39 +125,110 @@ class userWindow(QMainWindow):
         '''
         self.submitBtn.clicked.connect(self.changeName)
 
+        # Budgets of the categories
+        '''
+        categoryEntry, categoryBudgetEntry and rolloverCheck set the budget of an expense category from this month on,
+        an amount of 0 ends it. budgetsLayout shows how much of each budget was spent this month.
+        '''
+        self.categoryBudgetLabel = QLabel('Category budgets')
+        self.categoryBudgetLabelBaseStyle = '''
+            font-size: 24px;
+            font-weight: bold;
+        '''
+
+        self.categoryEntry = QComboBox()
+        self.categoryEntry.setModel(CategoryCache().model('expense'))
+        self.categoryEntryBaseStyle = '''
+            QComboBox {
+                font-size: 16px;
+                padding: 8px;
+                border-radius: 5px;
+                font-family: Adwaita mono;
+            }
+        '''
+
+        self.categoryBudgetEntry = QDoubleSpinBox()
+        self.categoryBudgetEntry.setDecimals(2)
+        self.categoryBudgetEntry.setMaximum(10_000_000)
+        self.categoryBudgetEntry.setSuffix(currencySuffix)
+
+        self.rolloverCheck = QCheckBox('Carry what is left to the next month')
+
+        self.categoryBudgetBtn = QPushButton('Set Budget')
+        self.categoryBudgetBtn.clicked.connect(self.setCategoryBudget)
+
+        categoryBudgetRow = QHBoxLayout()
+        categoryBudgetRow.setSpacing(20)
+        categoryBudgetRow.addWidget(self.categoryEntry)
+        categoryBudgetRow.addWidget(self.categoryBudgetEntry)
+        categoryBudgetRow.addWidget(self.rolloverCheck)
+        categoryBudgetRow.addWidget(self.categoryBudgetBtn)
+        categoryBudgetRow.addStretch()
+
+        self.budgetsLayout = QVBoxLayout()
+        self.executor = DBExecutor()
+
         # Adding each element to the main page layout
         pageLayout.addWidget(self.backButton)
         pageLayout.addWidget(self.headingLabel)
         pageLayout.addWidget(self.enterName)
         pageLayout.addWidget(self.budgetEntry)
         pageLayout.addWidget(self.submitBtn)
+        pageLayout.addWidget(self.categoryBudgetLabel)
+        pageLayout.addLayout(categoryBudgetRow)
+        pageLayout.addLayout(self.budgetsLayout)
         self.refreshTheme()
+        self.loadBudgets()
 
 
         pageLayout.addStretch()
 
+    def reloadData(self):
+        '''
+        Function called when the window is shown again from the window cache of main.py.
+        Clears the entries, reads the currency suffix again and shows the budgets of the categories again.
+        '''
+        self.enterName.clear()
+        self.budgetEntry.setValue(0.0)
+        self.budgetEntry.setSuffix(f' {ConfigStore().currencySuffix()}')
+        self.categoryBudgetEntry.setValue(0.0)
+        self.categoryBudgetEntry.setSuffix(f' {ConfigStore().currencySuffix()}')
+        self.rolloverCheck.setChecked(False)
+        self.loadBudgets()
+
+    def loadBudgets(self):
+        '''
+        Function to show the budgets of the categories this month, read on the background thread.
+        '''
+        self.executor.submit(lambda db: db.budgetVariance(), onResult=self.showBudgets, key=('userBudgets', id(self)))
+
+    def showBudgets(self, budgetStatuses):
+        budgetProgressRefresher(self.budgetsLayout, budgetStatuses, ConfigStore().currencySuffix())
+
+    def setCategoryBudget(self):
+        '''
+        Function to set the budget of the selected category from this month on, then show the budgets again.
+        '''
+        category = self.categoryEntry.currentText()
+        if not category:
+            return
+        today = tdy()
+        amount = Money.of(self.categoryBudgetEntry.value())  # The value, the text has the currency suffix
+        rollover = self.rolloverCheck.isChecked()
+        self.executor.submit(lambda db: db.setCategoryBudget(category, today.year, today.month, amount, rollover),
+                             onResult=lambda result: self.loadBudgets())
+
     def changeName(self):
         '''
-        Function to change the name of the user in the json file.
+        Function to change the name and the budget of the user in the settings.
         '''
+        config = ConfigStore()
         newName = self.enterName.text()
         if len(newName) != 0:
-            with open('data/config.json', 'r') as f:
-                data = json.load(f)
-
-            data['user'][0]['Name'] = newName
-
-            with open('data/config.json', 'w') as f:
-                json.dump(data, f, indent=4)
+            config.setUserName(newName)
         if len(self.budgetEntry.text()) != 0:
-            newBudget = self.budgetEntry.text()[0:-5]
-            with open('data/config.json', 'r') as f:
-                data = json.load(f)
-
-            data['User'][1]['Budget'] = newBudget
-
-            with open('data/config.json', 'w') as f:
-                json.dump(data, f, indent=4)
+            newBudget = Money.of(self.budgetEntry.value())  # The value, the text has the currency suffix
+            config.setBudget(newBudget)
         self.goHome_Signal.emit()
 
 
@@ -168,4 +241,9 @@ class userWindow(QMainWindow):
         self.enterName.setStyleSheet(self.enterNameBaseStyle + self.themeManager.get_stylesheet("QLineEdit") + self.themeManager.get_stylesheet("font_color1"))
         self.budgetEntry.setStyleSheet(self.budgetEntryBaseStyle + self.themeManager.get_stylesheet("QDoubleSpinBox") + self.themeManager.get_stylesheet("font_color1"))
         self.submitBtn.setStyleSheet(self.submitBtnBaseStyle + self.themeManager.get_stylesheet("QPushButton"))
+        self.categoryBudgetLabel.setStyleSheet(self.categoryBudgetLabelBaseStyle + self.themeManager.get_stylesheet("QLabel"))
+        self.categoryEntry.setStyleSheet(self.categoryEntryBaseStyle + self.themeManager.get_stylesheet("QComboBox") + self.themeManager.get_stylesheet("QLabel"))
+        self.categoryBudgetEntry.setStyleSheet(self.budgetEntryBaseStyle + self.themeManager.get_stylesheet("QDoubleSpinBox") + self.themeManager.get_stylesheet("font_color1"))
+        self.rolloverCheck.setStyleSheet(self.themeManager.get_stylesheet("QCheckBox"))
+        self.categoryBudgetBtn.setStyleSheet(self.submitBtnBaseStyle + self.themeManager.get_stylesheet("QPushButton"))
         self.mainWidget.setStyleSheet(self.themeManager.get_stylesheet("PrimaryASecondary"))
\ No newline at end of file